@@ -1,8 +1,6 @@
 import streamlit as st
 import pandas as pd
-import os
 from sensorqualityclassifier.pipeline.inference_pipeline import InferencePipeline
-import shutil
 
 # Streamlit webpage title
 if 'current_page' not in st.session_state:
@@ -48,28 +46,10 @@ def upload_csv():
   uploaded_file = st.file_uploader("Choose a CSV file to Predict good and bad quality wafer", type="csv")
   
 
-  # Process uploaded file
+  # The upload is kept in memory and scored directly, nothing is written to disk
   if uploaded_file is not None:
-    # To read file as string:
-        stringio = uploaded_file.getvalue().decode("utf-8")
-        
-        # You can also save this file to the server
-        # Specify the location where you want to save the file
-        save_location = 'saved_artifacts/prediction_dir/' + uploaded_file.name
-
-        # Create the directory if it doesn't exist
-        os.makedirs(os.path.dirname(save_location), exist_ok=True)
-
-        # Write the file to the specified location
-        with open(save_location, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        
-        st.success(f"File {uploaded_file.name} uploaded and saved to {save_location}!")
-    
-def delete_csv():
-  save_location= 'saved_artifacts/prediction_dir/'
-  shutil.rmtree(save_location)
-  print(f"Directory {save_location} has been removed")
+        st.success(f"File {uploaded_file.name} uploaded!")
+  return uploaded_file
 
 def pred_page():
     """
@@ -89,14 +69,19 @@ def pred_page():
     st.markdown(f"<div style='text-align: justify;'>{sample_file_text}</div>", unsafe_allow_html=True)
     st.markdown(f"[Download file]({file_url})", unsafe_allow_html=True)
     
-    upload_csv()
+    uploaded_file = upload_csv()
     
     if st.button('Run Inference'):
+        if uploaded_file is None:
+            st.warning('Please upload a CSV file first.')
+        else:
             inference_runner = InferencePipeline()
-            good,bad=inference_runner.run_inference()  # Add arguments if your function requires them
-            st.success('Inference run successfully')
-            st.success(f'In the given input csv file, There are total {good} good quality wafers and {bad} bad quality wafers which needs to be replaced.')
-            delete_csv()        
+            try:
+                _, good, bad = inference_runner.predict_bytes(uploaded_file.getvalue(), source=uploaded_file.name)
+                st.success('Inference run successfully')
+                st.success(f'In the given input csv file, There are total {good} good quality wafers and {bad} bad quality wafers which needs to be replaced.')
+            except ValueError as e:
+                st.error(f'Invalid input file: {e}')
 
 def main():
     # Navigation bar
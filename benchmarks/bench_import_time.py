@@ -0,0 +1,117 @@
+"""
+Measures the import cost of the inference entry points with `python -X importtime`
+and checks that they do not pull in the feature store, training or validation code.
+Exits with status 1 if a forbidden module is imported or the median import time
+exceeds --budget-ms, so it can guard startup time against regressions.
+
+Usage:
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --module sensorqualityclassifier.serving.scoring_service --budget-ms 800
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = ['sensorqualityclassifier.pipeline.inference_pipeline']
+
+# Modules only the data loading, validation and training code paths need
+FORBIDDEN_PREFIXES = [
+    'hopsworks',
+    'sklearn',
+    'xgboost',
+    'joblib',
+    'dotenv',
+    'sensorqualityclassifier.feature_store',
+    'sensorqualityclassifier.pipeline.data_transform_and_loading_pipeline',
+    'sensorqualityclassifier.pipeline.data_validation_pipeline',
+    'sensorqualityclassifier.pipeline.model_training_pipeline',
+]
+
+def parse_importtime(stderr):
+    """
+    Parses the `-X importtime` report.
+
+    Returns:
+        dict: Self and cumulative import time in microseconds of every imported module.
+    """
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = {'self_us': int(self_us), 'cumulative_us': int(cumulative_us)}
+    return timings
+
+def measure(module):
+    """
+    Imports a module in a fresh interpreter.
+
+    Returns:
+        dict: Per-module import timings.
+    """
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        check=True, capture_output=True, text=True,
+    ).stderr
+    return parse_importtime(stderr)
+
+def forbidden_imports(timings):
+    """
+    Returns the entries of FORBIDDEN_PREFIXES of which at least one module was imported.
+    """
+    return [
+        prefix for prefix in FORBIDDEN_PREFIXES
+        if any(name == prefix or name.startswith(prefix + '.') for name in timings)
+    ]
+
+def run_benchmark(module, repeats=5, top=15):
+    """
+    Imports module repeats times and reports the median total import time, the imports
+    with the highest self time in the last run and any forbidden module.
+
+    Returns:
+        dict: The measurements of the module.
+    """
+    runs = [measure(module) for _ in range(repeats)]
+    timings = runs[-1]
+    total_ms = statistics.median(run[module]['cumulative_us'] for run in runs) / 1000.0
+    slowest = sorted(timings.items(), key=lambda item: item[1]['self_us'], reverse=True)[:top]
+    result = {
+        'module': module,
+        'import_ms': total_ms,
+        'modules_imported': len(timings),
+        'slowest_self_us': {name: timing['self_us'] for name, timing in slowest},
+        'forbidden': forbidden_imports(timings),
+    }
+    print(f"{module}: {total_ms:.1f}ms, {len(timings)} modules")
+    for name, timing in slowest:
+        print(f"    {timing['self_us'] / 1000.0:7.1f}ms  {name}")
+    if result['forbidden']:
+        print(f"    forbidden imports: {', '.join(result['forbidden'])}")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', nargs='+', default=DEFAULT_MODULES, help="Modules to import.")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help="Number of slowest imports to list.")
+    parser.add_argument('--budget-ms', type=float, help="Fail if a module takes longer to import.")
+    parser.add_argument('--output', help="Optional path of a JSON file for the results.")
+    args = parser.parse_args()
+
+    results = [run_benchmark(module, repeats=args.repeats, top=args.top) for module in args.module]
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    failed = [result['module'] for result in results if result['forbidden']]
+    if args.budget_ms is not None:
+        failed += [result['module'] for result in results if result['import_ms'] > args.budget_ms]
+    if failed:
+        print(f"Import check failed for: {', '.join(sorted(set(failed)))}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compares the cold-start cost of the pickled model artifact with the native XGBoost
+format written next to it. Every measurement runs in a fresh interpreter, timing the
+imports, the load and the first prediction separately.
+
+Usage:
+    python -m benchmarks.bench_model_load --model artifacts/trained_models/xgboost_model.pkl
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from sensorqualityclassifier.utils.native_model import NativeModel
+
+# Runs in the child interpreter; prints the timings as JSON
+COLD_START_SCRIPT = r'''
+import json, sys, time
+start = time.perf_counter()
+import numpy as np
+import pandas as pd
+import joblib
+import xgboost
+from sensorqualityclassifier.utils.model_registry import ModelRegistry
+imported = time.perf_counter()
+model = ModelRegistry().load_artifact(sys.argv[1])
+loaded = time.perf_counter()
+features = list(model.get_booster().feature_names)
+model.predict(pd.DataFrame(np.zeros((1, len(features)), dtype=np.float32), columns=features))
+predicted = time.perf_counter()
+print(json.dumps({
+    'import_seconds': imported - start,
+    'load_seconds': loaded - imported,
+    'first_predict_seconds': predicted - loaded,
+    'total_seconds': predicted - start,
+}))
+'''
+
+def cold_start(artifact_path):
+    """
+    Loads an artifact in a fresh interpreter and returns its timings.
+    """
+    output = subprocess.run(
+        [sys.executable, '-c', COLD_START_SCRIPT, artifact_path],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def run_benchmark(model_path, repeats=5):
+    """
+    Measures both formats repeats times and reports the median of every timing.
+
+    Returns:
+        dict: Median timings per format.
+    """
+    artifacts = {'pickle': model_path, 'native': NativeModel.manifest_path_for(model_path)}
+    results = {}
+    for name, path in artifacts.items():
+        runs = [cold_start(path) for _ in range(repeats)]
+        results[name] = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+        print(f"{name:>7}: " + ' '.join(f"{key}={value * 1000:.1f}ms" for key, value in results[name].items()))
+    results['load_speedup'] = results['pickle']['load_seconds'] / results['native']['load_seconds']
+    print(f"native load speedup: {results['load_speedup']:.2f}x")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='artifacts/trained_models/xgboost_model.pkl', help="Path to the pickled model; its native manifest must exist.")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', help="Optional path of a JSON file for the results.")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.model, repeats=args.repeats)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Times the validation, loading, training and inference pipelines end to end on synthetic
+batches at several scales, using the local feature store in a temporary workspace.
+
+Usage:
+    python -m benchmarks.bench_pipeline_stages --scales 10x100 50x200
+    python -m benchmarks.bench_pipeline_stages --baseline benchmarks/results/<previous>.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+from datetime import datetime
+import yaml
+from benchmarks.synthetic_data import generate_batch_files
+from sensorqualityclassifier.pipeline.data_validation_pipeline import DataValidationPipeline
+from sensorqualityclassifier.pipeline.data_transform_and_loading_pipeline import DataLoadingPipeline
+from sensorqualityclassifier.pipeline.model_training_pipeline import ModelTrainingPipeline
+from sensorqualityclassifier.pipeline.inference_pipeline import InferencePipeline
+from sensorqualityclassifier.utils.common import peak_rss_bytes
+
+DEFAULT_SCALES = ['10x100', '50x200', '100x500']
+STAGES = ['validation', 'loading', 'training', 'inference']
+
+def parse_scale(scale):
+    """
+    Parses a '<files>x<rows>' scale.
+    """
+    files, rows = scale.lower().split('x')
+    return int(files), int(rows)
+
+def write_workspace_config(base_config_path, workspace):
+    """
+    Writes a copy of the repository config with every path moved into the workspace and
+    the local feature store selected.
+
+    Returns:
+        str: Path of the written config.
+    """
+    with open(base_config_path, 'r') as file:
+        config = yaml.safe_load(file)
+    artifacts = os.path.join(workspace, 'artifacts')
+    config.update({
+        'artifacts_root': artifacts,
+        'root_directory': os.path.join(artifacts, 'data_ingestion'),
+        'local_data_file': os.path.join(artifacts, 'data_ingestion', 'data.zip'),
+        'unzip_dir': os.path.join(artifacts, 'data_ingestion'),
+        'good_data_folder': os.path.join(artifacts, 'training_data', 'Good_Data_Folder'),
+        'bad_data_folder': os.path.join(artifacts, 'training_data', 'Bad_Data_Folder'),
+        'saved_model': os.path.join(artifacts, 'trained_models'),
+        'load_model': os.path.join(artifacts, 'trained_models', 'xgboost_model.pkl'),
+        'prediction_dir': os.path.join(workspace, 'prediction_dir'),
+        'output_dir': os.path.join(artifacts, 'output'),
+        'columnar_cache_dir': os.path.join(artifacts, 'columnar_cache'),
+        'manifest_path': os.path.join(artifacts, 'file_manifest.json'),
+        'prediction_cache_path': os.path.join(artifacts, 'prediction_cache.sqlite'),
+        'feature_store': 'local',
+        'feature_store_dir': os.path.join(artifacts, 'feature_store'),
+        'metrics_dir': os.path.join(artifacts, 'metrics'),
+        'training_mode': 'fixed',
+    })
+    config_path = os.path.join(workspace, 'config.yml')
+    with open(config_path, 'w') as file:
+        yaml.safe_dump(config, file)
+    return config_path
+
+def timed(fn):
+    """
+    Runs fn and returns its result and wall time.
+    """
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def train_stage(config_path):
+    """
+    Trains and saves a model from the feature store, as ModelTrainingPipeline.run_pipeline
+    does, but lets failures propagate so they are reported.
+    """
+    pipeline = ModelTrainingPipeline(config_path)
+    df = pipeline.fetch_data_from_feature_store()
+    X = df.drop(columns=['good_bad', 'wafer_num'])
+    y = df['good_bad']
+    if pipeline.feature_pruning:
+        X = pipeline.prune_static_features(X)
+    model, metrics = pipeline.train_and_evaluate_model(X, y)
+    pipeline.save_model(model, metrics, X, y)
+    return metrics
+
+def run_scale(files, rows, base_config_path, schema_path, nan_rate, invalid_ratio, label_values, seed):
+    """
+    Runs every stage once at the given scale in a fresh workspace.
+
+    Returns:
+        dict: Scale, wall time and throughput per stage, and peak RSS.
+    """
+    workspace = tempfile.mkdtemp(prefix='sqc_bench_')
+    try:
+        config_path = write_workspace_config(base_config_path, workspace)
+        with open(config_path, 'r') as file:
+            config = yaml.safe_load(file)
+        generate_batch_files(
+            os.path.join(config['unzip_dir'], 'Training_Batch_Files'), schema_path, files, rows,
+            nan_rate, invalid_ratio, with_labels=True, label_values=label_values, seed=seed,
+        )
+        generate_batch_files(
+            config['prediction_dir'], schema_path, files, rows, nan_rate,
+            with_labels=False, seed=seed + 1,
+        )
+
+        total_rows = files * rows
+        stages = {}
+        steps = [
+            ('validation', lambda: DataValidationPipeline(config_path, schema_path).validate_and_move_files()),
+            ('loading', lambda: DataLoadingPipeline(config_path, os.path.join(workspace, '.env'), schema_path).load_and_push_data()),
+            ('training', lambda: train_stage(config_path)),
+            ('inference', lambda: InferencePipeline(config_path, schema_path).run_inference()),
+        ]
+        for stage, fn in steps:
+            try:
+                _, seconds = timed(fn)
+                stages[stage] = {'seconds': seconds, 'rows_per_second': total_rows / seconds if seconds else None}
+            except Exception as e:
+                stages[stage] = {'error': f"{type(e).__name__}: {e}"}
+                break
+        return {
+            'files': files,
+            'rows_per_file': rows,
+            'rows': total_rows,
+            'stages': stages,
+            'peak_rss_bytes': peak_rss_bytes(),
+        }
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+def compare(results, baseline):
+    """
+    Prints the wall time ratio of every stage against a baseline run; above 1 is slower.
+    """
+    previous = {(run['files'], run['rows_per_file']): run for run in baseline['runs']}
+    for run in results['runs']:
+        old = previous.get((run['files'], run['rows_per_file']))
+        if old is None:
+            continue
+        for stage in STAGES:
+            new_seconds = run['stages'].get(stage, {}).get('seconds')
+            old_seconds = old['stages'].get(stage, {}).get('seconds')
+            if new_seconds and old_seconds:
+                print(f"{run['files']}x{run['rows_per_file']:<6} {stage:<11} "
+                      f"{old_seconds:8.3f}s -> {new_seconds:8.3f}s ({new_seconds / old_seconds:5.2f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', nargs='+', default=DEFAULT_SCALES, help="Scales as <files>x<rows per file>.")
+    parser.add_argument('--config', default='config/config.yml')
+    parser.add_argument('--schema', default='config/schema_training.json')
+    parser.add_argument('--nan-rate', type=float, default=0.05)
+    parser.add_argument('--invalid-ratio', type=float, default=0.1)
+    parser.add_argument('--label-values', type=int, nargs=2, default=[-1, 1], help="Labels of bad and good wafers.")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output-dir', default='benchmarks/results')
+    parser.add_argument('--baseline', help="Previous results JSON to compare against.")
+    args = parser.parse_args()
+
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'nan_rate': args.nan_rate,
+        'invalid_ratio': args.invalid_ratio,
+        'runs': [],
+    }
+    for scale in args.scales:
+        files, rows = parse_scale(scale)
+        run = run_scale(files, rows, args.config, args.schema, args.nan_rate,
+                        args.invalid_ratio, tuple(args.label_values), args.seed)
+        results['runs'].append(run)
+        summary = ' '.join(
+            f"{stage}={run['stages'][stage]['seconds']:.3f}s" if 'seconds' in run['stages'][stage]
+            else f"{stage}=FAILED({run['stages'][stage]['error']})"
+            for stage in STAGES if stage in run['stages']
+        )
+        print(f"{scale:>10} {summary}")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    output_path = os.path.join(args.output_dir, f"stages_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(output_path, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {output_path}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as file:
+            compare(results, json.load(file))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmarks the NumPy tree-ensemble backend against the stock XGBoost predict path.
+
+Usage:
+    python -m benchmarks.bench_tree_ensemble --model artifacts/trained_models/xgboost_model.pkl
+
+--model defaults to the model written by the training pipeline.
+"""
+import argparse
+import json
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from sensorqualityclassifier.utils.tree_ensemble import CompiledTreeEnsemble
+
+DEFAULT_BATCH_SIZES = [1, 10, 100, 1000, 10000, 100000]
+
+def time_call(fn, repeats):
+    """
+    Returns the best wall time of fn over the given number of repeats.
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run_benchmark(model, batch_sizes, repeats=5, nan_rate=0.05, seed=42):
+    """
+    Times both backends for every batch size and checks that their labels agree.
+
+    Returns:
+        list: One result dict per batch size.
+    """
+    compiled = CompiledTreeEnsemble.from_model(model)
+    booster = model.get_booster()
+    width = CompiledTreeEnsemble.model_width(booster, compiled)
+    feature_names = booster.feature_names or [f"f{i}" for i in range(width)]
+    rng = np.random.default_rng(seed)
+    data = rng.normal(size=(max(batch_sizes), len(feature_names))).astype(np.float32)
+    data[rng.random(data.shape) < nan_rate] = np.nan
+    frame = pd.DataFrame(data, columns=feature_names)
+
+    results = []
+    for batch_size in batch_sizes:
+        batch = frame.iloc[:batch_size]
+        labels_match = bool(np.array_equal(model.predict(batch), compiled.predict(batch)))
+        batch_repeats = repeats if batch_size < 10000 else max(1, repeats // 2)
+        xgboost_seconds = time_call(lambda: model.predict(batch), batch_repeats)
+        numpy_seconds = time_call(lambda: compiled.predict(batch), batch_repeats)
+        results.append({
+            'batch_size': batch_size,
+            'xgboost_seconds': xgboost_seconds,
+            'numpy_seconds': numpy_seconds,
+            'speedup': xgboost_seconds / numpy_seconds,
+            'labels_match': labels_match,
+        })
+        print(f"batch={batch_size:>7} xgboost={xgboost_seconds * 1000:9.3f}ms "
+              f"numpy={numpy_seconds * 1000:9.3f}ms speedup={xgboost_seconds / numpy_seconds:6.2f}x "
+              f"labels_match={labels_match}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        '--model', default='artifacts/trained_models/xgboost_model.pkl',
+        help="Path to the joblib model artifact written by the training pipeline.",
+    )
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=DEFAULT_BATCH_SIZES)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', help="Optional path of a JSON file for the results.")
+    args = parser.parse_args()
+
+    results = run_benchmark(joblib.load(args.model), args.batch_sizes, repeats=args.repeats)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Generates synthetic wafer batch files that conform to config/schema_training.json.
+
+Usage:
+    python -m benchmarks.synthetic_data --output-dir artifacts/synthetic --files 20 --rows 500
+"""
+import argparse
+import json
+import os
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+def read_schema(schema_path):
+    """
+    Reads the training schema.
+    """
+    with open(schema_path, 'r') as file:
+        return json.load(file)
+
+def sensor_column_names(schema):
+    """
+    Returns the sensor column names in the layout of the real batch files ('Sensor-1').
+    """
+    return [col.replace(' ', '') for col in list(schema['ColName'])[1:-1]]
+
+def batch_file_name(index, start=datetime(2020, 1, 1)):
+    """
+    Returns a file name matching the schema's pattern, unique per index.
+    """
+    stamp = start + timedelta(minutes=index)
+    return f"wafer_{stamp:%d%m%Y}_{stamp:%H%M%S}.csv"
+
+def generate_frame(schema, rows, nan_rate=0.05, with_labels=True, label_values=(-1, 1), rng=None, wafer_offset=0):
+    """
+    Generates one batch of wafer rows.
+
+    Parameters:
+        schema (dict): Training schema.
+        rows (int): Number of wafers.
+        nan_rate (float): Fraction of sensor readings replaced by NaN.
+        with_labels (bool): Append the Good/Bad column (training files) or not (prediction files).
+        label_values (tuple): Labels used for bad and good wafers.
+        rng (np.random.Generator): Random generator.
+        wafer_offset (int): First wafer number, keeps wafer ids unique across files.
+
+    Returns:
+        pd.DataFrame: The batch in the layout of the real CSV files.
+    """
+    rng = rng or np.random.default_rng()
+    sensors = sensor_column_names(schema)
+    values = rng.normal(loc=100.0, scale=25.0, size=(rows, len(sensors)))
+    # A few constant sensors, as in the real data
+    values[:, ::50] = 0.0
+    values[rng.random(values.shape) < nan_rate] = np.nan
+    df = pd.DataFrame(values, columns=sensors)
+    df.insert(0, 'Wafer', [f"Wafer-{wafer_offset + i}" for i in range(rows)])
+    if with_labels:
+        signal = np.nan_to_num(values[:, 1] - 100.0) + np.nan_to_num(values[:, 7] - 100.0) * 0.5
+        df['Good/Bad'] = np.where(signal + rng.normal(scale=10.0, size=rows) > 0, label_values[1], label_values[0])
+    return df
+
+def generate_batch_files(output_dir, schema_path='config/schema_training.json', files=10, rows=100,
+                         nan_rate=0.05, invalid_ratio=0.0, with_labels=True, label_values=(-1, 1), seed=42):
+    """
+    Writes synthetic batch files. A fraction invalid_ratio of the files is made invalid,
+    alternating between a bad file name and a missing column.
+
+    Returns:
+        list: Paths of the generated files.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    schema = read_schema(schema_path)
+    rng = np.random.default_rng(seed)
+    n_invalid = int(round(files * invalid_ratio))
+    paths = []
+    for index in range(files):
+        df = generate_frame(schema, rows, nan_rate, with_labels, label_values, rng, wafer_offset=index * rows)
+        file_name = batch_file_name(index)
+        if index < n_invalid:
+            if index % 2 == 0:
+                file_name = f"invalid_{index}.csv"
+            else:
+                df = df.drop(columns=df.columns[1])
+        path = os.path.join(output_dir, file_name)
+        df.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output-dir', required=True)
+    parser.add_argument('--schema', default='config/schema_training.json')
+    parser.add_argument('--files', type=int, default=10)
+    parser.add_argument('--rows', type=int, default=100)
+    parser.add_argument('--nan-rate', type=float, default=0.05)
+    parser.add_argument('--invalid-ratio', type=float, default=0.0)
+    parser.add_argument('--prediction', action='store_true', help="Generate prediction files without the Good/Bad column.")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    paths = generate_batch_files(
+        args.output_dir, args.schema, args.files, args.rows, args.nan_rate,
+        args.invalid_ratio, with_labels=not args.prediction, seed=args.seed,
+    )
+    print(f"Generated {len(paths)} files in {args.output_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+class FeatureStore:
+    """
+    Interface of the feature stores the wafer pipelines read from and write to.
+
+    Rows are identified by the primary key (wafer_num). Filters are given as a list of
+    (column, operator, value) tuples combined with AND, where operator is one of
+    '==', '!=', '<', '<=', '>', '>=' or 'in'.
+    """
+
+    primary_key = 'wafer_num'
+
+    def upsert(self, df):
+        """
+        Inserts new rows and replaces the rows whose primary key already exists.
+
+        Parameters:
+            df (pd.DataFrame): Rows to write, including the primary key column.
+        """
+        raise NotImplementedError
+
+    def read(self, columns=None, filters=None):
+        """
+        Reads rows from the store.
+
+        Parameters:
+            columns (list): Columns to return, all columns if None.
+            filters (list): (column, operator, value) predicates the rows must satisfy.
+
+        Returns:
+            pd.DataFrame: The matching rows.
+        """
+        raise NotImplementedError
@@ -0,0 +1,136 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from sensorqualityclassifier.utils.logger import AppLogger
+
+class DeltaPusher:
+    """
+    Pushes only new or changed rows to a feature store.
+
+    The content hash of every pushed row is remembered per primary key in a small .npz
+    state file. On the next push, rows whose key and hash are already known are dropped,
+    and the remaining rows are upserted in bounded-size batches, each retried with
+    exponential backoff. The state is saved after every successful batch, so an
+    interrupted push resumes where it stopped.
+
+    Attributes:
+        feature_store (FeatureStore): Store the rows are pushed to.
+        state_path (str): Path of the .npz file holding the pushed row hashes.
+        batch_rows (int): Maximum number of rows sent per upsert call.
+        max_retries (int): Attempts per batch before giving up.
+        backoff_seconds (float): Delay before the first retry, doubled on each retry.
+    """
+
+    def __init__(self, feature_store, state_path, batch_rows=5000, max_retries=3, backoff_seconds=1.0):
+        self.feature_store = feature_store
+        self.state_path = state_path
+        self.batch_rows = batch_rows
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.primary_key = feature_store.primary_key
+        self.logger = AppLogger()
+        self.pushed_hashes = self.read_state()
+
+    def read_state(self):
+        """
+        Reads the hashes of the rows pushed so far, keyed by primary key.
+        """
+        if not os.path.exists(self.state_path):
+            return {}
+        with np.load(self.state_path) as state:
+            return dict(zip(state['keys'].tolist(), state['hashes'].tolist()))
+
+    def save_state(self):
+        """
+        Writes the pushed row hashes atomically.
+        """
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.state_path + '.tmp.npz'
+        np.savez(
+            tmp_path,
+            keys=np.array(list(self.pushed_hashes.keys()), dtype=str),
+            hashes=np.array(list(self.pushed_hashes.values()), dtype=np.uint64),
+        )
+        os.replace(tmp_path, self.state_path)
+
+    @staticmethod
+    def row_hashes(df):
+        """
+        Returns a 64-bit content hash of every row.
+        """
+        return pd.util.hash_pandas_object(df, index=False).to_numpy(dtype=np.uint64)
+
+    def changed_rows(self, df):
+        """
+        Selects the rows whose primary key is new or whose content changed.
+
+        Returns:
+            tuple: The changed rows and their hashes.
+        """
+        df = df.drop_duplicates(subset=self.primary_key, keep='last')
+        hashes = self.row_hashes(df)
+        keys = df[self.primary_key].astype(str).tolist()
+        changed = np.fromiter(
+            (self.pushed_hashes.get(key) != row_hash for key, row_hash in zip(keys, hashes.tolist())),
+            dtype=bool,
+            count=len(keys),
+        )
+        return df[changed], hashes[changed]
+
+    def upsert_with_retry(self, batch):
+        """
+        Upserts one batch, retrying with exponential backoff.
+
+        Returns:
+            int: Number of retries needed.
+        """
+        for attempt in range(self.max_retries):
+            try:
+                self.feature_store.upsert(batch)
+                return attempt
+            except Exception as e:
+                if attempt == self.max_retries - 1:
+                    raise
+                delay = self.backoff_seconds * 2 ** attempt
+                self.logger.log_warning(f"Upsert of {len(batch)} rows failed ({e}), retrying in {delay:.1f}s.")
+                time.sleep(delay)
+
+    def push(self, df):
+        """
+        Pushes the new or changed rows of df.
+
+        Parameters:
+            df (pd.DataFrame): Preprocessed rows including the primary key column.
+
+        Returns:
+            dict: Rows considered, rows and bytes sent, batches, retries and wall time.
+        """
+        start = time.perf_counter()
+        changed, hashes = self.changed_rows(df)
+        report = {
+            'rows_total': len(df),
+            'rows_sent': 0,
+            'rows_unchanged': len(df) - len(changed),
+            'bytes_sent': 0,
+            'batches': 0,
+            'retries': 0,
+        }
+        for offset in range(0, len(changed), self.batch_rows):
+            batch = changed.iloc[offset:offset + self.batch_rows]
+            report['retries'] += self.upsert_with_retry(batch)
+            keys = batch[self.primary_key].astype(str).tolist()
+            self.pushed_hashes.update(zip(keys, hashes[offset:offset + self.batch_rows].tolist()))
+            self.save_state()
+            report['rows_sent'] += len(batch)
+            report['bytes_sent'] += int(batch.memory_usage(index=False, deep=True).sum())
+            report['batches'] += 1
+        report['seconds'] = time.perf_counter() - start
+        self.logger.log_info(
+            f"Pushed {report['rows_sent']} of {report['rows_total']} rows "
+            f"({report['bytes_sent']} bytes) in {report['batches']} batches, "
+            f"{report['rows_unchanged']} unchanged rows skipped."
+        )
+        return report
@@ -0,0 +1,27 @@
+import os
+from sensorqualityclassifier.feature_store.hopsworks_store import HopsworksFeatureStore
+from sensorqualityclassifier.feature_store.local_store import LocalFeatureStore
+
+def create_feature_store(config):
+    """
+    Creates the feature store backend selected by feature_store in the configuration.
+
+    Parameters:
+        config (dict): Configuration settings loaded from config.yml. Hopsworks
+            credentials are read from the FS_API_KEY and FS_PROJECT_NAME variables.
+
+    Returns:
+        FeatureStore: A LocalFeatureStore ('local') or HopsworksFeatureStore ('hopsworks').
+    """
+    backend = config.get('feature_store', 'hopsworks')
+    if backend == 'local':
+        return LocalFeatureStore(
+            config.get('feature_store_dir', 'artifacts/feature_store'),
+            num_partitions=config.get('feature_store_partitions', 8),
+        )
+    if backend == 'hopsworks':
+        return HopsworksFeatureStore(
+            api_key=os.getenv('FS_API_KEY'),
+            project_name=os.getenv('FS_PROJECT_NAME'),
+        )
+    raise ValueError(f"Unknown feature store backend: {backend}")
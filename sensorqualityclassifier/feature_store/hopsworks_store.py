@@ -0,0 +1,68 @@
+import operator
+from functools import reduce
+from sensorqualityclassifier.feature_store.base import FeatureStore
+from sensorqualityclassifier.utils.logger import AppLogger
+
+class HopsworksFeatureStore(FeatureStore):
+    """
+    Feature store backed by a Hopsworks feature group.
+
+    The hopsworks client is imported and logged in lazily, on first use, so that
+    selecting another backend never pays for it.
+
+    Attributes:
+        api_key (str): Hopsworks API key.
+        project_name (str): Hopsworks project name.
+        feature_group_name (str): Name of the feature group holding the wafer data.
+        version (int): Version of the feature group.
+    """
+
+    def __init__(self, api_key, project_name, feature_group_name='wafer_project', version=1):
+        self.api_key = api_key
+        self.project_name = project_name
+        self.feature_group_name = feature_group_name
+        self.version = version
+        self.logger = AppLogger()
+        self._project = None
+
+    @property
+    def project(self):
+        """
+        Returns the Hopsworks project, logging in on first access.
+        """
+        if self._project is None:
+            import hopsworks
+            self._project = hopsworks.login(api_key_value=self.api_key, project=self.project_name)
+        return self._project
+
+    def upsert(self, df):
+        """
+        Inserts the rows into the feature group, which upserts on the primary key.
+        """
+        fs = self.project.get_feature_store()
+        wafer_fg = fs.get_or_create_feature_group(
+            name=self.feature_group_name,
+            version=self.version,
+            description="good_training_data",
+            primary_key=[self.primary_key],
+        )
+        wafer_fg.insert(df)
+
+    def read(self, columns=None, filters=None):
+        """
+        Reads the feature group, pushing the projection and filters into the query.
+        """
+        fs = self.project.get_feature_store()
+        feature_group = fs.get_feature_group(self.feature_group_name, version=self.version)
+        query = feature_group.select(columns) if columns else feature_group.select_all()
+        if filters:
+            operators = {
+                '==': operator.eq, '!=': operator.ne, '<': operator.lt,
+                '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+            }
+            conditions = []
+            for column, op, value in filters:
+                feature = feature_group.get_feature(column)
+                conditions.append(feature.isin(value) if op == 'in' else operators[op](feature, value))
+            query = query.filter(reduce(operator.and_, conditions))
+        return query.read()
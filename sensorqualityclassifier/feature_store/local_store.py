@@ -0,0 +1,198 @@
+import os
+import json
+import shutil
+import uuid
+import zlib
+import numpy as np
+import pandas as pd
+from sensorqualityclassifier.feature_store.base import FeatureStore
+from sensorqualityclassifier.utils.logger import AppLogger
+
+class LocalFeatureStore(FeatureStore):
+    """
+    Feature store backed by partitioned columnar files on the local disk.
+
+    Rows are hashed on the primary key into a fixed number of partitions. Each
+    partition is a directory with one .npy file per column and a metadata.json holding
+    the column order, the row count and min/max statistics of the numeric columns.
+
+    Reads only open the .npy files of the requested and filtered columns (memory-mapped),
+    and skip whole partitions whose min/max statistics cannot satisfy a filter.
+
+    Attributes:
+        root_dir (str): Directory holding the partitions.
+        num_partitions (int): Number of hash partitions of the primary key.
+    """
+
+    OPERATORS = {
+        '==': np.equal, '!=': np.not_equal, '<': np.less,
+        '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal,
+    }
+
+    def __init__(self, root_dir, num_partitions=8):
+        self.root_dir = root_dir
+        self.num_partitions = num_partitions
+        self.logger = AppLogger()
+        os.makedirs(root_dir, exist_ok=True)
+
+    def partition_dir(self, partition):
+        """
+        Returns the directory of a partition.
+        """
+        return os.path.join(self.root_dir, f"part-{partition:04d}")
+
+    def partition_of(self, keys):
+        """
+        Maps primary key values to partition numbers with a stable hash.
+        """
+        return np.array([zlib.crc32(str(key).encode('utf-8')) % self.num_partitions for key in keys])
+
+    def read_metadata(self, partition):
+        """
+        Returns the metadata of a partition, or None if it does not exist.
+        """
+        path = os.path.join(self.partition_dir(partition), 'metadata.json')
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as file:
+            return json.load(file)
+
+    def read_partition(self, partition, columns):
+        """
+        Loads the given columns of a partition as memory-mapped arrays.
+        """
+        partition_dir = self.partition_dir(partition)
+        return {
+            column: np.load(os.path.join(partition_dir, f"{column}.npy"), mmap_mode='r')
+            for column in columns
+        }
+
+    def column_dtypes(self):
+        """
+        Returns the columns of the store and their dtypes, read from the metadata and the
+        .npy headers of the first existing partition, without loading any data. String
+        columns are reported as object, the dtype read() returns them with.
+
+        Returns:
+            dict: Column name to dtype, in column order; empty if the store holds no data.
+        """
+        for partition in range(self.num_partitions):
+            metadata = self.read_metadata(partition)
+            if metadata is None:
+                continue
+            dtypes = {}
+            for column in metadata['columns']:
+                with open(os.path.join(self.partition_dir(partition), f"{column}.npy"), 'rb') as file:
+                    version = np.lib.format.read_magic(file)
+                    if version == (1, 0):
+                        _, _, dtype = np.lib.format.read_array_header_1_0(file)
+                    else:
+                        _, _, dtype = np.lib.format.read_array_header_2_0(file)
+                dtypes[column] = np.dtype(object) if dtype.kind in ('U', 'S') else dtype
+            return dtypes
+        return {}
+
+    def empty_frame(self, columns=None):
+        """
+        Returns an empty DataFrame with the columns and dtypes of the store, restricted
+        to the requested columns.
+        """
+        dtypes = self.column_dtypes()
+        selected = columns or list(dtypes)
+        return pd.DataFrame(
+            {column: pd.Series([], dtype=dtypes.get(column, object)) for column in selected},
+            columns=selected,
+        )
+
+    def write_partition(self, partition, df):
+        """
+        Writes a partition to a new directory and swaps it into place.
+        """
+        partition_dir = self.partition_dir(partition)
+        tmp_dir = f"{partition_dir}.tmp-{uuid.uuid4().hex}"
+        os.makedirs(tmp_dir)
+        stats = {}
+        for column in df.columns:
+            values = df[column].to_numpy()
+            if values.dtype == object:
+                values = values.astype(str)
+            elif np.issubdtype(values.dtype, np.number) and len(values):
+                with np.errstate(all='ignore'):
+                    low, high = np.nanmin(values), np.nanmax(values)
+                if not (np.isnan(low) or np.isnan(high)):
+                    stats[column] = [float(low), float(high)]
+            np.save(os.path.join(tmp_dir, f"{column}.npy"), values)
+        with open(os.path.join(tmp_dir, 'metadata.json'), 'w') as file:
+            json.dump({'columns': list(df.columns), 'rows': len(df), 'stats': stats}, file)
+
+        old_dir = f"{partition_dir}.old-{uuid.uuid4().hex}"
+        if os.path.exists(partition_dir):
+            os.rename(partition_dir, old_dir)
+        os.rename(tmp_dir, partition_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    def upsert(self, df):
+        """
+        Inserts new rows and replaces the rows whose wafer_num already exists. Only the
+        partitions receiving rows are rewritten.
+        """
+        df = df.reset_index(drop=True)
+        partitions = self.partition_of(df[self.primary_key])
+        for partition in np.unique(partitions):
+            new_rows = df[partitions == partition]
+            metadata = self.read_metadata(partition)
+            if metadata is not None:
+                existing = pd.DataFrame(self.read_partition(partition, metadata['columns']))
+                existing = existing[~existing[self.primary_key].isin(new_rows[self.primary_key])]
+                new_rows = pd.concat([existing, new_rows], ignore_index=True)
+            self.write_partition(int(partition), new_rows)
+        self.logger.log_info(f"Upserted {len(df)} rows into {len(np.unique(partitions))} partitions of {self.root_dir}.")
+
+    def may_match(self, metadata, filters):
+        """
+        Uses the min/max statistics of a partition to decide whether any of its rows
+        can satisfy the filters.
+        """
+        for column, op, value in filters:
+            if column not in metadata['columns']:
+                return False
+            if column not in metadata['stats'] or op in ('!=', 'in'):
+                continue
+            low, high = metadata['stats'][column]
+            if (op == '==' and not low <= value <= high) or \
+               (op in ('<', '<=') and not self.OPERATORS[op](low, value)) or \
+               (op in ('>', '>=') and not self.OPERATORS[op](high, value)):
+                return False
+        return True
+
+    def read(self, columns=None, filters=None):
+        """
+        Reads rows with column projection and predicate pushdown. When no row matches,
+        the result is an empty frame with the store's columns and dtypes.
+        """
+        filters = filters or []
+        frames = []
+        for partition in range(self.num_partitions):
+            metadata = self.read_metadata(partition)
+            if metadata is None or not self.may_match(metadata, filters):
+                continue
+            selected = columns or metadata['columns']
+            mask = None
+            if filters:
+                arrays = self.read_partition(partition, {column for column, _, _ in filters})
+                for column, op, value in filters:
+                    if op == 'in':
+                        condition = np.isin(arrays[column], list(value))
+                    else:
+                        condition = self.OPERATORS[op](arrays[column], value)
+                    mask = condition if mask is None else mask & condition
+                if not mask.any():
+                    continue
+            arrays = self.read_partition(partition, selected)
+            frame = pd.DataFrame({
+                column: (values[mask] if mask is not None else values) for column, values in arrays.items()
+            }, columns=selected)
+            frames.append(frame)
+        if not frames:
+            return self.empty_frame(columns)
+        return pd.concat(frames, ignore_index=True)
@@ -1,7 +1,12 @@
 import os
+import json
+import time
 import requests
 import zipfile
+from sensorqualityclassifier.utils.common import file_sha256
+from sensorqualityclassifier.pipeline.data_validation_pipeline import DataValidationPipeline
 from sensorqualityclassifier.utils.logger import AppLogger
+from sensorqualityclassifier.utils.metrics import MetricsRegistry
 import yaml
 
 class DataIngestionPipeline:
@@ -10,12 +15,20 @@ class DataIngestionPipeline:
     unzipping, and saving batch files containing wafer sensor data.
     """
 
-    def __init__(self, config_path='config/config.yml'):
+    def __init__(self, config_path='config/config.yml', schema_path='config/schema_training.json'):
         """
         Initializes the DataIngestionPipeline with the necessary configuration.
         """
+        self.config_path = config_path
+        self.schema_path = schema_path
         self.config = self.read_config(config_path)
         self.logger = AppLogger()
+        self.chunk_size = self.config.get('download_chunk_size', 1 << 20)
+        self.max_retries = self.config.get('download_retries', 3)
+        self.timeout = self.config.get('download_timeout', 30)
+        self.download_stats = {}
+        self.metrics = MetricsRegistry.instance()
+        self.metrics_path = os.path.join(self.config.get('metrics_dir', 'artifacts/metrics'), 'ingestion.json')
         # Ensure the root directory exists
         self.ensure_directory(self.config['root_directory'])
 
@@ -35,24 +48,164 @@ class DataIngestionPipeline:
         """
         os.makedirs(path, exist_ok=True)
 
+    @staticmethod
+    def read_part_meta(meta_path):
+        """
+        Reads the validators (ETag, Last-Modified, total size) recorded for a partial download.
+
+        Returns:
+            dict: The stored validators, or an empty dict if none were recorded.
+        """
+        try:
+            with open(meta_path, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def discard_partial(part_path):
+        """
+        Removes a partial download together with its validators.
+        """
+        for path in (part_path, part_path + '.meta'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def stream_to_file(self, source_url, part_path):
+        """
+        Streams the source URL into part_path in chunks. If part_path already holds the
+        beginning of the file, only the remaining bytes are requested with an HTTP Range
+        header guarded by If-Range, using the ETag or Last-Modified recorded when the
+        partial file was started. A partial file without validators is discarded, and a
+        server that answers a ranged request with the full body (because the object
+        changed or ranges are unsupported) restarts the file from scratch. The final size
+        is checked against the size announced by the server: a short file is kept for
+        the next ranged request, a longer one is removed, and both raise an IOError.
+
+        Parameters:
+            source_url (str): URL of the file to download.
+            part_path (str): Path of the partial download.
+
+        Returns:
+            int: Number of bytes received by this call.
+        """
+        meta_path = part_path + '.meta'
+        meta = self.read_part_meta(meta_path)
+        validator = meta.get('etag') or meta.get('last_modified')
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if offset and not validator:
+            self.logger.log_info("Partial download has no ETag or Last-Modified; restarting.")
+            self.discard_partial(part_path)
+            offset = 0
+        headers = {'Range': f'bytes={offset}-', 'If-Range': validator} if offset else {}
+        with requests.get(source_url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 416:
+                # The partial file should already hold every byte; trust it only if the size matches
+                if meta.get('total') is not None and offset == meta['total']:
+                    return 0
+                self.discard_partial(part_path)
+                raise IOError(f"Range not satisfiable at byte {offset}; discarded the partial download.")
+            response.raise_for_status()
+            if response.status_code != 206:
+                offset = 0
+            content_length = response.headers.get('Content-Length')
+            total = offset + int(content_length) if content_length else None
+            if offset:
+                self.logger.log_info(f"Resuming download at byte {offset}.")
+            else:
+                meta = {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'total': total,
+                }
+                with open(meta_path, 'w') as file:
+                    json.dump(meta, file)
+
+            received = 0
+            next_report = time.perf_counter() + 5
+            with open(part_path, 'ab' if offset else 'wb') as file:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    file.write(chunk)
+                    received += len(chunk)
+                    if time.perf_counter() >= next_report:
+                        done = offset + received
+                        progress = f"{done / total:.1%}" if total else f"{done} bytes"
+                        self.logger.log_info(f"Download progress: {progress}")
+                        next_report = time.perf_counter() + 5
+
+        expected = total if total is not None else meta.get('total')
+        size = os.path.getsize(part_path)
+        if expected is not None and size < expected:
+            # Interrupted transfer, the next attempt resumes from the partial file
+            raise IOError(f"Download stopped at byte {size} of {expected}; keeping the partial file to resume.")
+        if expected is not None and size > expected:
+            self.discard_partial(part_path)
+            raise IOError(f"Downloaded {size} bytes but the server announced {expected}; discarded the partial download.")
+        return received
+
+    def verify_checksum(self, file_path):
+        """
+        Compares the SHA-256 of a file with source_checksum from the configuration.
+
+        Returns:
+            bool: True if they match or no checksum is configured, False otherwise.
+        """
+        expected = self.config.get('source_checksum')
+        if not expected:
+            return True
+        actual = file_sha256(file_path)
+        if actual != expected.lower():
+            self.logger.log_error(f"Checksum mismatch: expected {expected}, got {actual}.")
+            return False
+        self.logger.log_info("Checksum verified.")
+        return True
+
     def download_data(self):
         """
         Downloads the zip file from the source URL specified in the configuration file.
+        The file is streamed to disk, interrupted transfers are resumed with HTTP Range
+        requests and the result is verified against source_checksum when configured.
+
+        Returns:
+            bool: True if the download completed and verified, False otherwise.
         """
         source_url = self.config['source_url']
         zip_path = os.path.join(self.config['root_directory'], 'data.zip')
-        try:
-            self.logger.log_info(f"Downloading data from {source_url}...")
-            response = requests.get(source_url)
+        part_path = zip_path + '.part'
+        start = time.perf_counter()
+        received = 0
+        self.logger.log_info(f"Downloading data from {source_url}...")
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                received += self.stream_to_file(source_url, part_path)
+                break
+            except Exception as e:
+                self.metrics.inc('download_failures', stage='ingestion')
+                self.logger.log_exception(f"Download attempt {attempt} failed: {e}")
+                if attempt == self.max_retries:
+                    return False
+                time.sleep(min(2 ** attempt, 30))
 
-            if response.status_code == 200:
-                with open(zip_path, 'wb') as file:
-                    file.write(response.content)
-                self.logger.log_info("Data download complete.")
-            else:
-                self.logger.log_error(f"Failed to download data. Status code: {response.status_code}")
-        except Exception as e:
-            self.logger.log_exception(f"An exception occurred during data download: {e}")
+        seconds = time.perf_counter() - start
+        self.download_stats = {
+            'bytes': os.path.getsize(part_path),
+            'bytes_received': received,
+            'seconds': seconds,
+            'mb_per_second': received / (1 << 20) / seconds if seconds > 0 else 0.0,
+        }
+        self.metrics.inc('bytes', received, stage='ingestion')
+        self.metrics.observe('download_seconds', seconds, stage='ingestion')
+        self.logger.log_info(
+            f"Received {received} bytes in {seconds:.2f}s "
+            f"({self.download_stats['mb_per_second']:.2f} MB/s)."
+        )
+        if not self.verify_checksum(part_path):
+            self.discard_partial(part_path)
+            return False
+        os.replace(part_path, zip_path)
+        self.discard_partial(part_path)
+        self.logger.log_info("Data download complete.")
+        return True
 
     def unzip_data(self):
         """
@@ -64,7 +217,7 @@ class DataIngestionPipeline:
                 self.logger.log_error(f"Zip file does not exist: {zip_path}")
                 return
 
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref, self.metrics.span('unzip', stage='ingestion'):
                 self.logger.log_info("Unzipping the data...")
                 zip_ref.extractall(self.config['root_directory'])
                 self.logger.log_info("Data unzipping complete.")
@@ -72,12 +225,36 @@ class DataIngestionPipeline:
         except Exception as e:
             self.logger.log_exception(f"An exception occurred during data unzipping: {e}")
 
+    def stream_validate_data(self):
+        """
+        Validates the members of the downloaded zip file straight from the archive,
+        writing accepted members to the training store and quarantining the rest,
+        without extracting the archive to disk.
+        """
+        zip_path = os.path.join(self.config['root_directory'], 'data.zip')
+        try:
+            if not os.path.exists(zip_path):
+                self.logger.log_error(f"Zip file does not exist: {zip_path}")
+                return
+            validator = DataValidationPipeline(config_path=self.config_path, schema_path=self.schema_path)
+            validator.validate_archive(zip_path)
+            os.remove(zip_path)
+        except Exception as e:
+            self.logger.log_exception(f"An exception occurred during archive validation: {e}")
+
     def ingest_data(self):
         """
-        Public method to initiate the data ingestion process.
+        Public method to initiate the data ingestion process. With ingestion_mode set to
+        'stream' the archive is validated member by member instead of being extracted.
         """
-        self.download_data()
-        self.unzip_data()
+        start = time.perf_counter()
+        if self.download_data():
+            if self.config.get('ingestion_mode', 'extract') == 'stream':
+                self.stream_validate_data()
+            else:
+                self.unzip_data()
+        self.metrics.observe('stage_seconds', time.perf_counter() - start, stage='ingestion')
+        self.metrics.write_snapshot(self.metrics_path)
 
 # Example usage
 if __name__ == "__main__":
@@ -1,25 +1,49 @@
 import os
+import time
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
-import hopsworks
 from sensorqualityclassifier.utils.logger import AppLogger
+from sensorqualityclassifier.utils.common import file_sha256, peak_rss_bytes
+from sensorqualityclassifier.feature_store.factory import create_feature_store
+from sensorqualityclassifier.feature_store.delta_pusher import DeltaPusher
+from sensorqualityclassifier.utils.columnar_cache import ColumnarCache
+from sensorqualityclassifier.utils.file_manifest import FileManifest
+from sensorqualityclassifier.utils.metrics import MetricsRegistry
+from sensorqualityclassifier.utils.schema import CompiledSchema
 
 class DataLoadingPipeline:
     """
     A pipeline to load data from CSV files in the good_data_folder, preprocess it,
-    and push it to Hopsworks feature store.
+    and push it to the feature store (Hopsworks or the local backend, see feature_store
+    in config.yml).
     """
     
-    def __init__(self, config_path='config/config.yml', env_path='config/.env'):
+    def __init__(self, config_path='config/config.yml', env_path='config/.env', schema_path='config/schema_training.json'):
         self.logger = AppLogger()
         self.config = self.read_yaml_file(config_path)
+        self.schema = CompiledSchema.load(schema_path)
+        self.float_dtype = np.float32 if self.config.get('training_float32', False) else np.float64
         load_dotenv(dotenv_path=env_path)
         
-        # Hopsworks credentials
-        self.fs_api_key = os.getenv('FS_API_KEY')
-        self.fs_project_name = os.getenv('FS_PROJECT_NAME')
+        # Hopsworks credentials are read from the environment by the hopsworks backend
+        self.feature_store = create_feature_store(self.config)
+        backend = self.config.get('feature_store', 'hopsworks')
+        self.delta_pusher = DeltaPusher(
+            self.feature_store,
+            self.config.get('push_state_path', os.path.join(self.config['artifacts_root'], f'{backend}_push_state.npz')),
+            batch_rows=self.config.get('push_batch_rows', 5000),
+            max_retries=self.config.get('push_retries', 3),
+            backoff_seconds=self.config.get('push_backoff_seconds', 1.0),
+        )
+        self.push_report = {}
+        self.memory_report_stats = {}
         
         self.good_data_folder = self.config['good_data_folder']
+        self.columnar_cache = ColumnarCache.from_config(self.config)
+        self.manifest = FileManifest(self.config.get('manifest_path', os.path.join(self.config['artifacts_root'], 'file_manifest.json')))
+        self.metrics = MetricsRegistry.instance()
+        self.metrics_path = os.path.join(self.config.get('metrics_dir', 'artifacts/metrics'), 'loading.json')
 
     @staticmethod
     def read_yaml_file(file_path):
@@ -32,85 +56,191 @@ class DataLoadingPipeline:
 
     def preprocess_data(self, df):
         """
-         Preprocesses the DataFrame before pushing to Hopsworks:
-        - Renames the first column to 'wafer_num'.
-        - Replaces '-' and '/' with '_' in column names and converts them to lowercase.
-        - Converts all column data types to double except for 'good_bad', which is converted to int.
+        Preprocesses the DataFrame before pushing to the feature store:
+        - Renames the columns to the normalized names of the schema (the first column to
+          'wafer_num', the last one to 'good_bad', sensors like 'Sensor-1' to 'sensor_1').
+        - Reorders the columns by name into schema order if the file has them in another order.
 
         Parameters:
         df (pd.DataFrame): The DataFrame to preprocess.
 
         Returns:
         pd.DataFrame: The preprocessed DataFrame.
+
+        Raises:
+            ValueError: If the columns do not match the schema.
         """
+        plan = self.schema.header_plan(df.columns)
+        if not plan['complete']:
+            raise ValueError("Columns do not match the schema.")
+        df.columns = plan['names']
+        if not plan['in_schema_order']:
+            df = df.iloc[:, plan['schema_order']]
+        return df
 
-        new_columns = df.columns.tolist()
-        new_columns[0] = 'wafer_num'
-        df.columns = new_columns
-        df.columns = [col.replace('-', '_').replace('/', '_').lower() for col in df.columns]
+    def convert_batch(self, df, file_name=None):
+        """
+        Preprocesses one batch file and converts it to the column types of the schema's
+        ColName map: varchar columns to str, Integer columns to int and float columns to
+        float64, or float32 when training_float32 is enabled.
+        All float columns are converted in one vectorized step into a single block.
 
-        return df
+        Rows missing a value in a varchar or Integer column (wafer_num, good_bad) are
+        dropped with a warning naming the file, since casting a missing label to int
+        would silently turn it into a valid-looking number.
 
-    def push_data_to_hopsworks(self, df):
+        Parameters:
+            df (pd.DataFrame): The batch file as loaded from the columnar cache.
+            file_name (str): Name of the batch file, used in log messages.
+
+        Returns:
+            pd.DataFrame: The typed batch.
         """
-        Pushes preprocessed DataFrame to Hopsworks feature store.
+        df = self.preprocess_data(df)
+        # Columns are in schema order after preprocess_data
+        column_types = self.schema.column_types
+        key_values = {}
+        missing = np.zeros(len(df), dtype=bool)
+        for col, col_type in zip(df.columns, column_types):
+            if col_type == 'integer':
+                values = pd.to_numeric(df[col], errors='coerce')
+                missing |= values.isna().to_numpy()
+            elif col_type != 'float':
+                values = df[col].astype(str)
+                # The columnar cache stores missing strings as 'nan'
+                missing |= (df[col].isna() | values.str.strip().isin(['', 'nan'])).to_numpy()
+            else:
+                continue
+            key_values[col] = values
+        if missing.any():
+            self.logger.log_warning(
+                f"Dropping {int(missing.sum())} of {len(df)} rows of {file_name or 'batch'} "
+                f"with a missing {'/'.join(key_values)} value."
+            )
+            self.metrics.inc('rows_dropped', int(missing.sum()), stage='loading')
+            keep = ~missing
+            df = df[keep]
+            key_values = {col: values[keep] for col, values in key_values.items()}
+
+        float_columns = [col for col, col_type in zip(df.columns, column_types) if col_type == 'float']
+        float_frame = df[float_columns]
+        if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in float_frame.dtypes):
+            float_frame = float_frame.apply(pd.to_numeric, errors='coerce')
+        converted = pd.DataFrame(float_frame.to_numpy(dtype=self.float_dtype), columns=float_columns)
+        for position, (col, col_type) in enumerate(zip(df.columns, column_types)):
+            if col_type == 'integer':
+                converted.insert(position, col, key_values[col].to_numpy().astype(int))
+            elif col_type != 'float':
+                converted.insert(position, col, key_values[col].to_numpy())
+        return converted
+
+    def memory_report(self, df):
+        """
+        Summarizes the memory used by the combined DataFrame and the process.
+
+        Returns:
+            dict: Total and per-column bytes by dtype and the peak RSS of the process.
+        """
+        column_bytes = df.memory_usage(index=False, deep=True)
+        by_dtype = {}
+        for col, size in column_bytes.items():
+            dtype = str(df[col].dtype)
+            by_dtype.setdefault(dtype, {'columns': 0, 'bytes': 0})
+            by_dtype[dtype]['columns'] += 1
+            by_dtype[dtype]['bytes'] += int(size)
+        for stats in by_dtype.values():
+            stats['bytes_per_column'] = stats['bytes'] // stats['columns']
+        return {
+            'rows': len(df),
+            'total_bytes': int(column_bytes.sum()),
+            'by_dtype': by_dtype,
+            'peak_rss_bytes': peak_rss_bytes(),
+        }
+
+    def push_data_to_feature_store(self, df):
+        """
+        Pushes the new or changed rows of a preprocessed DataFrame to the configured
+        feature store, in bounded-size batches.
         """
         try:
-            self.logger.log_info(f"push_data_to_hopsworks_shape={df.shape}")
-            self.logger.log_info(f"push_data_to_hopsworks_head={df.head()}")
-            project = hopsworks.login(api_key_value=self.fs_api_key, project=self.fs_project_name)
-            fs = project.get_feature_store() 
-
-            wafer_fg = fs.get_or_create_feature_group(
-                name="wafer_project",
-                version=1,
-                description="good_training_data",
-                primary_key=["wafer_num"],
-            )
-            wafer_fg.insert(df)
+            self.logger.log_info(f"push_data_to_feature_store_shape={df.shape}")
+            self.push_report = self.delta_pusher.push(df)
+            self.metrics.observe('push_seconds', self.push_report['seconds'], stage='loading')
+            self.metrics.inc('rows_pushed', self.push_report['rows_sent'], stage='loading')
+            self.metrics.inc('bytes_pushed', self.push_report['bytes_sent'], stage='loading')
+            self.metrics.inc('push_retries', self.push_report['retries'], stage='loading')
             return True
         except Exception as e:
-            self.logger.log_exception(f"Failed to push data to Hopsworks: {e}")
+            self.logger.log_exception(f"Failed to push data to the feature store: {e}")
             return False
 
-    def load_and_push_data(self):
+    def load_and_push_data(self, full_reload=False):
+        """
+        Loads data from the new or changed CSV files in good_data_folder, aggregates it into
+        a single DataFrame, preprocesses, and pushes it to the feature store. Files already loaded
+        with the same content are skipped, according to the file manifest.
+
+        Parameters:
+            full_reload (bool): Load every file regardless of the manifest.
+        """
+        start = time.perf_counter()
+        try:
+            self.load_files_and_push(full_reload)
+        finally:
+            self.metrics.observe('stage_seconds', time.perf_counter() - start, stage='loading')
+            self.metrics.write_snapshot(self.metrics_path)
+
+    def load_files_and_push(self, full_reload):
         """
-        Loads data from all CSV files in good_data_folder, aggregates it into a single DataFrame,
-        preprocesses, and pushes it to Hopswork
+        Loads the new or changed files and pushes them, see load_and_push_data.
         """
         all_data_frames = []  # List to store individual data frames for each file
+        loaded_files = []
+        skipped_files = 0
         
-        for filename in os.listdir(self.good_data_folder):
+        for filename in sorted(os.listdir(self.good_data_folder)):
             if filename.endswith('.csv'):
                 file_path = os.path.join(self.good_data_folder, filename)
+                entry = self.manifest.get_unchanged(filename, file_path)
+                if not full_reload and entry is not None and entry.get('loaded'):
+                    skipped_files += 1
+                    self.metrics.inc('files', stage='loading', status='unchanged')
+                    continue
                 try:
-                    df = pd.read_csv(file_path)
-                    all_data_frames.append(df)
-                    self.logger.log_info(f"Successfully loaded {filename} for preprocessing.")
+                    with self.metrics.span('file', stage='loading'):
+                        # Parsed once per file content, later runs read the cached columns
+                        key = (entry or {}).get('sha256') or file_sha256(file_path)
+                        df = self.columnar_cache.load_csv(file_path, key=key)
+                        all_data_frames.append(self.convert_batch(df, file_name=filename))
+                    loaded_files.append((filename, file_path, key))
+                    self.metrics.inc('files', stage='loading', status='loaded')
+                    self.metrics.inc('rows', len(df), stage='loading')
+                    self.metrics.inc('bytes', os.path.getsize(file_path), stage='loading')
+                    self.logger.log_info("Successfully loaded %s for preprocessing.", filename)
                 except Exception as e:
+                    self.metrics.inc('files', stage='loading', status='failed')
                     self.logger.log_exception(f"Error loading {filename}: {e}")
 
+        self.logger.log_info(f"Skipped {skipped_files} unchanged files already loaded.")
+        self.logger.log_info(f"Columnar cache: hits={self.columnar_cache.stats['hits']} misses={self.columnar_cache.stats['misses']}")
+
         # Concatenate all data frames if not empty
         if all_data_frames:
+            # Batches are already typed, so the concatenation stays homogeneous
             combined_df = pd.concat(all_data_frames, ignore_index=True)
-            combined_df = self.preprocess_data(combined_df)  # Preprocess the combined data frame
-
-            # Convert all column data types except 'good_bad'
-            for col in combined_df.columns:
-                if col== 'wafer_num':
-                    combined_df[col] = combined_df[col].astype(str)
-                elif col == 'good_bad':
-                    combined_df[col] = combined_df[col].astype(int)
-                else:
-                    combined_df[col] = pd.to_numeric(combined_df[col], errors='coerce').astype('float64')
-            self.logger.log_info(combined_df.head())
-            self.logger.log_info(combined_df.shape)
-            if self.push_data_to_hopsworks(combined_df):
-                self.logger.log_info("All data successfully pushed to Hopsworks.")
+            del all_data_frames
+            self.memory_report_stats = self.memory_report(combined_df)
+            self.logger.log_info("Combined data shape=%s, total_bytes=%d", combined_df.shape, self.memory_report_stats['total_bytes'])
+            self.logger.log_debug("Memory report: %s", self.memory_report_stats)
+            if self.push_data_to_feature_store(combined_df):
+                for filename, file_path, key in loaded_files:
+                    self.manifest.mark_loaded(filename, file_path, sha256=key)
+                self.manifest.save()
+                self.logger.log_info("All data successfully pushed to the feature store.")
             else:
-                self.logger.log_error("Failed to push data to Hopsworks.")
+                self.logger.log_error("Failed to push data to the feature store.")
         else:
-            self.logger.log_info("No data files found for processing.")
+            self.logger.log_info("No new data files found for processing.")
 
 # Example usage
 if __name__ == "__main__":
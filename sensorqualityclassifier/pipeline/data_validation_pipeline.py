@@ -1,8 +1,17 @@
 import os
-import pandas as pd
-import re
+import io
+import csv
 import json
+import time
+import hashlib
+import zipfile
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from sensorqualityclassifier.utils.logger import AppLogger
+from sensorqualityclassifier.utils.file_manifest import FileManifest
+from sensorqualityclassifier.utils.columnar_cache import ColumnarCache
+from sensorqualityclassifier.utils.metrics import MetricsRegistry
+from sensorqualityclassifier.utils.schema import CompiledSchema
 
 class DataValidationPipeline:
     """
@@ -11,11 +20,16 @@ class DataValidationPipeline:
 
     Attributes:
         config (dict): Configuration settings loaded from a YAML file.
-        schema (dict): Validation schema loaded from a JSON file.
+        schema (CompiledSchema): Compiled validation schema, shared with the other pipelines.
         logger (AppLogger): Logger for logging information and errors.
         good_data_folder (str): Path to folder for valid files.
         bad_data_folder (str): Path to folder for invalid files.
         training_batch_files_dir (str): Directory containing the training batch files.
+        file_name_pattern (re.Pattern): Compiled file name pattern derived from the schema.
+        n_workers (int): Number of threads validating files concurrently.
+        manifest (FileManifest): Record of already validated files, used to skip unchanged files.
+        columnar_cache (ColumnarCache): Training store that accepted archive members are converted into.
+        metrics (MetricsRegistry): Receives per-file and per-run timings and file counters.
     """
 
     def __init__(self, config_path='config/config.yml', schema_path='config/schema_training.json'):
@@ -27,12 +41,19 @@ class DataValidationPipeline:
             schema_path (str): Path to the JSON schema file.
         """
         self.config = self.read_yaml_file(config_path)
-        self.schema = self.read_json_file(schema_path)
+        self.schema = CompiledSchema.load(schema_path)
         self.logger = AppLogger()
         self.good_data_folder = self.config['good_data_folder']
         self.bad_data_folder = self.config['bad_data_folder']
         #self.training_batch_files_dir = self.config['unzip_dir']
         self.training_batch_files_dir = os.path.join(self.config['unzip_dir'], "Training_Batch_Files")
+        self.file_name_pattern = self.schema.file_name_pattern
+        self.n_workers = self.config.get('validation_workers', 8)
+        self.report_path = os.path.join(self.config['artifacts_root'], 'validation_report.json')
+        self.manifest = FileManifest(self.config.get('manifest_path', os.path.join(self.config['artifacts_root'], 'file_manifest.json')))
+        self.columnar_cache = ColumnarCache.from_config(self.config)
+        self.metrics = MetricsRegistry.instance()
+        self.metrics_path = os.path.join(self.config.get('metrics_dir', 'artifacts/metrics'), 'validation.json')
         self.ensure_directory(self.good_data_folder)
         self.ensure_directory(self.bad_data_folder)
 
@@ -85,27 +106,35 @@ class DataValidationPipeline:
         Returns:
             bool: True if the file name is valid, False otherwise.
         """
-        pattern = self.schema['SampleFileName']
-        date_length = self.schema['LengthOfDateStampInFile']
-        time_length = self.schema['LengthOfTimeStampInFile']
-        regex = '[Ww]afer_' + '\d{' + str(date_length) + '}' + '_' + '\d{' + str(time_length) + '}\.csv$'
-        #regex ="['wafer']+['\_'']+[\d_]+[\d]+\.csv"
-        print(f"file name={file_name} regex= {regex}")
-        return bool(re.match(regex, file_name))
+        return bool(self.file_name_pattern.match(file_name))
     
+    def validate_header(self, header):
+        """
+        Validates a parsed header row: it must hold exactly the columns of the schema
+        (matched by name, in any order) and the label column.
+
+        Parameters:
+            header (list): Column names of the file.
+
+        Returns:
+            bool: True if the columns are valid, False otherwise.
+        """
+        return self.schema.validate_header(header)
+
     def validate_columns(self, file_path):
         """
-        Validates the number of columns in a file against the expected number.
+        Validates the columns of a file against the schema.
+        Only the header row is read, the body of the file is never parsed.
 
         Parameters:
             file_path (str): Path to the file to validate.
 
         Returns:
-            bool: True if the number of columns is valid, False otherwise.
+            bool: True if the columns are valid, False otherwise.
         """
-        expected_num_columns = self.schema['NumberofColumns']
-        df = pd.read_csv(file_path)
-        return df.shape[1] == expected_num_columns
+        with open(file_path, 'r', newline='') as file:
+            header = next(csv.reader(file), [])
+        return self.validate_header(header)
 
     def move_file(self, file_path, destination_folder):
         """
@@ -120,24 +149,192 @@ class DataValidationPipeline:
         except Exception as e:
             self.logger.log_exception(f"Error moving file {file_path} to {destination_folder}: {e}")
 
-    def validate_and_move_files(self):
+    def validate_file(self, file):
+        """
+        Validates a single file and moves it to the good or bad data folder.
+
+        Parameters:
+            file (str): Name of the file in the training batch directory.
+
+        Returns:
+            dict: Validation report entry with the verdict, reason and timing.
+        """
+        start = time.perf_counter()
+        file_path = os.path.join(self.training_batch_files_dir, file)
+        file_bytes = os.path.getsize(file_path)
+        reason = None
+        entry = self.manifest.get_unchanged(file, file_path)
+        if entry is not None:
+            # Same content as an already validated file, reuse its verdict
+            reason = entry['reason']
+        else:
+            try:
+                if not self.validate_file_name(file):
+                    reason = 'file name validation failure'
+                elif not self.validate_columns(file_path):
+                    reason = 'column validation failure'
+            except Exception as e:
+                reason = f'unreadable file: {e}'
+            self.manifest.record_validation(file, file_path, reason is None, reason)
+
+        if reason is None:
+            self.move_file(file_path, self.good_data_folder)
+            self.logger.log_info("File %s moved to Good_Data_Folder.", file)
+        else:
+            self.move_file(file_path, self.bad_data_folder)
+            self.logger.log_info("File %s moved to Bad_Data_Folder due to %s.", file, reason)
+        return self.record_entry({
+            'file': file,
+            'valid': reason is None,
+            'reason': reason,
+            'skipped': entry is not None,
+            'bytes': file_bytes,
+            'seconds': time.perf_counter() - start,
+        })
+
+    def record_entry(self, entry):
+        """
+        Adds a validation report entry to the file counters and the per-file latency histogram.
+        """
+        status = 'good' if entry['valid'] else 'bad'
+        self.metrics.inc('files', stage='validation', status=status, unchanged=entry['skipped'])
+        self.metrics.inc('bytes', entry['bytes'], stage='validation')
+        self.metrics.observe('file_seconds', entry['seconds'], stage='validation')
+        return entry
+
+    def write_report(self, report):
+        """
+        Writes the per-file validation report as JSON, along with the metrics snapshot.
+        """
+        self.ensure_directory(os.path.dirname(self.report_path))
+        with open(self.report_path, 'w') as file:
+            json.dump(report, file, indent=2)
+        self.metrics.observe('stage_seconds', report['wall_seconds'], stage='validation')
+        self.metrics.write_snapshot(self.metrics_path)
+
+    def validate_and_move_files(self, n_workers=None):
         """
         Validates files in the training batch directory and moves them to either
-        the good or bad data folder based on the validation outcome.
-        """
-        files = os.listdir(self.training_batch_files_dir)
-        for file in files:
-            file_path = os.path.join(self.training_batch_files_dir, file)
-            if self.validate_file_name(file):
-                if self.validate_columns(file_path):
-                    self.move_file(file_path, self.good_data_folder)
-                    self.logger.log_info(f"File {file} moved to Good_Data_Folder.")
-                else:
-                    self.move_file(file_path, self.bad_data_folder)
-                    self.logger.log_info(f"File {file} moved to Bad_Data_Folder due to column validation failure.")
-            else:
-                self.move_file(file_path, self.bad_data_folder)
-                self.logger.log_info(f"File {file} moved to Bad_Data_Folder due to file name validation failure.")
+        the good or bad data folder based on the validation outcome. Files are
+        validated concurrently by a pool of threads.
+
+        Parameters:
+            n_workers (int): Number of threads, defaults to validation_workers
+                from the configuration.
+
+        Returns:
+            dict: Summary and per-file timing report of the run.
+        """
+        if n_workers is None:
+            n_workers = self.n_workers
+        start = time.perf_counter()
+        files = sorted(os.listdir(self.training_batch_files_dir))
+        with ThreadPoolExecutor(max_workers=max(1, n_workers)) as executor:
+            entries = list(executor.map(self.validate_file, files))
+
+        self.manifest.save()
+
+        report = {
+            'files': len(entries),
+            'skipped': sum(entry['skipped'] for entry in entries),
+            'good': sum(entry['valid'] for entry in entries),
+            'bad': sum(not entry['valid'] for entry in entries),
+            'wall_seconds': time.perf_counter() - start,
+            'file_seconds': sum(entry['seconds'] for entry in entries),
+            'entries': entries,
+        }
+        self.write_report(report)
+        self.logger.log_info(
+            f"Validated {report['files']} files in {report['wall_seconds']:.3f}s "
+            f"(good={report['good']}, bad={report['bad']}, unchanged={report['skipped']}, workers={n_workers})."
+        )
+        return report
+
+    def validate_member(self, file, data):
+        """
+        Validates one archive member held in memory and writes it to the good data
+        folder (also converting it into the columnar training store) or quarantines it
+        in the bad data folder.
+
+        Parameters:
+            file (str): File name of the member.
+            data (bytes): Content of the member.
+
+        Returns:
+            dict: Validation report entry with the verdict, reason and timing.
+        """
+        start = time.perf_counter()
+        sha256 = hashlib.sha256(data).hexdigest()
+        entry = self.manifest.get_entry(file)
+        skipped = entry is not None and entry.get('sha256') == sha256
+        if skipped:
+            reason = entry['reason']
+        elif not self.validate_file_name(file):
+            reason = 'file name validation failure'
+        else:
+            first_line = data.split(b'\n', 1)[0].decode('utf-8-sig', errors='replace')
+            header = next(csv.reader([first_line]), [])
+            reason = None if self.validate_header(header) else 'column validation failure'
+
+        destination_folder = self.good_data_folder if reason is None else self.bad_data_folder
+        destination_path = os.path.join(destination_folder, file)
+        if not (skipped and os.path.exists(destination_path)):
+            with open(destination_path, 'wb') as output:
+                output.write(data)
+            if reason is None and not self.columnar_cache.contains(sha256):
+                self.columnar_cache.put(sha256, pd.read_csv(io.BytesIO(data)))
+        if not skipped:
+            self.manifest.record_validation(file, destination_path, reason is None, reason, sha256=sha256)
+        self.logger.log_info("Archive member %s written to %s%s.", file, destination_folder, f" due to {reason}" if reason else "")
+        return self.record_entry({
+            'file': file,
+            'valid': reason is None,
+            'reason': reason,
+            'skipped': skipped,
+            'bytes': len(data),
+            'seconds': time.perf_counter() - start,
+        })
+
+    def validate_archive(self, zip_path):
+        """
+        Validates the CSV members of a zip archive without extracting it to disk. Each
+        member is read from the archive once, checked against the file name and header
+        rules of the schema and written straight to the good or bad data folder.
+
+        Parameters:
+            zip_path (str): Path to the zip archive.
+
+        Returns:
+            dict: Summary and per-file timing report of the run.
+        """
+        start = time.perf_counter()
+        entries = []
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            for info in zip_ref.infolist():
+                if info.is_dir():
+                    continue
+                file = os.path.basename(info.filename)
+                try:
+                    entries.append(self.validate_member(file, zip_ref.read(info)))
+                except Exception as e:
+                    self.logger.log_exception(f"Error validating archive member {info.filename}: {e}")
+        self.manifest.save()
+
+        report = {
+            'files': len(entries),
+            'skipped': sum(entry['skipped'] for entry in entries),
+            'good': sum(entry['valid'] for entry in entries),
+            'bad': sum(not entry['valid'] for entry in entries),
+            'wall_seconds': time.perf_counter() - start,
+            'file_seconds': sum(entry['seconds'] for entry in entries),
+            'entries': entries,
+        }
+        self.write_report(report)
+        self.logger.log_info(
+            f"Validated {report['files']} archive members in {report['wall_seconds']:.3f}s "
+            f"(good={report['good']}, bad={report['bad']}, unchanged={report['skipped']})."
+        )
+        return report
 
 # Example usage
 if __name__ == "__main__":
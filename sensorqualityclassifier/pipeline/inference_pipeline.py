@@ -1,13 +1,46 @@
 import os
-from re import A
-from sre_constants import SUCCESS
+import csv
+import io
+import time
+import numpy as np
 import pandas as pd
-from dotenv import load_dotenv
 from sensorqualityclassifier.utils.logger import AppLogger
-from sensorqualityclassifier.pipeline.data_transform_and_loading_pipeline import DataLoadingPipeline
-from sensorqualityclassifier.pipeline.data_validation_pipeline import DataValidationPipeline
+from sensorqualityclassifier.utils.model_registry import ModelRegistry
+from sensorqualityclassifier.utils.metrics import MetricsRegistry
+from sensorqualityclassifier.utils.native_model import NativeModel
+from sensorqualityclassifier.utils.schema import CompiledSchema
+from sensorqualityclassifier.utils.tree_ensemble import CompiledTreeEnsemble
 import json
-import joblib
+
+# Inference must stay importable without the feature store, training or validation
+# modules; optional heavy modules (the prediction cache's SQLite, the process pool)
+# are imported by the code paths that use them.
+
+# Pipeline owned by each worker process of the parallel scoring pool
+_worker_pipeline = None
+
+def _init_worker(config_path, schema_path):
+    """
+    Builds one InferencePipeline per worker process, so the model is loaded once per worker.
+    """
+    global _worker_pipeline
+    _worker_pipeline = InferencePipeline(config_path=config_path, schema_path=schema_path)
+
+def _score_file(file_path):
+    """
+    Scores a single file inside a worker process.
+
+    Returns:
+        tuple: The predicted labels and the prediction cache hits and misses of the file.
+    """
+    cache = _worker_pipeline.prediction_cache
+    if cache is not None:
+        cache.reset_stats()
+    labels = _worker_pipeline.score_file(file_path)
+    if cache is not None:
+        # Worker processes exit without running atexit handlers
+        cache.flush()
+    return labels, dict(cache.stats) if cache is not None else None
 
 class InferencePipeline:
     """
@@ -17,11 +50,27 @@ class InferencePipeline:
 
     def __init__(self, config_path='config/config.yml',schema_path='config/schema_training.json'):
         self.logger = AppLogger()
+        self.config_path = config_path
+        self.schema_path = schema_path
         self.config = self.read_yaml_file(config_path)      
-        self.schema = self.read_json_file(schema_path)
+        self.schema = CompiledSchema.load(schema_path)
         self.prediction_dir = self.config['prediction_dir']
         self.output_dir= self.config['output_dir']
-        self.model_path=self.config['load_model']
+        self.model_path = self.resolve_model_path(self.config['load_model'])
+        self.n_workers = self.config.get('inference_workers', 1)
+        self.chunksize = self.config.get('inference_chunksize')
+        self.prediction_backend = self.config.get('prediction_backend', 'xgboost')
+        self.model_registry = ModelRegistry.instance()
+        self.metrics = MetricsRegistry.instance()
+        self.prediction_cache = None
+        if self.config.get('prediction_cache', True):
+            from sensorqualityclassifier.utils.prediction_cache import PredictionCache
+            self.prediction_cache = PredictionCache.shared(
+                self.config.get('prediction_cache_path', 'artifacts/prediction_cache.sqlite'),
+                memory_rows=self.config.get('prediction_cache_memory_rows', 100000),
+                max_disk_rows=self.config.get('prediction_cache_max_rows', 1000000),
+            )
+        self.metrics_path = os.path.join(self.config.get('metrics_dir', 'artifacts/metrics'), 'inference.json')
         self.ensure_directory(self.config['output_dir'])
 
     @staticmethod
@@ -54,69 +103,485 @@ class InferencePipeline:
         with open(file_path, 'r') as file:
             return json.load(file)
         
-    def validate_columns(self, file_path):
+    @staticmethod
+    def read_header(file_path):
         """
-        Validates the number of columns in a file against the expected number.
+        Reads only the header row of a CSV file.
+
+        Parameters:
+            file_path (str): Path to the CSV file.
+
+        Returns:
+            list: Column names found in the header, empty if the file is empty.
+        """
+        with open(file_path, 'r', newline='') as file:
+            return next(csv.reader(file), [])
+
+    def validate_columns(self, file_path, header=None):
+        """
+        Validates the columns of a file against the schema: every sensor, matched by name,
+        and no label column. Only the header row is read, the body is left for
+        read_prediction_file.
 
         Parameters:
             file_path (str): Path to the file to validate.
+            header (list): Already parsed header row, read from file_path if None.
+
+        Returns:
+            bool: True if the columns are valid, False otherwise.
+        """
+        if header is None:
+            header = self.read_header(file_path)
+        if not self.schema.validate_header(header, labelled=False):
+            self.logger.log_info("%s has %d columns, expected the %d columns of the schema.", file_path, len(header), self.schema.prediction_columns)
+            return False
+        return True
+
+    def prepare_features(self, df, source=''):
+        """
+        Turns raw sensor columns into model-ready features: fills NaN values with 0
+        and normalizes the column names the same way the training data was.
+
+        Parameters:
+            df (pd.DataFrame): Sensor columns without the wafer column.
+            source (str): Where the rows came from, used for logging.
 
         Returns:
-            bool: True if the number of columns is valid, False otherwise.
+            pd.DataFrame: The prepared DataFrame.
+        """
+        nan_cells = int(df.isna().sum().sum())
+        if nan_cells:
+            self.logger.log_debug("Filling %d NaN values with 0 in %s.", nan_cells, source)
+            self.metrics.inc('nan_cells_filled', nan_cells, stage='inference')
+            df.fillna(0, inplace=True)
+        df.columns = [self.normalize_column_name(col) for col in df.columns]
+        return df
+
+    @staticmethod
+    def normalize_column_name(col):
+        """
+        Normalizes a raw column name ('Sensor-1', 'Sensor - 1', 'Good/Bad') to the
+        feature name used by the model ('sensor_1', 'good_bad').
+        """
+        return CompiledSchema.normalize_column_name(col)
+
+    @property
+    def feature_names(self):
+        """
+        Model feature names in schema order, i.e. every column except the wafer and output.
+        """
+        return self.schema.sensor_names
+
+    def read_feature_list(self, model):
+        """
+        Returns the sensors the model expects, in order: the feature_list.json saved next
+        to the model by the training pipeline, else the feature names stored in the model,
+        else every sensor of the schema.
+        """
+        feature_list_path = os.path.join(os.path.dirname(self.model_path), 'feature_list.json')
+        if os.path.exists(feature_list_path):
+            features = self.read_json_file(feature_list_path).get('features')
+            if features:
+                return features
+        booster = model.get_booster() if hasattr(model, 'get_booster') else None
+        if booster is not None and booster.feature_names:
+            return list(booster.feature_names)
+        return self.feature_names
+
+    def model_feature_names(self):
+        """
+        Sensors fed to the current model, cached with the model in the registry.
+        """
+        return self.model_registry.get_derived(self.model_path, 'feature_list', self.read_feature_list)
+
+    def select_model_features(self, df, feature_names=None):
+        """
+        Orders prepared columns as the model expects, adding any missing sensor as zeros.
         """
-        self.logger.log_info("-----------inside validation-----------")
-        expected_num_columns = self.schema['NumberofColumns'] -1
-        df = pd.read_csv(file_path)
-        self.logger.log_info(f"========file column size{df.shape[1]}")
-        self.logger.log_info(f"========exp no. of columns{expected_num_columns}")
-        return df.shape[1] == expected_num_columns
+        feature_names = feature_names or self.model_feature_names()
+        if list(df.columns) != feature_names:
+            df = df.reindex(columns=feature_names, fill_value=0)
+        return df
+
+    def align_features(self, df, source=''):
+        """
+        Prepares rows that did not come from a prediction file (e.g. JSON records):
+        drops columns that are not used by the model, orders the sensors as the model
+        expects and casts them to float32.
+
+        Parameters:
+            df (pd.DataFrame): Rows keyed by raw or normalized column names.
+            source (str): Where the rows came from, used for logging.
+
+        Returns:
+            pd.DataFrame: Model-ready features.
+
+        Raises:
+            ValueError: If any sensor used by the model is missing.
+        """
+        df = df.rename(columns=self.normalize_column_name)
+        feature_names = self.model_feature_names()
+        missing = [col for col in feature_names if col not in df.columns]
+        if missing:
+            raise ValueError(f"{len(missing)} sensor columns are missing, e.g. {missing[:5]}")
+        df = df[feature_names].apply(pd.to_numeric, errors='coerce').astype(np.float32)
+        return self.prepare_features(df, source)
+
+    def read_prediction_file(self, file_path, chunksize=None):
+        """
+        Validates the header of a prediction file and parses its body once with
+        schema-typed columns. The wafer column is never materialized.
+
+        Parameters:
+            file_path (str): Path to the prediction CSV file.
+            chunksize (int): If set, rows are read lazily in chunks of this size.
+
+        Returns:
+            pd.DataFrame: Model-ready features, an iterator of such DataFrames when
+            chunksize is set, or None if the header is invalid.
+        """
+        header = self.read_header(file_path)
+        if not self.validate_columns(file_path, header):
+            return None
+        return self.parse_prediction_csv(file_path, header, chunksize=chunksize, source=file_path)
+
+    def parse_prediction_csv(self, file_path_or_buffer, header, chunksize=None, source=''):
+        """
+        Parses the body of an already validated prediction CSV with schema-typed columns.
+        Only the sensors used by the model are parsed (usecols), float sensors as float32,
+        the precision XGBoost predicts with anyway. The columns to parse are matched by
+        name once per distinct header and model.
+
+        Parameters:
+            file_path_or_buffer (str or file-like): CSV path or in-memory buffer.
+            header (list): Column names of the CSV.
+            chunksize (int): If set, rows are read lazily in chunks of this size.
+            source (str): Where the rows came from, used for logging.
+
+        Returns:
+            pd.DataFrame: Model-ready features, or an iterator of them when chunksize is set.
+        """
+        feature_names = self.model_feature_names()
+        usecols, dtype_map = self.schema.read_spec(header, feature_names, float_dtype=np.float32)
+        reader = pd.read_csv(
+            file_path_or_buffer,
+            usecols=usecols,
+            dtype=dtype_map,
+            chunksize=chunksize,
+        )
+        if chunksize is None:
+            return self.select_model_features(self.prepare_features(reader, source), feature_names)
+        return (self.select_model_features(self.prepare_features(chunk, source), feature_names) for chunk in reader)
+
+    def resolve_model_path(self, model_path):
+        """
+        Returns the native model manifest saved next to model_path when it exists and is
+        at least as recent as the pickle (and prefer_native_model is enabled), otherwise
+        model_path itself.
+        """
+        manifest_path = NativeModel.manifest_path_for(model_path)
+        if self.config.get('prefer_native_model', True) and os.path.exists(manifest_path):
+            if not os.path.exists(model_path) or os.path.getmtime(manifest_path) >= os.path.getmtime(model_path):
+                return manifest_path
+        return model_path
+
+    def load_model(self):
+        """
+        Returns the model from the process-wide registry, so the artifact is
+        deserialized once per process instead of once per file. With the 'numpy'
+        prediction backend, the trees compiled into NumPy arrays are returned instead.
+        """
+        if self.prediction_backend == 'numpy':
+            return self.model_registry.get_derived(self.model_path, 'numpy_backend', CompiledTreeEnsemble.from_model)
+        return self.model_registry.get_model(self.model_path)
+
+    def log_model_stats(self):
+        """
+        Logs load time and cache hits of the model artifact used by this pipeline.
+        """
+        stats = self.model_registry.get_stats().get(os.path.abspath(self.model_path))
+        if stats is not None:
+            self.logger.log_info(
+                f"Model cache: loads={stats['loads']} hits={stats['hits']} "
+                f"last_load_seconds={stats['last_load_seconds']:.4f}"
+            )
     
 
-    def run_inference(self):
-        
+    def count_predictions(self, labels):
+        """
+        Adds predicted labels to the scored row and good/bad wafer counters.
+        """
+        labels = np.asarray(labels)
+        self.metrics.inc('rows', len(labels), stage='inference')
+        self.metrics.inc('wafers', int(np.count_nonzero(labels == 1)), stage='inference', label='good')
+        self.metrics.inc('wafers', int(np.count_nonzero(labels == -1)), stage='inference', label='bad')
+
+    def timed_predict(self, model, features):
+        """
+        Predicts labels, recording the predict latency and the prediction counters.
+        """
+        with self.metrics.span('predict', backend=self.prediction_backend):
+            labels = model.predict(features)
+        self.count_predictions(labels)
+        return labels
+
+    def predict_labels(self, model, features):
+        """
+        Predicts labels through the prediction cache: rows already scored by the current
+        model version are answered from the cache and only the misses go to the model.
+
+        Parameters:
+            model (object): Model to predict with.
+            features (pd.DataFrame): Model-ready features.
+
+        Returns:
+            np.ndarray: Predicted labels, in the order of the rows.
+        """
+        if self.prediction_cache is None or len(features) == 0:
+            return self.timed_predict(model, features)
+        model_version = self.model_registry.get_version(self.model_path)
+        hashes = self.prediction_cache.row_hashes(features)
+        labels, hits = self.prediction_cache.lookup(model_version, hashes)
+        n_hits = int(hits.sum())
+        self.metrics.inc('prediction_cache', n_hits, result='hit')
+        self.metrics.inc('prediction_cache', len(hits) - n_hits, result='miss')
+        if n_hits == len(hits):
+            self.count_predictions(labels)
+            return labels
+        missed = self.timed_predict(model, features[~hits])
+        self.prediction_cache.store(model_version, hashes[~hits], missed)
+        if n_hits == 0:
+            return missed
+        self.count_predictions(labels[hits])
+        labels[~hits] = missed
+        return labels
+
+    def log_cache_stats(self):
+        """
+        Commits pending prediction cache writes and logs the hit rate of the current run.
+        """
+        if self.prediction_cache is not None:
+            self.prediction_cache.flush()
+            stats = self.prediction_cache.stats
+            self.logger.log_info(
+                "Prediction cache: memory_hits=%d disk_hits=%d misses=%d hit_rate=%.1f%%",
+                stats['memory_hits'], stats['disk_hits'], stats['misses'], self.prediction_cache.hit_rate() * 100,
+            )
+
+    def count_files(self, file_paths, results):
+        """
+        Adds scored files, rejected files and bytes read to the file counters.
+        """
+        for file_path, labels in zip(file_paths, results):
+            status = 'rejected' if labels is None else 'scored'
+            self.metrics.inc('files', stage='inference', status=status)
+            self.metrics.inc('bytes', os.path.getsize(file_path), stage='inference')
+
+    def list_prediction_files(self):
+        """
+        Returns the paths of the files in prediction_dir in a deterministic (sorted) order.
+        """
+        return [os.path.join(self.prediction_dir, file) for file in sorted(os.listdir(self.prediction_dir))]
+
+    def score_file(self, file_path, model=None):
+        """
+        Reads and scores a single prediction file.
+
+        Parameters:
+            file_path (str): Path to the prediction CSV file.
+            model (object): Model to predict with, fetched from the registry if None.
+
+        Returns:
+            np.ndarray: Predicted labels, or None if the file failed validation.
+        """
+        with self.metrics.span('file', stage='inference'):
+            df = self.read_prediction_file(file_path)
+            if df is None:
+                return None
+            if model is None:
+                model = self.load_model()
+            return self.predict_labels(model, df)
+
+    def score_files(self, file_paths, n_workers=1):
+        """
+        Scores files serially or across a process pool. Results are always returned
+        in the order of file_paths, so both modes produce identical output.
+
+        Parameters:
+            file_paths (list): Paths of the prediction CSV files.
+            n_workers (int): Number of worker processes, 1 scores in this process.
+
+        Returns:
+            list: Predicted labels (or None) for every file, in input order.
+        """
+        if n_workers <= 1 or len(file_paths) <= 1:
+            model = self.load_model()
+            results = [self.score_file(file_path, model) for file_path in file_paths]
+            self.count_files(file_paths, results)
+            return results
+
+        n_workers = min(n_workers, len(file_paths))
+        self.logger.log_info(f"Scoring {len(file_paths)} files with {n_workers} worker processes.")
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_worker,
+            initargs=(self.config_path, self.schema_path),
+        ) as executor:
+            scored = list(executor.map(_score_file, file_paths))
+        # Counters incremented inside the workers stay there, count the merged results here
+        results = [labels for labels, _ in scored]
+        for labels, cache_stats in scored:
+            if labels is not None:
+                self.count_predictions(labels)
+            if cache_stats is not None and self.prediction_cache is not None:
+                for key, value in cache_stats.items():
+                    self.prediction_cache.stats[key] += value
+        self.count_files(file_paths, results)
+        return results
+
+    def summarize_predictions(self, good_bad):
+        """
+        Counts good (1) and bad (-1) wafers in an array of predicted labels.
+
+        Returns:
+            tuple: The predicted labels, count of good and count of bad wafers.
+        """
+        good_bad = np.asarray(good_bad)
+        return good_bad, int(np.count_nonzero(good_bad == 1)), int(np.count_nonzero(good_bad == -1))
+
+    def predict_dataframe(self, df):
+        """
+        Scores rows held in memory, without touching the filesystem.
+
+        Parameters:
+            df (pd.DataFrame): Rows keyed by raw ('Sensor-1') or normalized ('sensor_1')
+                column names. Non-sensor columns such as the wafer id are ignored.
+
+        Returns:
+            tuple: The predicted labels, count of good and count of bad wafers.
+
+        Raises:
+            ValueError: If any sensor used by the model is missing.
+        """
+        features = self.align_features(df, source='DataFrame')
+        return self.summarize_predictions(self.predict_labels(self.load_model(), features))
+
+    def predict_array(self, array):
+        """
+        Scores a NumPy array whose columns are the sensors in schema order, optionally
+        preceded by the wafer column.
+
+        Parameters:
+            array (np.ndarray): 2-D array of sensor readings.
+
+        Returns:
+            tuple: The predicted labels, count of good and count of bad wafers.
+
+        Raises:
+            ValueError: If the array does not have one column per sensor.
+        """
+        array = np.asarray(array)
+        if array.ndim == 1:
+            array = array.reshape(1, -1)
+        feature_names = self.feature_names
+        if array.shape[1] == len(feature_names) + 1:
+            array = array[:, 1:]
+        if array.shape[1] != len(feature_names):
+            raise ValueError(f"Expected {len(feature_names)} sensor columns, got {array.shape[1]}.")
+        features = pd.DataFrame(array.astype(np.float32), columns=feature_names)
+        features = self.select_model_features(self.prepare_features(features, source='array'))
+        return self.summarize_predictions(self.predict_labels(self.load_model(), features))
+
+    def predict_bytes(self, data, source='upload'):
+        """
+        Scores the raw bytes of a prediction CSV (e.g. an uploaded file) in memory.
+
+        Parameters:
+            data (bytes): Content of a CSV in the prediction file layout.
+            source (str): Name of the upload, used for logging.
+
+        Returns:
+            tuple: The predicted labels, count of good and count of bad wafers.
+
+        Raises:
+            ValueError: If the header does not match the columns of the schema.
+        """
+        first_line = data.split(b'\n', 1)[0].decode('utf-8-sig')
+        header = next(csv.reader([first_line]), [])
+        if not self.validate_columns(source, header):
+            raise ValueError(f"Expected the {self.schema.prediction_columns} columns of the schema, got {len(header)} columns.")
+        features = self.parse_prediction_csv(io.BytesIO(data), header, source=source)
+        self.metrics.inc('bytes', len(data), stage='inference')
+        return self.summarize_predictions(self.predict_labels(self.load_model(), features))
+
+    def run_streaming_inference(self, chunksize):
+        """
+        Scores every file in prediction_dir chunk by chunk. Predictions are appended to
+        inference_results.csv as they are produced and only the good/bad counters are
+        kept, so peak memory is bounded by chunksize rather than by the input size.
+
+        Parameters:
+            chunksize (int): Number of rows read and predicted at a time.
+
+        Returns:
+            tuple: Count of good (1) and bad (-1) wafers.
+        """
+        column_name = 'good_bad'
+        count_of_1 = 0
+        count_of_minus_1 = 0
+        model = self.load_model()
+        output_file = os.path.join(self.output_dir, "inference_results.csv")
+        with open(output_file, 'w', newline='') as output:
+            output.write(f"{column_name}\n")
+            for file_path in self.list_prediction_files():
+                chunks = self.read_prediction_file(file_path, chunksize=chunksize)
+                self.count_files([file_path], [chunks])
+                if chunks is None:
+                    continue
+                for chunk in chunks:
+                    good_bad = self.predict_labels(model, chunk)
+                    pd.DataFrame(good_bad).to_csv(output, header=False, index=False)
+                    count_of_1 += int(np.count_nonzero(good_bad == 1))
+                    count_of_minus_1 += int(np.count_nonzero(good_bad == -1))
+                self.logger.log_info("Streamed predictions for %s.", file_path)
+
+        self.logger.log_info(f"Count of 1:{count_of_1}")
+        self.logger.log_info(f"Count of -1:{count_of_minus_1}")
+        self.log_model_stats()
+        self.log_cache_stats()
+        return count_of_1, count_of_minus_1
+
+    def run_inference(self, n_workers=None, chunksize=None):
+        """
+        Scores every file in prediction_dir and writes the merged predictions to
+        inference_results.csv.
+
+        Parameters:
+            n_workers (int): Number of worker processes, defaults to inference_workers
+                from the configuration (1 = serial).
+            chunksize (int): Rows per chunk for streaming mode, defaults to
+                inference_chunksize from the configuration (None = whole files).
+
+        Returns:
+            tuple: Count of good (1) and bad (-1) wafers.
+        """
+        if n_workers is None:
+            n_workers = self.n_workers
+        if chunksize is None:
+            chunksize = self.chunksize
+        start = time.perf_counter()
+        if self.prediction_cache is not None:
+            self.prediction_cache.reset_stats()
         try:
+            if chunksize:
+                return self.run_streaming_inference(chunksize)
+
             dfs = []
             column_name = 'good_bad'
-            files = os.listdir(self.prediction_dir)
-            for file in files:
-                file_path = os.path.join(self.prediction_dir, file)
-                if self.validate_columns(file_path):
-                    df = pd.read_csv(file_path)
-                    df = df.drop(df.columns[0], axis=1)
-                    has_nan = df.isna().any().any()
-                    if has_nan:
-                        self.logger.log_info("There are NaN values in the DataFrame.")
-                    else:
-                         self.logger.log_info("No NaN values found in the DataFrame.")
-                    
-                    df.fillna(0, inplace=True)
-                    has_nan = df.isna().any().any()
-                    
-                    if has_nan:
-                        self.logger.log_info("\n2 There are NaN values in the DataFrame.")
-                    else:
-                         self.logger.log_info("\n2 No NaN values found in the DataFrame.")
-                    #self.logger.log_info(df.head())
-                    df.columns = [col.replace('-', '_').replace('/', '_').lower() for col in df.columns]
-                    #df.to_csv('dfoutput.csv', index=False)
-                    
-                    
-                    # Load the model
-                    model = joblib.load(self.model_path)
-                    #self.logger.log_info(f"========dir====={dir(model)}")
-
-                    #self.logger.log_info(f"========vars====={vars(model)}")
-                    """
-                    first_row = df.iloc[[0]].values  # Extracting the first row
-                    columns_names = df.columns  # Extracting column names
-                    another_df = pd.DataFrame([first_row[0]],columns=columns_names) # Creating another DataFrame with the first row data
-                    self.logger.log_info(f"==========another_df=====\n{another_df.head}")
-                    another_df.to_csv('Myoutput.csv', index=False)
-                    """
-
-                    # Make predictions
-                    good_bad = model.predict(df)
-                    self.logger.log_info(f"============good_bad=========\n{good_bad}")
+            file_paths = self.list_prediction_files()
+            for file_path, good_bad in zip(file_paths, self.score_files(file_paths, n_workers)):
+                if good_bad is not None:
                     results = pd.DataFrame(good_bad)
                     dfs.append(results)
                 
@@ -137,6 +602,8 @@ class InferencePipeline:
 
             self.logger.log_info(f"Count of 1:{count_of_1}")
             self.logger.log_info(f"Count of -1:{count_of_minus_1}")
+            self.log_model_stats()
+            self.log_cache_stats()
             
                 
 
@@ -147,6 +614,9 @@ class InferencePipeline:
                     
         except Exception as e:
             self.logger.log_exception("Pipeline execution failed: {}".format(e))
+        finally:
+            self.metrics.observe('stage_seconds', time.perf_counter() - start, stage='inference')
+            self.metrics.write_snapshot(self.metrics_path)
             
             
         
@@ -1,32 +1,96 @@
 import os
+import json
+import time
+import inspect
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dotenv import load_dotenv
-import hopsworks
-import hsfs
-from hsml.schema import Schema
-from hsml.model_schema import ModelSchema
 from sklearn import metrics
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import train_test_split, StratifiedKFold, ParameterGrid
 import xgboost as xgb
-from sklearn.metrics import accuracy_score, f1_score
+from sklearn.metrics import accuracy_score, f1_score, log_loss
 import joblib
 from sensorqualityclassifier.utils.logger import AppLogger
+from sensorqualityclassifier.feature_store.factory import create_feature_store
+from sensorqualityclassifier.utils.metrics import MetricsRegistry
+from sensorqualityclassifier.utils.native_model import NativeModel
+
+# Older XGBoost releases take early_stopping_rounds in fit(), newer ones in the constructor
+EARLY_STOPPING_IN_FIT = 'early_stopping_rounds' in inspect.signature(xgb.XGBClassifier.fit).parameters
+
+# Cross-validation folds shared by the search trials of this process
+_search_folds = []
+
+def _init_search_worker(folds):
+    """
+    Hands the cached folds to a search worker process once, instead of once per trial.
+    """
+    global _search_folds
+    _search_folds = folds
+
+def _run_search_trial(params, settings):
+    """
+    Cross-validates one hyperparameter candidate on the cached folds, with early
+    stopping on each validation fold.
+
+    Returns:
+        dict: Candidate parameters, mean validation scores, best iterations and wall time.
+    """
+    start = time.perf_counter()
+    accuracies, losses, best_iterations = [], [], []
+    for X_train, y_train, X_val, y_val in _search_folds:
+        model_params = dict(
+            objective='binary:logistic',
+            tree_method='hist',
+            n_estimators=settings['max_estimators'],
+            eval_metric='logloss',
+            n_jobs=settings['threads_per_trial'],
+            **params,
+        )
+        fit_params = {'eval_set': [(X_val, y_val)], 'verbose': False}
+        if EARLY_STOPPING_IN_FIT:
+            fit_params['early_stopping_rounds'] = settings['early_stopping_rounds']
+        else:
+            model_params['early_stopping_rounds'] = settings['early_stopping_rounds']
+        clf = xgb.XGBClassifier(**model_params)
+        clf.fit(X_train, y_train, **fit_params)
+        accuracies.append(accuracy_score(y_val, clf.predict(X_val)))
+        losses.append(log_loss(y_val, clf.predict_proba(X_val), labels=clf.classes_))
+        best_iterations.append(int(clf.best_iteration) + 1)
+    return {
+        'params': params,
+        'mean_accuracy': float(np.mean(accuracies)),
+        'mean_logloss': float(np.mean(losses)),
+        'best_iterations': best_iterations,
+        'wall_seconds': time.perf_counter() - start,
+    }
 
 class ModelTrainingPipeline:
     """
-    A pipeline for training an XGBoost model using data from Hopsworks' feature store,
-    with functionalities to preprocess data, train the model, evaluate its performance,
-    and save the model both locally and in Hopsworks.
+    A pipeline for training an XGBoost model using data from the feature store (Hopsworks
+    or the local backend), with functionalities to preprocess data, train the model,
+    evaluate its performance, and save the model locally and, with the Hopsworks backend,
+    in the Hopsworks model registry.
     """
 
     def __init__(self, config_path='config/config.yml', env_path='config/.env'):
         """
-        Initializes the pipeline, loads configurations and Hopsworks credentials.
+        Initializes the pipeline, loads configurations and the feature store. Hopsworks is
+        only connected to when it is the configured feature store backend.
         """
         self.logger = AppLogger()
         load_dotenv(dotenv_path=env_path)
         self.config = self.read_yaml_file(config_path)
-        self.connect_to_hopsworks()
+        self.feature_store = create_feature_store(self.config)
+        self.project = None
+        self.search_report = None
+        self.feature_pruning = self.config.get('feature_pruning', True)
+        self.feature_report = {}
+        self.metrics = MetricsRegistry.instance()
+        self.metrics_path = os.path.join(self.config.get('metrics_dir', 'artifacts/metrics'), 'training.json')
+        if self.config.get('feature_store', 'hopsworks') == 'hopsworks':
+            self.connect_to_hopsworks()
 
     def read_yaml_file(self, file_path):
         """
@@ -41,11 +105,7 @@ class ModelTrainingPipeline:
         Establishes a connection to the Hopsworks feature store.
         """
         try:
-            self.project = hopsworks.login(
-                api_key_value=os.getenv('FS_API_KEY'),
-                project=os.getenv('FS_PROJECT_NAME')
-            )
-            self.fs = self.project.get_feature_store()
+            self.project = self.feature_store.project
             self.logger.log_info("Connected to Hopsworks feature store.")
         except Exception as e:
             self.logger.log_exception("Failed to connect to Hopsworks: {}".format(e))
@@ -56,30 +116,90 @@ class ModelTrainingPipeline:
         Fetches training data from the feature store.
         """
         try:
-            feature_group = self.fs.get_feature_group('wafer_project', version=1)
-            query = feature_group.select_all()
-            feature_dataframe = query.read()
-            self.logger.log_info("Data fetched from feature store.")
+            with self.metrics.span('fetch', stage='training'):
+                feature_dataframe = self.feature_store.read()
+            self.metrics.inc('rows', len(feature_dataframe), stage='training')
+            self.logger.log_info(f"Data fetched from feature store, shape={feature_dataframe.shape}.")
             return feature_dataframe
         except Exception as e:
             self.logger.log_exception("Failed to fetch data from feature store: {}".format(e))
             raise
 
-    
+    def prune_static_features(self, X):
+        """
+        Drops the sensors that cannot help any tree: constant (zero-variance) sensors and
+        sensors missing in more than feature_max_missing_ratio of the rows.
+
+        Returns:
+            pd.DataFrame: X without the dropped sensors.
+        """
+        max_missing_ratio = self.config.get('feature_max_missing_ratio', 0.9)
+        high_missing = X.columns[X.isna().mean() > max_missing_ratio]
+        zero_variance = X.columns[(X.nunique(dropna=True) <= 1) & ~X.columns.isin(high_missing)]
+        self.feature_report = {
+            'input_features': X.shape[1],
+            'zero_variance': zero_variance.tolist(),
+            'high_missing': high_missing.tolist(),
+            'zero_importance': [],
+        }
+        self.logger.log_info(
+            "Dropping %d zero-variance and %d high-missingness sensors of %d.",
+            len(zero_variance), len(high_missing), X.shape[1],
+        )
+        return X.drop(columns=zero_variance.union(high_missing))
+
+    def refit_on_used_features(self, clf, X, y, X_check):
+        """
+        Refits the classifier on the sensors its trees actually split on, so inference only
+        has to parse and feed those. Dropping sensors can still change the trees (column
+        sampling and histogram binning depend on the feature set), so the refitted model is
+        only kept if it predicts the same labels as the original on X_check; otherwise the
+        original model and all its sensors are kept.
+
+        Parameters:
+            clf (xgb.XGBClassifier): Fitted classifier.
+            X (pd.DataFrame): Training features clf was fitted on.
+            y (pd.Series): Training labels.
+            X_check (pd.DataFrame): Rows the two models are compared on.
+
+        Returns:
+            tuple: The classifier to use and the list of its sensors.
+        """
+        scores = clf.get_booster().get_score(importance_type='weight')
+        used = [col for col in X.columns if scores.get(col, 0) > 0]
+        zero_importance = [col for col in X.columns if scores.get(col, 0) == 0]
+        if not used or not zero_importance:
+            return clf, list(X.columns)
+        self.logger.log_info("Refitting on %d used sensors, %d sensors have zero importance.", len(used), len(zero_importance))
+        refit = xgb.XGBClassifier(**clf.get_params())
+        with self.metrics.span('fit', stage='training'):
+            refit.fit(X[used], y)
+        disagreements = int((refit.predict(X_check[used]) != clf.predict(X_check)).sum())
+        if disagreements:
+            self.logger.log_warning(
+                "Refitted model disagrees with the original on %d of %d rows; keeping all %d sensors.",
+                disagreements, len(X_check), X.shape[1],
+            )
+            return clf, list(X.columns)
+        self.feature_report.setdefault('zero_importance', []).extend(zero_importance)
+        return refit, used
+
     def train_and_evaluate_model(self, X, y):
         """
         Trains an XGBoost classifier and evaluates its performance.
         """
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
-        self.logger.log_info(f"========X_train=\n{X_train.head()}")
-        self.logger.log_info(f"========X_test=\n{X_test.head()}")
-        self.logger.log_info(f"========y_train=\n{y_train.head()}")
-        self.logger.log_info(f"========y_test=\n{y_test.head()}")
+        self.logger.log_info(f"Train shape={X_train.shape}, test shape={X_test.shape}")
 
 
         clf = xgb.XGBClassifier(objective='binary:logistic', n_estimators=100, learning_rate=0.1, max_depth=3, eval_metric='logloss')
-        clf.fit(X_train, y_train)
-        y_pred = clf.predict(X_test)
+        with self.metrics.span('fit', stage='training'):
+            clf.fit(X_train, y_train)
+        if self.feature_pruning:
+            clf, used = self.refit_on_used_features(clf, X_train, y_train, X_test)
+            X_test = X_test[used]
+        with self.metrics.span('predict', stage='training'):
+            y_pred = clf.predict(X_test)
         accuracy = accuracy_score(y_test, y_pred)
         formatted_accuracy = "{:.2f}".format(accuracy * 100)
         f1 = f1_score(y_test, y_pred)
@@ -89,32 +209,138 @@ class ModelTrainingPipeline:
         }
         #metrics=str(metrics)
         #self.logger.log_info(f"Model trained. Accuracy: {accuracy:.4f}, F1 Score: {f1:.4f}")
-        self.logger.log_info(f"metrics========={metrics} type========={type(metrics)}")
+        self.logger.log_debug("metrics=%s type=%s", metrics, type(metrics))
 
         return clf,metrics
 
+    def build_folds(self, X, y):
+        """
+        Splits the data into stratified k folds once. The fold arrays are materialized
+        as float32 so every candidate reuses them instead of re-splitting the data.
+
+        Returns:
+            list: (X_train, y_train, X_val, y_val) tuples, one per fold.
+        """
+        X_values = X.to_numpy(dtype=np.float32)
+        y_values = y.to_numpy()
+        splitter = StratifiedKFold(n_splits=self.config.get('search_folds', 5), shuffle=True, random_state=42)
+        return [
+            (X_values[train_index], y_values[train_index], X_values[val_index], y_values[val_index])
+            for train_index, val_index in splitter.split(X_values, y_values)
+        ]
+
+    def search_hyperparameters(self, X, y):
+        """
+        Runs a parallel k-fold cross-validated grid search with 'hist' tree construction
+        and early stopping, then refits the best candidate on the full data.
+
+        The grid, fold count, worker budget and executor ('thread' or 'process') come
+        from the search_* settings of the configuration.
+
+        Returns:
+            tuple: The refitted best model and its metrics.
+        """
+        param_grid = self.config.get('search_param_grid') or {'max_depth': [3], 'learning_rate': [0.1]}
+        candidates = list(ParameterGrid(param_grid))
+        n_workers = max(1, min(self.config.get('search_workers', 4), len(candidates)))
+        settings = {
+            'max_estimators': self.config.get('search_max_estimators', 500),
+            'early_stopping_rounds': self.config.get('search_early_stopping_rounds', 20),
+            'threads_per_trial': max(1, (os.cpu_count() or 1) // n_workers),
+        }
+
+        start = time.perf_counter()
+        folds = self.build_folds(X, y)
+        self.logger.log_info(f"Searching {len(candidates)} candidates on {len(folds)} folds with {n_workers} workers.")
+        if self.config.get('search_executor', 'thread') == 'process':
+            executor = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_search_worker, initargs=(folds,))
+        else:
+            _init_search_worker(folds)
+            executor = ThreadPoolExecutor(max_workers=n_workers)
+        with executor:
+            trials = list(executor.map(_run_search_trial, candidates, [settings] * len(candidates)))
+
+        for trial in trials:
+            self.metrics.observe('trial_seconds', trial['wall_seconds'], stage='training')
+            self.logger.log_info(
+                f"Trial {trial['params']}: accuracy={trial['mean_accuracy']:.4f} "
+                f"logloss={trial['mean_logloss']:.4f} wall={trial['wall_seconds']:.2f}s"
+            )
+        best = max(trials, key=lambda trial: (trial['mean_accuracy'], -trial['mean_logloss']))
+        n_estimators = int(round(np.mean(best['best_iterations'])))
+        clf = xgb.XGBClassifier(
+            objective='binary:logistic', tree_method='hist', n_estimators=n_estimators,
+            eval_metric='logloss', **best['params'],
+        )
+        with self.metrics.span('fit', stage='training'):
+            clf.fit(X, y)
+        if self.feature_pruning:
+            # The final model is fitted on every row, so the comparison runs on the training rows
+            clf, _ = self.refit_on_used_features(clf, X, y, X)
+
+        scores = {
+            "accuracy": "{:.2f}".format(best['mean_accuracy'] * 100),
+        }
+        self.search_report = {
+            'best_params': best['params'],
+            'best_n_estimators': n_estimators,
+            'wall_seconds': time.perf_counter() - start,
+            'trials': trials,
+        }
+        self.logger.log_info(f"Best candidate {best['params']} with n_estimators={n_estimators}, metrics={scores}")
+        return clf, scores
+
     def save_model(self, model,metrics,X_train,y_train):
         """
         Saves the trained model locally and registers it in Hopsworks.
         """
-        self.logger.log_info(f"<<<<<<<save_model method>>>>> metrics{type(metrics)}")
+        self.logger.log_debug("save_model metrics type=%s", type(metrics))
         model_dir = self.config['saved_model']
         if not os.path.isdir(model_dir):
             os.makedirs(model_dir)
         model_path = os.path.join(model_dir, 'xgboost_model.pkl')
-        joblib.dump(model, model_path)
-        self.logger.log_info(f"Model saved locally at {model_path}")
+        # Written before the model, so a process reloading the new model finds its feature list
+        self.save_feature_list(model, model_dir)
+        with self.metrics.span('save_model', stage='training'):
+            joblib.dump(model, model_path)
+            # Written after the pickle, so a manifest newer than the pickle is never stale
+            manifest_path = NativeModel.save(model, model_path, metrics)
+        self.logger.log_info(f"Model saved locally at {model_path}, native format manifest at {manifest_path}")
+        if self.search_report:
+            with open(os.path.join(model_dir, 'search_report.json'), 'w') as file:
+                json.dump(self.search_report, file, indent=2)
 
         # Model registration in Hopsworks is handled separately
-        self.register_model_in_hopsworks(model_dir,metrics,X_train,y_train)
+        if self.project is not None:
+            self.register_model_in_hopsworks(model_dir,metrics,X_train,y_train)
+
+    def save_feature_list(self, model, model_dir):
+        """
+        Writes feature_list.json next to the model: the sensors the model expects, in
+        order, and the sensors dropped by pruning. InferencePipeline only parses these.
+        """
+        feature_list = {
+            'features': list(model.get_booster().feature_names or []),
+            'dropped': {
+                reason: self.feature_report.get(reason, [])
+                for reason in ('zero_variance', 'high_missing', 'zero_importance')
+            },
+            'input_features': self.feature_report.get('input_features'),
+        }
+        with open(os.path.join(model_dir, 'feature_list.json'), 'w') as file:
+            json.dump(feature_list, file, indent=2)
+        self.logger.log_info("Feature list with %d sensors saved in %s.", len(feature_list['features']), model_dir)
 
     def register_model_in_hopsworks(self, model_dir,metrics,X_train,y_train):
         """
         Registers the trained model in Hopsworks' model registry.
         """
         try:
+            from hsml.schema import Schema
+            from hsml.model_schema import ModelSchema
+
             # Model Schema creation and registration steps...
-            self.logger.log_info(f"<<<<<<<hopsworks_save_model method>>>>> metrics{type(metrics)}")
+            self.logger.log_debug("register_model_in_hopsworks metrics type=%s", type(metrics))
 
             # Create a Schema for the input features using the values of X_train
             input_schema = Schema(X_train.values)
@@ -152,19 +378,26 @@ class ModelTrainingPipeline:
         """
         Executes the model training pipeline.
         """
+        start = time.perf_counter()
         try:
             df = self.fetch_data_from_feature_store()
             columns_to_drop = ['good_bad', 'wafer_num']
             X = df.drop(columns=columns_to_drop)
             y = df['good_bad']
+            if self.feature_pruning:
+                X = self.prune_static_features(X)
 
-            self.logger.log_info(f"========X=\n{X.head()}")
-            self.logger.log_info(f"========y=\n{y.head()}")
-            model,metrics= self.train_and_evaluate_model(X, y)
-            self.logger.log_info(f"model type={type(model)}=========<>metrics type={type(metrics)}")
+            if self.config.get('training_mode', 'fixed') == 'search':
+                model,metrics= self.search_hyperparameters(X, y)
+            else:
+                model,metrics= self.train_and_evaluate_model(X, y)
+            self.logger.log_debug("model type=%s metrics type=%s", type(model), type(metrics))
             self.save_model(model,metrics,X,y)
         except Exception as e:
             self.logger.log_exception("Pipeline execution failed: {}".format(e))
+        finally:
+            self.metrics.observe('stage_seconds', time.perf_counter() - start, stage='training')
+            self.metrics.write_snapshot(self.metrics_path)
 
 if __name__ == "__main__":
     pipeline = ModelTrainingPipeline()
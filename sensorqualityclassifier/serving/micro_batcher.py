@@ -0,0 +1,179 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+import pandas as pd
+from sensorqualityclassifier.utils.logger import AppLogger
+
+class MicroBatcher:
+    """
+    Coalesces concurrent prediction requests into micro-batches.
+
+    Requests are queued by the serving threads and picked up by a single background
+    thread, which waits at most max_wait_ms for more requests (or until max_batch_rows
+    rows are pending), runs one predict call on the concatenated rows and hands every
+    caller its own slice of the result. If the combined call fails, each request of the
+    batch is predicted on its own, so an error only reaches the request that caused it.
+
+    Attributes:
+        predict_fn (callable): Function mapping a feature DataFrame to predicted labels.
+        max_batch_rows (int): Upper bound on the rows predicted in one call.
+        max_wait_ms (float): Time window in which requests are coalesced.
+        stats (dict): Number of requests, rows and batches processed so far.
+    """
+
+    def __init__(self, predict_fn, max_batch_rows=4096, max_wait_ms=5):
+        self.predict_fn = predict_fn
+        self.max_batch_rows = max_batch_rows
+        self.max_wait_ms = max_wait_ms
+        self.logger = AppLogger()
+        self.stats = {'requests': 0, 'rows': 0, 'batches': 0}
+        self._queue = queue.Queue()
+        self._state_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, features):
+        """
+        Queues rows for prediction.
+
+        Parameters:
+            features (pd.DataFrame): Model-ready features.
+
+        Returns:
+            Future: Resolves to the predicted labels of these rows.
+
+        Raises:
+            RuntimeError: If the batcher has been closed or its background thread stopped.
+        """
+        future = Future()
+        with self._state_lock:
+            if self._closed or not self._thread.is_alive():
+                raise RuntimeError("MicroBatcher is not running.")
+            self._queue.put((features, future))
+        return future
+
+    def predict(self, features, timeout=None):
+        """
+        Queues rows for prediction and blocks until their labels are available.
+        """
+        return self.submit(features).result(timeout=timeout)
+
+    def close(self):
+        """
+        Stops the background thread once the already queued requests are served.
+        """
+        with self._state_lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(None)
+        self._thread.join()
+
+    def _collect_batch(self, first_item):
+        """
+        Gathers queued requests until the batch is full or the time window has passed.
+        Returns the batch and whether a stop signal was received.
+        """
+        batch = [first_item]
+        rows = len(first_item[0])
+        deadline = time.monotonic() + self.max_wait_ms / 1000.0
+        while rows < self.max_batch_rows:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+            rows += len(item[0])
+        return batch, False
+
+    @staticmethod
+    def _resolve(future, result=None, error=None):
+        """
+        Sets the result or exception of a future unless it is already resolved.
+        """
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _predict_each(self, batch):
+        """
+        Predicts every request of a failed batch separately, keeping each error with
+        the request that raised it.
+        """
+        rows = 0
+        for features, future in batch:
+            try:
+                result = np.asarray(self.predict_fn(features))
+            except Exception as e:
+                self.logger.log_exception(f"Prediction request of {len(features)} rows failed: {e}")
+                self._resolve(future, error=e)
+                continue
+            self._resolve(future, result)
+            rows += len(result)
+        return rows
+
+    def _predict_batch(self, batch):
+        """
+        Runs one predict call for a batch and resolves every request's future.
+        """
+        frames = [features for features, _ in batch]
+        try:
+            combined = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+            predictions = np.asarray(self.predict_fn(combined))
+            offsets = np.cumsum([len(frame) for frame in frames])[:-1]
+            results = np.split(predictions, offsets)
+        except Exception as e:
+            if len(batch) == 1:
+                self.logger.log_exception(f"Micro-batch prediction failed: {e}")
+                self._resolve(batch[0][1], error=e)
+                return
+            self.logger.log_info(f"Micro-batch of {len(batch)} requests failed ({e}); predicting them one by one.")
+            rows = self._predict_each(batch)
+        else:
+            for (_, future), result in zip(batch, results):
+                self._resolve(future, result)
+            rows = len(predictions)
+        self.stats['requests'] += len(batch)
+        self.stats['rows'] += rows
+        self.stats['batches'] += 1
+
+    def _run(self):
+        """
+        Background loop serving the request queue. An unexpected error fails the
+        requests of the current batch but keeps the loop alive; once the loop ends,
+        requests still queued are failed instead of being left waiting.
+        """
+        stop = False
+        try:
+            while not stop:
+                item = self._queue.get()
+                if item is None:
+                    break
+                batch = [item]
+                try:
+                    batch, stop = self._collect_batch(item)
+                    self._predict_batch(batch)
+                except Exception as e:
+                    self.logger.log_exception(f"Micro-batcher loop error: {e}")
+                    for _, future in batch:
+                        self._resolve(future, error=e)
+        finally:
+            with self._state_lock:
+                self._closed = True
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    self._resolve(item[1], error=RuntimeError("MicroBatcher stopped."))
@@ -0,0 +1,139 @@
+import io
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import pandas as pd
+from flask import Flask, Response, jsonify, request
+from sensorqualityclassifier.pipeline.inference_pipeline import InferencePipeline
+from sensorqualityclassifier.serving.micro_batcher import MicroBatcher
+
+class ScoringService:
+    """
+    HTTP scoring endpoint built on InferencePipeline.
+
+    Rows for one or many wafers are accepted as JSON or CSV, aligned to the model's
+    feature order and handed to a MicroBatcher, so concurrent requests share a single
+    model.predict call. Request, batch and model metrics are exposed on /metrics.
+
+    Attributes:
+        pipeline (InferencePipeline): Pipeline used for feature alignment and model loading.
+        batcher (MicroBatcher): Coalesces concurrent requests into micro-batches.
+        metrics (MetricsRegistry): Process-wide metrics shared with the pipeline.
+    """
+
+    def __init__(self, config_path='config/config.yml', schema_path='config/schema_training.json'):
+        self.pipeline = InferencePipeline(config_path=config_path, schema_path=schema_path)
+        self.logger = self.pipeline.logger
+        self.metrics = self.pipeline.metrics
+        config = self.pipeline.config
+        self.batcher = MicroBatcher(
+            self.predict_batch,
+            max_batch_rows=config.get('batch_max_rows', 4096),
+            max_wait_ms=config.get('batch_max_wait_ms', 5),
+        )
+        self.request_timeout = config.get('batch_request_timeout', 30)
+        # Warm the model before the first request arrives
+        self.pipeline.load_model()
+
+    def predict_batch(self, features):
+        """
+        Predicts one micro-batch with the current model from the registry.
+        """
+        self.metrics.inc('batches', stage='serving')
+        return self.pipeline.predict_labels(self.pipeline.load_model(), features)
+
+    @staticmethod
+    def parse_request(http_request):
+        """
+        Builds a DataFrame from the body of a request.
+
+        CSV bodies (Content-Type text/csv) use the prediction file layout. JSON bodies
+        may be a single record, a list of records or an object with a "rows" list.
+
+        Returns:
+            pd.DataFrame: The raw rows of the request.
+
+        Raises:
+            ValueError: If the body is empty or cannot be parsed.
+        """
+        if http_request.mimetype in ('text/csv', 'application/csv'):
+            return pd.read_csv(io.BytesIO(http_request.get_data()))
+
+        payload = http_request.get_json(silent=True)
+        if isinstance(payload, dict):
+            payload = payload.get('rows', [payload])
+        if not isinstance(payload, list) or not payload:
+            raise ValueError("Expected a CSV body or JSON rows.")
+        return pd.DataFrame.from_records(payload)
+
+    def score(self, df):
+        """
+        Scores raw rows and builds the response body.
+        """
+        wafers = None
+        first_column = df.columns[0]
+        if self.pipeline.normalize_column_name(first_column) not in self.pipeline.feature_names:
+            wafers = df[first_column].astype(str).tolist()
+        features = self.pipeline.align_features(df, source='scoring request')
+        good_bad = self.batcher.predict(features, timeout=self.request_timeout)
+        response = {
+            'predictions': good_bad.tolist(),
+            'good': int((good_bad == 1).sum()),
+            'bad': int((good_bad == -1).sum()),
+        }
+        if wafers is not None:
+            response['wafers'] = wafers
+        return response
+
+    def create_app(self):
+        """
+        Creates the Flask application exposing the scoring endpoints.
+        """
+        app = Flask(__name__)
+
+        @app.route('/health', methods=['GET'])
+        def health():
+            return jsonify({'status': 'ok', 'batcher': dict(self.batcher.stats)})
+
+        @app.route('/metrics', methods=['GET'])
+        def metrics():
+            if request.args.get('format') == 'json':
+                return jsonify(self.metrics.snapshot())
+            return Response(self.metrics.to_prometheus(), mimetype='text/plain; version=0.0.4')
+
+        @app.route('/predict', methods=['POST'])
+        def predict():
+            start = time.perf_counter()
+            status = 200
+            try:
+                df = self.parse_request(request)
+                return jsonify(self.score(df))
+            except ValueError as e:
+                status = 400
+                return jsonify({'error': str(e)}), status
+            except FutureTimeoutError:
+                status = 503
+                self.logger.log_error(f"Scoring request timed out after {self.request_timeout}s.")
+                return jsonify({'error': 'prediction timed out'}), status
+            except Exception as e:
+                status = 500
+                self.logger.log_exception(f"Scoring request failed: {e}")
+                return jsonify({'error': 'prediction failed'}), status
+            finally:
+                self.metrics.observe('request_seconds', time.perf_counter() - start, endpoint='predict')
+                self.metrics.inc('requests', endpoint='predict', status=status)
+
+        return app
+
+def create_app(config_path='config/config.yml', schema_path='config/schema_training.json'):
+    """
+    Application factory, e.g. for gunicorn "sensorqualityclassifier.serving.scoring_service:create_app()".
+    """
+    return ScoringService(config_path=config_path, schema_path=schema_path).create_app()
+
+if __name__ == "__main__":
+    service = ScoringService()
+    service.create_app().run(
+        host=service.pipeline.config.get('service_host', '0.0.0.0'),
+        port=service.pipeline.config.get('service_port', 8080),
+        threaded=True,
+    )
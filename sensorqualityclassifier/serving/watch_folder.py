@@ -0,0 +1,327 @@
+import os
+import sys
+import time
+import shutil
+import select
+import signal
+import struct
+import threading
+import ctypes
+import ctypes.util
+import numpy as np
+import pandas as pd
+from sensorqualityclassifier.pipeline.inference_pipeline import InferencePipeline
+
+class InotifyWatcher:
+    """
+    Reports files that finished being written to, or were moved into, a directory,
+    using Linux inotify through ctypes.
+
+    Attributes:
+        directory (str): Watched directory.
+    """
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_Q_OVERFLOW = 0x00004000
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.IN_CLOSE_WRITE | self.IN_MOVED_TO)
+        if wd < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+
+    @staticmethod
+    def available():
+        """
+        Returns True if inotify can be used on this platform.
+        """
+        if not sys.platform.startswith('linux'):
+            return False
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        try:
+            return hasattr(ctypes.CDLL(libc_name), 'inotify_init1')
+        except OSError:
+            return False
+
+    def wait(self, timeout):
+        """
+        Waits up to timeout seconds for files to arrive.
+
+        Returns:
+            list: Names of the files that arrived, or every file of the directory if the
+            kernel event queue overflowed.
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        names = []
+        while True:
+            try:
+                buffer = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buffer):
+                _, mask, _, length = self.EVENT_HEADER.unpack_from(buffer, offset)
+                offset += self.EVENT_HEADER.size
+                name = buffer[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & self.IN_Q_OVERFLOW:
+                    return sorted(os.listdir(self.directory))
+                if name:
+                    names.append(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """
+    Reports new files of a directory by listing it periodically. A file is reported
+    once its size and mtime are the same in two consecutive scans, so files still
+    being copied are not picked up half-written.
+
+    Attributes:
+        directory (str): Watched directory.
+        interval (float): Seconds between two scans.
+    """
+
+    def __init__(self, directory, interval=1.0):
+        self.directory = directory
+        self.interval = interval
+        self.previous = {}
+        self.reported = set()
+
+    def wait(self, timeout):
+        """
+        Scans the directory after sleeping at most timeout seconds.
+
+        Returns:
+            list: Names of the files that became stable since the last call.
+        """
+        time.sleep(min(self.interval, timeout))
+        current = {}
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                stat = entry.stat()
+                current[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        ready = [
+            name for name, fingerprint in current.items()
+            if name not in self.reported and self.previous.get(name) == fingerprint
+        ]
+        self.reported.update(ready)
+        self.reported.intersection_update(current)
+        self.previous = current
+        return sorted(ready)
+
+    def close(self):
+        pass
+
+class WatchFolderService:
+    """
+    Long-running service mode of InferencePipeline: watches prediction_dir and scores
+    every CSV file dropped into it.
+
+    Files arriving close together are coalesced into one batch, which is parsed file by
+    file and predicted with a single call on the warm model from the registry. Each file
+    gets its own <name>_results.csv in the results directory and is then moved to the
+    archive directory (rejected files to archive/rejected), so no file is scored twice.
+    Files of a batch that fails are retried with a growing delay; after max_retries
+    failed attempts they are moved to archive/failed.
+    The latency from the file's last modification to its result is recorded in the
+    watch_latency_seconds histogram.
+
+    Attributes:
+        pipeline (InferencePipeline): Pipeline used for parsing, the model and the prediction cache.
+        watch_dir (str): Directory watched for new files (prediction_dir).
+        archive_dir (str): Directory processed files are moved to.
+        results_dir (str): Directory per-file results are written to.
+        debounce (float): Quiet period in seconds that closes a batch.
+        max_wait (float): Longest time in seconds a file waits for its batch to close.
+        max_batch_files (int): Maximum number of files per batch.
+        max_retries (int): Retries of a file whose batch failed before it is moved to archive/failed.
+        retry_delay (float): Delay in seconds before the first retry, doubled on every further one.
+    """
+
+    def __init__(self, config_path='config/config.yml', schema_path='config/schema_training.json'):
+        self.pipeline = InferencePipeline(config_path=config_path, schema_path=schema_path)
+        self.logger = self.pipeline.logger
+        self.metrics = self.pipeline.metrics
+        config = self.pipeline.config
+        self.watch_dir = self.pipeline.prediction_dir
+        self.archive_dir = config.get('watch_archive_dir', 'artifacts/prediction_archive')
+        self.results_dir = config.get('watch_results_dir', os.path.join(self.pipeline.output_dir, 'watch'))
+        self.debounce = config.get('watch_debounce_ms', 200) / 1000.0
+        self.max_wait = config.get('watch_max_wait_ms', 2000) / 1000.0
+        self.max_batch_files = config.get('watch_max_batch_files', 64)
+        self.max_retries = config.get('watch_max_retries', 3)
+        self.retry_delay = config.get('watch_retry_seconds', 5.0)
+        self.poll_interval = config.get('watch_poll_interval', 1.0)
+        self.watch_mode = config.get('watch_mode', 'auto')
+        self.metrics_path = os.path.join(config.get('metrics_dir', 'artifacts/metrics'), 'watch.json')
+        for directory in (self.watch_dir, self.archive_dir, os.path.join(self.archive_dir, 'rejected'),
+                          os.path.join(self.archive_dir, 'failed'), self.results_dir):
+            os.makedirs(directory, exist_ok=True)
+        self.running = False
+        self.attempts = {}
+        self.retry_at = {}
+        # Warm the model before the first file arrives
+        self.pipeline.load_model()
+
+    def create_watcher(self):
+        """
+        Returns an inotify watcher when available (watch_mode 'auto' or 'inotify'),
+        otherwise a polling watcher.
+        """
+        if self.watch_mode in ('auto', 'inotify') and InotifyWatcher.available():
+            try:
+                watcher = InotifyWatcher(self.watch_dir)
+                self.logger.log_info("Watching %s with inotify.", self.watch_dir)
+                return watcher
+            except OSError as e:
+                self.logger.log_warning(f"inotify unavailable ({e}), falling back to polling.")
+        self.logger.log_info("Watching %s by polling every %.1fs.", self.watch_dir, self.poll_interval)
+        return PollingWatcher(self.watch_dir, self.poll_interval)
+
+    def archive_path(self, file_name, subfolder=None):
+        """
+        Returns a free path in the archive, or in one of its subfolders, for a processed file.
+        """
+        directory = os.path.join(self.archive_dir, subfolder) if subfolder else self.archive_dir
+        path = os.path.join(directory, file_name)
+        if os.path.exists(path):
+            stem, ext = os.path.splitext(file_name)
+            path = os.path.join(directory, f"{stem}_{time.time_ns()}{ext}")
+        return path
+
+    def process_batch(self, file_names):
+        """
+        Scores a batch of files with one predict call, writes a result file per input,
+        and moves the inputs to the archive.
+
+        Returns:
+            dict: Number of scored and rejected files and rows in the batch.
+        """
+        start = time.perf_counter()
+        frames, scored = [], []
+        summary = {'scored': 0, 'rejected': 0, 'rows': 0}
+        for file_name in file_names:
+            path = os.path.join(self.watch_dir, file_name)
+            if not os.path.exists(path):
+                continue
+            dropped_at = os.stat(path).st_mtime
+            try:
+                df = self.pipeline.read_prediction_file(path)
+            except Exception as e:
+                self.logger.log_exception(f"Failed to parse {path}: {e}")
+                df = None
+            if df is None:
+                shutil.move(path, self.archive_path(file_name, 'rejected'))
+                self.metrics.inc('files', stage='watch', status='rejected')
+                summary['rejected'] += 1
+                continue
+            frames.append(df)
+            scored.append((file_name, path, dropped_at, len(df)))
+
+        if frames:
+            model = self.pipeline.load_model()
+            features = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+            labels = self.pipeline.predict_labels(model, features)
+            offsets = np.cumsum([0] + [rows for *_, rows in scored])
+            for (file_name, path, dropped_at, rows), offset in zip(scored, offsets):
+                stem = os.path.splitext(file_name)[0]
+                result_path = os.path.join(self.results_dir, f"{stem}_results.csv")
+                pd.DataFrame({'good_bad': labels[offset:offset + rows]}).to_csv(result_path, index=False)
+                shutil.move(path, self.archive_path(file_name))
+                latency = time.time() - dropped_at
+                self.metrics.observe('watch_latency_seconds', latency)
+                self.metrics.inc('files', stage='watch', status='scored')
+                self.logger.log_info("Scored %s (%d rows) in %.3fs from drop to result.", file_name, rows, latency)
+                summary['scored'] += 1
+                summary['rows'] += rows
+
+        self.metrics.observe('batch_seconds', time.perf_counter() - start, stage='watch')
+        self.metrics.write_snapshot(self.metrics_path)
+        return summary
+
+    def schedule_retry(self, file_names, error):
+        """
+        Schedules the files of a failed batch for another attempt, or moves them to
+        archive/failed once they have failed max_retries + 1 times.
+        """
+        now = time.monotonic()
+        for file_name in file_names:
+            path = os.path.join(self.watch_dir, file_name)
+            if not os.path.exists(path):
+                continue
+            attempts = self.attempts.get(file_name, 0) + 1
+            if attempts > self.max_retries:
+                self.attempts.pop(file_name, None)
+                shutil.move(path, self.archive_path(file_name, 'failed'))
+                self.metrics.inc('files', stage='watch', status='failed')
+                self.logger.log_error(f"Giving up on {file_name} after {attempts} failed attempts ({error}); moved to failed.")
+                continue
+            self.attempts[file_name] = attempts
+            self.retry_at[file_name] = now + self.retry_delay * 2 ** (attempts - 1)
+            self.logger.log_warning(f"Scoring {file_name} failed ({error}); retry {attempts} of {self.max_retries} scheduled.")
+
+    def stop(self, *args):
+        """
+        Asks the watch loop to exit after the current batch.
+        """
+        self.running = False
+
+    def run(self):
+        """
+        Scores the files already waiting in the watch directory, then watches it until
+        stop() is called or the process receives SIGINT or SIGTERM.
+        """
+        self.running = True
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.stop)
+            signal.signal(signal.SIGTERM, self.stop)
+        watcher = self.create_watcher()
+        now = time.monotonic()
+        pending = {name: now for name in sorted(os.listdir(self.watch_dir))}
+        last_event = now
+        try:
+            while self.running:
+                names = watcher.wait(self.debounce if pending or self.retry_at else self.poll_interval)
+                now = time.monotonic()
+                for name in names:
+                    pending.setdefault(name, now)
+                    last_event = now
+                for name, due in list(self.retry_at.items()):
+                    if now >= due:
+                        del self.retry_at[name]
+                        pending.setdefault(name, now)
+                pending = {name: seen for name, seen in pending.items() if name.lower().endswith('.csv')}
+                if not pending:
+                    continue
+                quiet = now - last_event >= self.debounce
+                overdue = now - min(pending.values()) >= self.max_wait
+                if quiet or overdue or len(pending) >= self.max_batch_files:
+                    batch = sorted(pending, key=pending.get)[:self.max_batch_files]
+                    for name in batch:
+                        del pending[name]
+                    try:
+                        summary = self.process_batch(batch)
+                        self.logger.log_info("Watch batch: %s", summary)
+                    except Exception as e:
+                        self.logger.log_exception(f"Watch batch failed: {e}")
+                        self.schedule_retry(batch, e)
+                    else:
+                        for name in batch:
+                            self.attempts.pop(name, None)
+        finally:
+            watcher.close()
+
+if __name__ == "__main__":
+    WatchFolderService().run()
@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from sensorqualityclassifier.utils.common import file_sha256
+from sensorqualityclassifier.utils.logger import AppLogger
+
+class ColumnarCache:
+    """
+    An on-disk columnar cache of parsed batch files, keyed by file content hash.
+
+    Each cached file is a directory named after the SHA-256 of the CSV holding:
+        - columns.json: the original column names,
+        - wafer.npy: the wafer (first) column as a fixed-width string array,
+        - values.npy: every other column as one float64 matrix.
+
+    values.npy is memory-mapped on read, so a cached batch file is turned back into
+    a DataFrame without parsing text and without copying the matrix.
+
+    Every read refreshes the mtime of the entry's columns.json. After each write,
+    entries unused for more than max_age_days are removed, then the least recently used
+    ones until the cache holds at most max_bytes.
+
+    Attributes:
+        cache_dir (str): Root directory of the cache.
+        max_bytes (int): Size limit of the cache, None for no limit.
+        max_age_days (float): Age limit of unused entries, None for no limit.
+        stats (dict): Number of cache hits, misses and evictions since construction.
+    """
+
+    # Temporary entry directories older than this are left over from a crashed writer
+    STALE_TMP_SECONDS = 3600
+
+    def __init__(self, cache_dir, max_bytes=None, max_age_days=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.logger = AppLogger()
+        self.stats = {'hits': 0, 'misses': 0, 'evicted': 0}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Creates the cache from the columnar_cache_* settings of the configuration.
+        """
+        max_mb = config.get('columnar_cache_max_mb')
+        return cls(
+            config.get('columnar_cache_dir', 'artifacts/columnar_cache'),
+            max_bytes=int(max_mb * (1 << 20)) if max_mb else None,
+            max_age_days=config.get('columnar_cache_max_age_days'),
+        )
+
+    def entry_dir(self, key):
+        """
+        Returns the directory of a cache entry.
+        """
+        return os.path.join(self.cache_dir, key)
+
+    def contains(self, key):
+        """
+        Checks whether a complete entry exists for a content hash.
+        """
+        return os.path.exists(os.path.join(self.entry_dir(key), 'columns.json'))
+
+    def get(self, key):
+        """
+        Reads a cached batch file back as a DataFrame.
+
+        Parameters:
+            key (str): Content hash of the batch file.
+
+        Returns:
+            pd.DataFrame: The cached data, or None if the key is not cached.
+        """
+        if not self.contains(key):
+            return None
+        entry_dir = self.entry_dir(key)
+        try:
+            with open(os.path.join(entry_dir, 'columns.json'), 'r') as file:
+                columns = json.load(file)
+            values = np.load(os.path.join(entry_dir, 'values.npy'), mmap_mode='r')
+            wafer = np.load(os.path.join(entry_dir, 'wafer.npy'))
+            os.utime(os.path.join(entry_dir, 'columns.json'))
+        except OSError:
+            # Evicted by another process in the meantime
+            return None
+        df = pd.DataFrame(values, columns=columns[1:], copy=False)
+        df.insert(0, columns[0], wafer)
+        return df
+
+    def put(self, key, df):
+        """
+        Stores a parsed batch file. The entry is written to a temporary directory
+        and renamed into place, so readers never see a partial entry.
+
+        Parameters:
+            key (str): Content hash of the batch file.
+            df (pd.DataFrame): The batch file as read by pd.read_csv.
+        """
+        columns = [str(col) for col in df.columns]
+        values = df.iloc[:, 1:].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+        wafer = df.iloc[:, 0].astype(str).to_numpy(dtype=str)
+
+        tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix='.tmp-')
+        try:
+            np.save(os.path.join(tmp_dir, 'values.npy'), values)
+            np.save(os.path.join(tmp_dir, 'wafer.npy'), wafer)
+            with open(os.path.join(tmp_dir, 'columns.json'), 'w') as file:
+                json.dump(columns, file)
+            os.replace(tmp_dir, self.entry_dir(key))
+        except OSError:
+            # Another process cached the same content first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not self.contains(key):
+                raise
+        self.evict()
+
+    def evict(self):
+        """
+        Removes entries unused for more than max_age_days, then the least recently used
+        entries until the cache fits in max_bytes, and temporary directories left behind
+        by crashed writers.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        if self.max_bytes is None and self.max_age_days is None:
+            return 0
+        now = time.time()
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.is_dir():
+                continue
+            try:
+                if entry.name.startswith('.tmp-'):
+                    if now - entry.stat().st_mtime > self.STALE_TMP_SECONDS:
+                        shutil.rmtree(entry.path, ignore_errors=True)
+                    continue
+                used = os.stat(os.path.join(entry.path, 'columns.json')).st_mtime
+                size = sum(child.stat().st_size for child in os.scandir(entry.path))
+            except OSError:
+                continue
+            entries.append((used, size, entry.path))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        max_age = self.max_age_days * 86400 if self.max_age_days is not None else None
+        removed = 0
+        for used, size, path in entries:
+            too_old = max_age is not None and now - used > max_age
+            too_big = self.max_bytes is not None and total > self.max_bytes
+            if not (too_old or too_big):
+                # Entries are sorted by last use, the remaining ones are newer
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed += 1
+        if removed:
+            self.stats['evicted'] += removed
+            self.logger.log_info("Columnar cache: evicted %d entries, %d bytes remain.", removed, total)
+        return removed
+
+    def load_csv(self, file_path, key=None):
+        """
+        Returns a batch file as a DataFrame, parsing the CSV only if its content
+        is not cached yet.
+
+        Parameters:
+            file_path (str): Path to the CSV batch file.
+            key (str): Known content hash of the file, computed if None.
+
+        Returns:
+            pd.DataFrame: The batch file content.
+        """
+        if key is None:
+            key = file_sha256(file_path)
+        df = self.get(key)
+        if df is not None:
+            self.stats['hits'] += 1
+            return df
+        self.stats['misses'] += 1
+        df = pd.read_csv(file_path)
+        self.put(key, df)
+        cached = self.get(key)
+        # The entry alone may exceed max_bytes and be evicted right away
+        return cached if cached is not None else df
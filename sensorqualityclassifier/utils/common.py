@@ -0,0 +1,32 @@
+import hashlib
+
+def file_sha256(file_path, block_size=1 << 20):
+    """
+    Computes the SHA-256 digest of a file without reading it into memory at once.
+
+    Parameters:
+        file_path (str): Path to the file to hash.
+        block_size (int): Number of bytes read per iteration.
+
+    Returns:
+        str: Hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def peak_rss_bytes():
+    """
+    Returns the peak resident set size of the current process in bytes, or None on
+    platforms without the resource module (e.g. Windows).
+    """
+    try:
+        import resource
+        import sys
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
@@ -0,0 +1,133 @@
+import os
+import json
+import threading
+import time
+from sensorqualityclassifier.utils.common import file_sha256
+
+class FileManifest:
+    """
+    A persistent record of every batch file seen by the validation and loading pipelines.
+
+    Each entry is keyed by file name and holds the file size, mtime, content hash,
+    validation verdict and load status. A file whose size and mtime (or, failing that,
+    content hash) still match its entry is unchanged, so validation and loading can
+    skip it and the work done per run scales with the new or changed files only.
+
+    Validation only reads file headers, so it records size and mtime; the content hash
+    is added when the whole file is read anyway (archive members, loading) or when a
+    matching size with a different mtime has to be resolved.
+
+    Attributes:
+        manifest_path (str): Path of the JSON file backing the manifest.
+        entries (dict): Manifest entries keyed by file name.
+    """
+
+    def __init__(self, manifest_path):
+        self.manifest_path = manifest_path
+        self._lock = threading.Lock()
+        self.entries = self.read()
+
+    def read(self):
+        """
+        Reads the manifest from disk, returning an empty manifest if it does not exist.
+        """
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, 'r') as file:
+            return json.load(file)
+
+    def save(self):
+        """
+        Writes the manifest atomically, so an interrupted run never corrupts it.
+        """
+        directory = os.path.dirname(self.manifest_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.manifest_path + '.tmp'
+        with self._lock:
+            with open(tmp_path, 'w') as file:
+                json.dump(self.entries, file, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    @staticmethod
+    def fingerprint(file_path):
+        """
+        Returns the size and mtime of a file.
+        """
+        stat = os.stat(file_path)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def get_entry(self, file_name):
+        """
+        Returns the recorded entry of a file, or None if it has never been seen.
+        """
+        with self._lock:
+            return self.entries.get(file_name)
+
+    def get_unchanged(self, file_name, file_path):
+        """
+        Returns the entry of a file if its content has not changed since it was recorded.
+
+        The content hash is only computed when size matches but mtime differs, e.g.
+        when the same archive is extracted again. An entry recorded without a hash
+        cannot prove its content, so such a file is reported as changed.
+
+        Parameters:
+            file_name (str): Name of the file.
+            file_path (str): Current path of the file.
+
+        Returns:
+            dict: The manifest entry, or None if the file is new or changed.
+        """
+        entry = self.get_entry(file_name)
+        if entry is None:
+            return None
+        fingerprint = self.fingerprint(file_path)
+        if fingerprint['size'] != entry['size']:
+            return None
+        if fingerprint['mtime_ns'] != entry['mtime_ns']:
+            if not entry.get('sha256') or file_sha256(file_path) != entry['sha256']:
+                return None
+            with self._lock:
+                entry['mtime_ns'] = fingerprint['mtime_ns']
+        return entry
+
+    def record_validation(self, file_name, file_path, valid, reason=None, sha256=None):
+        """
+        Records the validation verdict of a file. Call it before the file is moved.
+
+        Parameters:
+            file_name (str): Name of the file.
+            file_path (str): Current path of the file.
+            valid (bool): Whether the file passed validation.
+            reason (str): Why the file was rejected.
+            sha256 (str): Content hash if already known. It is not computed here, so
+                header-only validation never reads the whole file.
+        """
+        entry = self.fingerprint(file_path)
+        entry.update({
+            'sha256': sha256,
+            'valid': valid,
+            'reason': reason,
+            'validated_at': time.time(),
+            'loaded': False,
+        })
+        with self._lock:
+            self.entries[file_name] = entry
+
+    def mark_loaded(self, file_name, file_path, sha256=None):
+        """
+        Records that a file has been loaded, refreshing its entry if it was unknown or changed.
+
+        Parameters:
+            file_name (str): Name of the file.
+            file_path (str): Current path of the file.
+            sha256 (str): Content hash computed while loading, stored if the entry has none.
+        """
+        if self.get_unchanged(file_name, file_path) is None:
+            self.record_validation(file_name, file_path, True, sha256=sha256)
+        with self._lock:
+            if sha256 and not self.entries[file_name].get('sha256'):
+                self.entries[file_name]['sha256'] = sha256
+            self.entries[file_name]['loaded'] = True
+            self.entries[file_name]['loaded_at'] = time.time()
@@ -1,54 +1,110 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import threading
 from datetime import datetime
-import sys
 
-class AppLogger:
-    def __init__(self):
-        self.log_directory = "logs"
-        self.file_name = datetime.now().strftime("%Y-%m-%d") + ".log"
-        self.create_log_directory()
+LOGGER_NAME = __name__
 
-        # Create logger
-        self.logger = logging.getLogger(__name__)
-        self.logger.setLevel(logging.INFO)
+# Background writer shared by every AppLogger of the process
+_setup_lock = threading.Lock()
+_setup_pid = None
+_listener = None
+_queue_handler = None
 
-        # Create file handler which logs even debug messages
-        file_handler = logging.FileHandler(os.path.join(self.log_directory, self.file_name))
-        file_handler.setLevel(logging.INFO)
+def _stop_listener():
+    """
+    Flushes the queued records and stops the background writer.
+    """
+    global _listener
+    if _listener is not None and _setup_pid == os.getpid():
+        _listener.stop()
+        _listener = None
 
-        # Create console handler with a higher log level
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.ERROR)
+def configure_logging(log_directory="logs"):
+    """
+    Sets up the application logger once per process: records are put on an in-memory
+    queue by the calling thread and written to the daily log file (and errors to the
+    console) by a background QueueListener thread.
 
-        # Create formatter and add it to the handlers
+    Calling it again is a no-op, except in a forked child process, where the parent's
+    listener thread does not exist and a new one is started.
+
+    Returns:
+        logging.Logger: The configured application logger.
+    """
+    global _setup_pid, _listener, _queue_handler
+    logger = logging.getLogger(LOGGER_NAME)
+    if _setup_pid == os.getpid():
+        return logger
+    with _setup_lock:
+        if _setup_pid == os.getpid():
+            return logger
+        if _queue_handler is not None:
+            logger.removeHandler(_queue_handler)
+
+        os.makedirs(log_directory, exist_ok=True)
+        file_name = datetime.now().strftime("%Y-%m-%d") + ".log"
         formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+        file_handler = logging.FileHandler(os.path.join(log_directory, file_name))
+        file_handler.setLevel(logging.INFO)
         file_handler.setFormatter(formatter)
+
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.ERROR)
         console_handler.setFormatter(formatter)
 
-        # Add the handlers to the logger
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        log_queue = queue.SimpleQueue()
+        _queue_handler = logging.handlers.QueueHandler(log_queue)
+        _listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+        _listener.start()
+
+        logger.setLevel(logging.INFO)
+        logger.addHandler(_queue_handler)
+        if _setup_pid is None:
+            atexit.register(_stop_listener)
+        _setup_pid = os.getpid()
+    return logger
+
+class AppLogger:
+    """
+    Thin wrapper around the shared application logger.
+
+    Creating an AppLogger is cheap: handlers are only set up once per process by
+    configure_logging. Messages accept %-style arguments, which are only formatted
+    when the level is enabled, e.g. logger.log_debug("rows=%s", df.head()).
+    """
+
+    def __init__(self):
+        self.log_directory = "logs"
+        self.logger = configure_logging(self.log_directory)
+
+    def is_enabled(self, level):
+        """Returns True if messages of the given level (e.g. logging.DEBUG) are emitted."""
+        return self.logger.isEnabledFor(level)
 
-    def create_log_directory(self):
-        if not os.path.exists(self.log_directory):
-            os.makedirs(self.log_directory)
+    def log_debug(self, message, *args):
+        """Logs a debug message."""
+        self.logger.debug(message, *args)
 
-    def log_info(self, message):
+    def log_info(self, message, *args):
         """Logs an info message."""
-        self.logger.info(message)
+        self.logger.info(message, *args)
 
-    def log_error(self, message):
+    def log_error(self, message, *args):
         """Logs an error message."""
-        self.logger.error(message)
+        self.logger.error(message, *args)
 
-    def log_warning(self, message):
+    def log_warning(self, message, *args):
         """Logs a warning message."""
-        self.logger.warning(message)
+        self.logger.warning(message, *args)
 
-    def log_exception(self, message):
+    def log_exception(self, message, *args):
         """Logs an exception message."""
-        self.logger.exception(message)
+        self.logger.exception(message, *args)
 
 # Example Usage
 if __name__ == "__main__":
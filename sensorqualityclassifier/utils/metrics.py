@@ -0,0 +1,170 @@
+import os
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class MetricsRegistry:
+    """
+    A process-wide collection of counters and latency histograms.
+
+    Counters track totals such as rows, files, bytes and good/bad wafers. Histograms
+    track durations (model loads, predict calls, and every span() around a stage or a
+    file). Each series is identified by a metric name plus optional labels, e.g.
+    stage_seconds{stage="validation"}.
+
+    The collected values can be exported as Prometheus text (to_prometheus) or as a
+    JSON snapshot (snapshot, write_snapshot).
+
+    Attributes:
+        buckets (tuple): Upper bounds in seconds of the histogram buckets.
+        counters (dict): Counter values keyed by (name, labels).
+        histograms (dict): Bucket counts, sum and count keyed by (name, labels).
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        """
+        Returns the registry shared by the whole process.
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def series_key(name, labels):
+        """
+        Returns the key of a series: the metric name and its labels sorted by name.
+        """
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        """
+        Adds value to a counter.
+        """
+        key = self.series_key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """
+        Records one observation (in seconds) in a histogram.
+        """
+        key = self.series_key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+                self.histograms[key] = histogram
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram['buckets'][index] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    @contextmanager
+    def span(self, name, **labels):
+        """
+        Times the enclosed block and records its wall time in the histogram
+        <name>_seconds, also when the block raises.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(f"{name}_seconds", time.perf_counter() - start, **labels)
+
+    def reset(self):
+        """
+        Drops every collected value.
+        """
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self):
+        """
+        Returns the collected values as a JSON-serializable dict.
+        """
+        with self._lock:
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self.counters.items())
+            ]
+            histograms = [
+                {
+                    'name': name,
+                    'labels': dict(labels),
+                    'count': histogram['count'],
+                    'sum': histogram['sum'],
+                    'mean': histogram['sum'] / histogram['count'],
+                    'buckets': dict(zip([str(bound) for bound in self.buckets], histogram['buckets'])),
+                }
+                for (name, labels), histogram in sorted(self.histograms.items())
+            ]
+        return {'timestamp': time.time(), 'counters': counters, 'histograms': histograms}
+
+    def write_snapshot(self, file_path):
+        """
+        Writes the JSON snapshot to file_path atomically.
+        """
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = file_path + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(self.snapshot(), file, indent=2)
+        os.replace(tmp_path, file_path)
+
+    @staticmethod
+    def format_labels(labels, extra=()):
+        """
+        Formats labels in the Prometheus exposition syntax.
+        """
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ''
+        escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+        return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+    def to_prometheus(self, prefix='sqc_'):
+        """
+        Returns the collected values in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, dict(value, buckets=list(value['buckets']))) for key, value in self.histograms.items())
+
+        declared = set()
+        for (name, labels), value in counters:
+            metric = f"{prefix}{name}_total"
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} counter")
+                declared.add(metric)
+            lines.append(f"{metric}{self.format_labels(labels)} {value}")
+
+        for (name, labels), histogram in histograms:
+            metric = f"{prefix}{name}"
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} histogram")
+                declared.add(metric)
+            for bound, count in zip(self.buckets, histogram['buckets']):
+                lines.append(f"{metric}_bucket{self.format_labels(labels, [('le', str(bound))])} {count}")
+            lines.append(f"{metric}_bucket{self.format_labels(labels, [('le', '+Inf')])} {histogram['count']}")
+            lines.append(f"{metric}_sum{self.format_labels(labels)} {histogram['sum']}")
+            lines.append(f"{metric}_count{self.format_labels(labels)} {histogram['count']}")
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+from sensorqualityclassifier.utils.common import file_sha256
+from sensorqualityclassifier.utils.logger import AppLogger
+from sensorqualityclassifier.utils.metrics import MetricsRegistry
+from sensorqualityclassifier.utils.native_model import NativeModel
+
+class ModelRegistry:
+    """
+    A process-wide cache of deserialized model artifacts.
+
+    Every artifact is loaded once per process and shared by all pipeline instances
+    (and therefore by all Streamlit sessions served from the same process). An artifact
+    is only reloaded when its file changes on disk: a changed mtime or size triggers a
+    content hash, and the model is deserialized again only if that hash differs.
+
+    Attributes:
+        logger (AppLogger): Logger for logging information and errors.
+        metrics (MetricsRegistry): Receives model load latencies and cache hits.
+        entries (dict): Cached models keyed by absolute artifact path.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self.logger = AppLogger()
+        self.metrics = MetricsRegistry.instance()
+        self.entries = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        """
+        Returns the registry shared by the whole process.
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def file_fingerprint(file_path):
+        """
+        Returns a cheap fingerprint (mtime, size) of a file.
+        """
+        stat = os.stat(file_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def file_hash(file_path):
+        """
+        Returns the SHA-256 digest of a file.
+        """
+        return file_sha256(file_path)
+
+    def load_artifact(self, file_path):
+        """
+        Deserializes a model artifact from disk: a native model when given its manifest
+        (*.manifest.json), a joblib pickle otherwise.
+        """
+        if file_path.endswith('.manifest.json'):
+            return NativeModel.load(file_path)
+        import joblib
+        return joblib.load(file_path)
+
+    def get_model(self, file_path):
+        """
+        Returns the model stored at file_path, loading it only on first use or
+        when the artifact has changed since it was cached.
+
+        Parameters:
+            file_path (str): Path to the model artifact.
+
+        Returns:
+            object: The deserialized model.
+        """
+        key = os.path.abspath(file_path)
+        fingerprint = self.file_fingerprint(key)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry['fingerprint'] == fingerprint:
+                entry['hits'] += 1
+                self.metrics.inc('model_cache_hits')
+                return entry['model']
+
+            content_hash = self.file_hash(key)
+            if entry is not None and entry['hash'] == content_hash:
+                # Touched but not modified, keep the warm model
+                entry['fingerprint'] = fingerprint
+                entry['hits'] += 1
+                self.metrics.inc('model_cache_hits')
+                return entry['model']
+
+            start = time.perf_counter()
+            model = self.load_artifact(key)
+            load_seconds = time.perf_counter() - start
+            self.metrics.observe('model_load_seconds', load_seconds)
+            self.metrics.inc('model_loads')
+            loads = entry['loads'] + 1 if entry is not None else 1
+            self.entries[key] = {
+                'model': model,
+                'derived': {},
+                'fingerprint': fingerprint,
+                'hash': content_hash,
+                'loads': loads,
+                'hits': entry['hits'] if entry is not None else 0,
+                'last_load_seconds': load_seconds,
+                'loaded_at': time.time(),
+            }
+            self.logger.log_info(f"Model loaded from {key} in {load_seconds:.4f}s (load #{loads}).")
+            return model
+
+    def get_derived(self, file_path, name, build_fn):
+        """
+        Returns an object derived from a cached model (e.g. a compiled prediction
+        backend). It is built once per model load and rebuilt when the model reloads.
+
+        Parameters:
+            file_path (str): Path to the model artifact.
+            name (str): Name of the derived object.
+            build_fn (callable): Builds the derived object from the model.
+
+        Returns:
+            object: The derived object.
+        """
+        self.get_model(file_path)
+        key = os.path.abspath(file_path)
+        with self._lock:
+            entry = self.entries[key]
+            derived = entry['derived']
+            if name not in derived:
+                start = time.perf_counter()
+                derived[name] = build_fn(entry['model'])
+                self.logger.log_info(f"Built {name} for {key} in {time.perf_counter() - start:.4f}s.")
+            return derived[name]
+
+    def get_version(self, file_path):
+        """
+        Returns the content hash of a cached artifact, or None if it is not loaded.
+        """
+        entry = self.entries.get(os.path.abspath(file_path))
+        return entry['hash'] if entry is not None else None
+
+    def get_stats(self):
+        """
+        Returns load time and cache hit statistics for every cached artifact.
+
+        Returns:
+            dict: Per-artifact statistics keyed by absolute path.
+        """
+        with self._lock:
+            return {
+                key: {
+                    'hash': entry['hash'],
+                    'loads': entry['loads'],
+                    'hits': entry['hits'],
+                    'last_load_seconds': entry['last_load_seconds'],
+                    'loaded_at': entry['loaded_at'],
+                }
+                for key, entry in self.entries.items()
+            }
+
+    def clear(self):
+        """
+        Drops every cached model, forcing the next request to reload from disk.
+        """
+        with self._lock:
+            self.entries.clear()
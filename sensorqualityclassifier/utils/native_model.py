@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import numpy as np
+from sensorqualityclassifier.utils.common import file_sha256
+
+class NativeModel:
+    """
+    A binary XGBoost classifier loaded from the booster's native serialization format
+    instead of a pickle.
+
+    The training pipeline writes the booster with Booster.save_model next to the
+    pickle, plus a sidecar manifest holding the feature names in order, the class
+    labels, the training timestamp, the metrics and the SHA-256 of the native file.
+    Loading it needs neither the pickled Python objects nor the exact library version
+    they were pickled with, and skips the unpickling cost.
+
+    The class exposes the parts of XGBClassifier used by inference (predict,
+    predict_proba, get_booster, classes_), so it can be served by either prediction backend.
+
+    Attributes:
+        booster (xgb.Booster): The loaded booster.
+        classes_ (np.ndarray): Class labels, negative class first.
+        feature_names (list): Feature names in the order expected by the booster.
+        manifest (dict): Content of the sidecar manifest.
+    """
+
+    MODEL_FORMAT = 'xgboost-native'
+
+    def __init__(self, booster, classes, feature_names, manifest=None):
+        self.booster = booster
+        self.classes_ = np.asarray(classes)
+        self.feature_names = feature_names
+        self.manifest = manifest or {}
+
+    @staticmethod
+    def manifest_path_for(model_path):
+        """
+        Returns the manifest path belonging to a model artifact ('xgboost_model.pkl' ->
+        'xgboost_model.manifest.json').
+        """
+        return os.path.splitext(model_path)[0] + '.manifest.json'
+
+    @staticmethod
+    def native_extension(xgboost_version):
+        """
+        Returns the file extension selecting the native format: binary UBJSON ('.ubj',
+        the fastest to load) from XGBoost 1.6 on, the legacy binary format before.
+        """
+        major_minor = tuple(int(part) for part in xgboost_version.split('.')[:2] if part.isdigit())
+        return '.ubj' if major_minor >= (1, 6) else '.model'
+
+    @classmethod
+    def save(cls, model, model_path, metrics=None):
+        """
+        Writes the booster of a trained XGBClassifier in the native format and its manifest
+        next to model_path. The manifest is written last, so it only ever points to a
+        complete model file.
+
+        Parameters:
+            model (xgb.XGBClassifier): The trained classifier.
+            model_path (str): Path of the pickled artifact the native files accompany.
+            metrics (dict): Evaluation metrics to record.
+
+        Returns:
+            str: Path of the manifest.
+        """
+        import xgboost as xgb
+        booster = model.get_booster()
+        native_path = os.path.splitext(model_path)[0] + cls.native_extension(xgb.__version__)
+        booster.save_model(native_path)
+        manifest = {
+            'format': cls.MODEL_FORMAT,
+            'model_file': os.path.basename(native_path),
+            'sha256': file_sha256(native_path),
+            'features': list(booster.feature_names or []),
+            'classes': np.asarray(model.classes_).tolist(),
+            'trained_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'metrics': metrics or {},
+            'xgboost_version': xgb.__version__,
+        }
+        manifest_path = cls.manifest_path_for(model_path)
+        tmp_path = manifest_path + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(manifest, file, indent=2)
+        os.replace(tmp_path, manifest_path)
+        return manifest_path
+
+    @classmethod
+    def load(cls, manifest_path):
+        """
+        Loads the native model described by a manifest.
+
+        Raises:
+            ValueError: If the model file does not match the hash recorded in the manifest.
+        """
+        import xgboost as xgb
+        with open(manifest_path, 'r') as file:
+            manifest = json.load(file)
+        native_path = os.path.join(os.path.dirname(manifest_path), manifest['model_file'])
+        if file_sha256(native_path) != manifest['sha256']:
+            raise ValueError(f"{native_path} does not match the hash recorded in {manifest_path}.")
+        booster = xgb.Booster()
+        booster.load_model(native_path)
+        if manifest['features']:
+            booster.feature_names = manifest['features']
+        return cls(booster, manifest['classes'], manifest['features'] or None, manifest)
+
+    def get_booster(self):
+        return self.booster
+
+    def positive_probability(self, X):
+        """
+        Returns the probability of the positive class for every row.
+        """
+        import xgboost as xgb
+        if hasattr(X, 'columns'):
+            dmatrix = xgb.DMatrix(X.to_numpy(dtype=np.float32), feature_names=list(X.columns))
+        else:
+            dmatrix = xgb.DMatrix(np.asarray(X, dtype=np.float32), feature_names=self.feature_names)
+        return self.booster.predict(dmatrix)
+
+    def predict_proba(self, X):
+        """
+        Returns class probabilities shaped like XGBClassifier.predict_proba.
+        """
+        positive = self.positive_probability(X)
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X):
+        """
+        Returns the predicted class labels, identical to XGBClassifier.predict.
+        """
+        return self.classes_[(self.positive_probability(X) > 0.5).astype(np.intp)]
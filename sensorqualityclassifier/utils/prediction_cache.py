@@ -0,0 +1,213 @@
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+class PredictionCache:
+    """
+    A content-addressed cache of predicted labels.
+
+    Every prepared feature row is identified by a 64-bit hash of its values, and every
+    label is stored under (model version, row hash), the model version being the content
+    hash of the model artifact. Rescoring a resubmitted file therefore only sends the
+    rows never seen by the current model to predict, and a new model never gets labels
+    predicted by an older one.
+
+    Lookups go to an in-memory LRU tier first, then to a SQLite file. The file keeps at
+    most max_disk_rows labels and the least recently used ones are evicted first, so
+    labels of models no longer in use age out while a process alternating between two
+    artifacts keeps the labels of both. The row count is tracked in memory, and writes
+    are committed once commit_rows rows or commit_seconds have accumulated, or on flush.
+
+    Attributes:
+        cache_path (str): Path of the SQLite file.
+        memory_rows (int): Capacity of the in-memory LRU tier.
+        max_disk_rows (int): Capacity of the on-disk tier.
+        disk_rows (int): Rows in the on-disk tier as counted by this process.
+        stats (dict): Hits (memory and disk) and misses since the last reset_stats.
+    """
+
+    # SQLite caps the number of bound parameters per statement
+    QUERY_CHUNK = 900
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, cache_path, memory_rows=100000, max_disk_rows=1000000, commit_rows=10000, commit_seconds=5.0):
+        self.cache_path = cache_path
+        self.memory_rows = memory_rows
+        self.max_disk_rows = max_disk_rows
+        self.commit_rows = commit_rows
+        self.commit_seconds = commit_seconds
+        self.memory = OrderedDict()
+        self._pending_rows = 0
+        self._last_commit = time.monotonic()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+        self._lock = threading.Lock()
+        directory = os.path.dirname(cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(cache_path, timeout=30, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            "model_version TEXT NOT NULL, row_hash INTEGER NOT NULL, label INTEGER NOT NULL, "
+            "accessed REAL NOT NULL, PRIMARY KEY (model_version, row_hash))"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS predictions_accessed ON predictions (accessed)")
+        self.connection.commit()
+        self.disk_rows = self.count_disk_rows()
+
+    @classmethod
+    def shared(cls, cache_path, memory_rows=100000, max_disk_rows=1000000):
+        """
+        Returns the cache of cache_path shared by the whole process, so the in-memory tier
+        outlives individual pipeline instances. Forked worker processes get their own
+        instance, as SQLite connections must not cross a fork.
+        """
+        key = (os.getpid(), os.path.abspath(cache_path))
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(cache_path, memory_rows, max_disk_rows)
+                atexit.register(cls._instances[key].flush)
+            return cls._instances[key]
+
+    @staticmethod
+    def row_hashes(features):
+        """
+        Returns the 64-bit content hash of every feature row, as signed integers so they
+        fit SQLite's INTEGER type.
+        """
+        return pd.util.hash_pandas_object(features, index=False).to_numpy(dtype=np.uint64).view(np.int64)
+
+    def count_disk_rows(self):
+        """
+        Counts the rows of the on-disk tier, including those written by other processes.
+        """
+        return self.connection.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+    def flush(self):
+        """
+        Commits the writes accumulated since the last commit.
+        """
+        with self._lock:
+            self._commit()
+
+    def _commit(self):
+        self.connection.commit()
+        self._pending_rows = 0
+        self._last_commit = time.monotonic()
+
+    def _maybe_commit(self, rows):
+        """
+        Counts rows written in the open transaction and commits when enough rows or time
+        have accumulated.
+        """
+        self._pending_rows += rows
+        if self._pending_rows >= self.commit_rows or time.monotonic() - self._last_commit >= self.commit_seconds:
+            self._commit()
+
+    def lookup(self, model_version, hashes):
+        """
+        Looks up the labels of the given rows.
+
+        Parameters:
+            model_version (str): Content hash of the model artifact.
+            hashes (np.ndarray): Row hashes from row_hashes.
+
+        Returns:
+            tuple: Labels (undefined where missed) and a boolean mask of the hits.
+        """
+        labels = np.zeros(len(hashes), dtype=np.int64)
+        hits = np.zeros(len(hashes), dtype=bool)
+        with self._lock:
+            disk_positions = {}
+            for position, row_hash in enumerate(hashes.tolist()):
+                label = self.memory.get((model_version, row_hash))
+                if label is not None:
+                    self.memory.move_to_end((model_version, row_hash))
+                    labels[position] = label
+                    hits[position] = True
+                else:
+                    disk_positions.setdefault(row_hash, []).append(position)
+            memory_hits = int(hits.sum())
+
+            keys = list(disk_positions)
+            found = []
+            for offset in range(0, len(keys), self.QUERY_CHUNK):
+                chunk = keys[offset:offset + self.QUERY_CHUNK]
+                found.extend(self.connection.execute(
+                    f"SELECT row_hash, label FROM predictions WHERE model_version = ? "
+                    f"AND row_hash IN ({','.join('?' * len(chunk))})",
+                    [model_version, *chunk],
+                ).fetchall())
+            if found:
+                now = time.time()
+                self.connection.executemany(
+                    "UPDATE predictions SET accessed = ? WHERE model_version = ? AND row_hash = ?",
+                    [(now, model_version, row_hash) for row_hash, _ in found],
+                )
+                self._maybe_commit(len(found))
+            for row_hash, label in found:
+                for position in disk_positions[row_hash]:
+                    labels[position] = label
+                    hits[position] = True
+                self.remember((model_version, row_hash), label)
+
+            self.stats['memory_hits'] += memory_hits
+            self.stats['disk_hits'] += int(hits.sum()) - memory_hits
+            self.stats['misses'] += int((~hits).sum())
+        return labels, hits
+
+    def remember(self, key, label):
+        """
+        Adds a label under (model version, row hash) to the in-memory tier, evicting the
+        least recently used one when full.
+        """
+        self.memory[key] = label
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_rows:
+            self.memory.popitem(last=False)
+
+    def store(self, model_version, hashes, labels):
+        """
+        Stores freshly predicted labels in both tiers and evicts the least recently used
+        rows of the disk tier beyond max_disk_rows.
+        """
+        now = time.time()
+        rows = [(model_version, row_hash, int(label), now) for row_hash, label in zip(hashes.tolist(), np.asarray(labels).tolist())]
+        with self._lock:
+            for _, row_hash, label, _ in rows:
+                self.remember((model_version, row_hash), label)
+            cursor = self.connection.executemany("INSERT OR IGNORE INTO predictions VALUES (?, ?, ?, ?)", rows)
+            self.disk_rows += max(cursor.rowcount, 0)
+            if self.disk_rows > self.max_disk_rows:
+                # Other processes may share the file, recount before evicting
+                self.disk_rows = self.count_disk_rows()
+                excess = self.disk_rows - self.max_disk_rows
+                if excess > 0:
+                    cursor = self.connection.execute(
+                        "DELETE FROM predictions WHERE rowid IN "
+                        "(SELECT rowid FROM predictions ORDER BY accessed LIMIT ?)",
+                        (excess,),
+                    )
+                    self.disk_rows -= cursor.rowcount
+            self._maybe_commit(len(rows))
+
+    def reset_stats(self):
+        """
+        Resets the hit and miss counters, e.g. at the start of a run.
+        """
+        with self._lock:
+            self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    def hit_rate(self):
+        """
+        Returns the fraction of rows served from the cache since the last reset_stats.
+        """
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        total = hits + self.stats['misses']
+        return hits / total if total else 0.0
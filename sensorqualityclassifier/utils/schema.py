@@ -0,0 +1,153 @@
+import os
+import re
+import json
+import threading
+import numpy as np
+
+class CompiledSchema:
+    """
+    The training schema (schema_training.json) compiled once per process and shared by
+    the validation, loading and inference pipelines.
+
+    Column names are normalized once ('Sensor - 1' -> 'sensor_1'); the first column is
+    always the wafer id (wafer_num) and the last one the label (good_bad), whatever the
+    files call them. Headers are matched to the schema by name, and the result is cached
+    per distinct header, so files sharing a header are only ever matched once.
+
+    Attributes:
+        schema (dict): The raw schema.
+        number_of_columns (int): Columns of a training file, wafer id and label included.
+        prediction_columns (int): Columns of a prediction file (no label).
+        column_names (list): Normalized column names in schema order.
+        column_types (list): Normalized type of every column ('varchar', 'float', 'integer').
+        dtypes (list): NumPy dtype of every column.
+        column_index (dict): Normalized column name to its position in the schema.
+        sensor_names (list): Normalized sensor names in schema order.
+        file_name_pattern (re.Pattern): Compiled batch file name pattern.
+    """
+
+    ID_COLUMN = 'wafer_num'
+    LABEL_COLUMN = 'good_bad'
+    TYPE_DTYPES = {'float': np.dtype(np.float64), 'integer': np.dtype(np.int64), 'varchar': np.dtype(object)}
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, schema):
+        self.schema = schema
+        raw_names = list(schema['ColName'])
+        self.number_of_columns = schema['NumberofColumns']
+        self.prediction_columns = self.number_of_columns - 1
+        self.column_types = [col_type.strip().lower() for col_type in schema['ColName'].values()]
+        self.dtypes = [self.TYPE_DTYPES.get(col_type, np.dtype(object)) for col_type in self.column_types]
+        self.column_names = [self.ID_COLUMN] + [self.normalize_column_name(col) for col in raw_names[1:-1]] + [self.LABEL_COLUMN]
+        self.column_index = {name: position for position, name in enumerate(self.column_names)}
+        self.sensor_names = self.column_names[1:-1]
+        self.file_name_pattern = re.compile(
+            r'[Ww]afer_\d{' + str(schema['LengthOfDateStampInFile']) + r'}_\d{' + str(schema['LengthOfTimeStampInFile']) + r'}\.csv$'
+        )
+        self._header_plans = {}
+        self._read_specs = {}
+
+    @classmethod
+    def load(cls, schema_path):
+        """
+        Returns the compiled schema of schema_path, shared by the whole process. The file
+        is read and compiled again only when it changes.
+        """
+        key = (os.path.abspath(schema_path), os.path.getmtime(schema_path))
+        with cls._instances_lock:
+            if key not in cls._instances:
+                with open(schema_path, 'r') as file:
+                    cls._instances[key] = cls(json.load(file))
+            return cls._instances[key]
+
+    @staticmethod
+    def normalize_column_name(col):
+        """
+        Normalizes a raw column name ('Sensor-1', 'Sensor - 1', 'Good/Bad') to the
+        feature name used by the feature store and the model ('sensor_1', 'good_bad').
+        """
+        return col.replace(' ', '').replace('-', '_').replace('/', '_').lower()
+
+    def validate_file_name(self, file_name):
+        """
+        Returns True if file_name matches the batch file name pattern of the schema.
+        """
+        return bool(self.file_name_pattern.match(file_name))
+
+    def header_plan(self, header):
+        """
+        Matches the columns of a file header to the schema by name. The first column is
+        taken as the wafer id and, in a header with a label, the last one as the label.
+
+        Parameters:
+            header (list): Column names of the file.
+
+        Returns:
+            dict: The normalized name ('names') and schema position ('positions', -1 if
+            unknown) of every header column, whether the header has a label column
+            ('labelled'), whether it holds exactly the schema's columns ('complete'),
+            whether they are in schema order ('in_schema_order') and the header indices
+            sorted by schema position ('schema_order').
+        """
+        header = tuple(str(col) for col in header)
+        plan = self._header_plans.get(header)
+        if plan is None:
+            labelled = len(header) == self.number_of_columns
+            names = [self.normalize_column_name(col) for col in header]
+            if names:
+                names[0] = self.ID_COLUMN
+            if labelled:
+                names[-1] = self.LABEL_COLUMN
+            positions = [self.column_index.get(name, -1) for name in names]
+            known = -1 not in positions and len(set(positions)) == len(positions)
+            expected = self.number_of_columns if labelled else self.prediction_columns
+            plan = {
+                'names': names,
+                'positions': positions,
+                'labelled': labelled,
+                'complete': known and len(header) == expected,
+                'in_schema_order': positions == sorted(positions),
+                'schema_order': sorted(range(len(positions)), key=positions.__getitem__),
+            }
+            self._header_plans[header] = plan
+        return plan
+
+    def validate_header(self, header, labelled=True):
+        """
+        Returns True if a header holds exactly the columns of the schema, in any order,
+        with the label column when labelled is True and without it otherwise.
+        """
+        plan = self.header_plan(header)
+        return plan['complete'] and plan['labelled'] == labelled
+
+    def read_spec(self, header, columns=None, float_dtype=np.float64):
+        """
+        Returns what to parse from a CSV with this header: the raw names of the columns
+        whose normalized name is in columns (every sensor by default), and their dtypes,
+        float columns being read as float_dtype.
+
+        Returns:
+            tuple: The usecols list and the dtype map for pandas.read_csv.
+        """
+        key = (tuple(str(col) for col in header), tuple(columns) if columns is not None else None, np.dtype(float_dtype))
+        spec = self._read_specs.get(key)
+        if spec is None:
+            plan = self.header_plan(header)
+            wanted = set(columns if columns is not None else self.sensor_names)
+            usecols, dtype_map = [], {}
+            for raw_name, name, position in zip(key[0], plan['names'], plan['positions']):
+                if name not in wanted or position < 0:
+                    continue
+                usecols.append(raw_name)
+                col_type = self.column_types[position]
+                if col_type == 'float':
+                    dtype_map[raw_name] = key[2]
+                elif col_type == 'integer':
+                    dtype_map[raw_name] = np.int64
+                else:
+                    dtype_map[raw_name] = str
+            spec = (usecols, dtype_map)
+            self._read_specs[key] = spec
+        return spec
@@ -0,0 +1,182 @@
+import json
+import numpy as np
+import pandas as pd
+
+class CompiledTreeEnsemble:
+    """
+    A trained XGBoost binary classifier compiled into flat NumPy arrays.
+
+    Every node of every tree is stored in parallel arrays (feature index, threshold,
+    left child, default direction for missing values, leaf value). Nodes are laid out
+    so that the "no" child always directly follows the "yes" child, so one step of the
+    traversal is next = left + (x >= threshold). Prediction walks all trees for a whole
+    batch at once with vectorized gathers, one step per tree level, without DMatrix
+    construction or per-call library overhead. Leaves point to themselves with a NaN
+    threshold, which lets every row take exactly max_depth steps.
+
+    Attributes:
+        feature_names (list): Feature names in the order expected by the model, or None.
+        classes (np.ndarray): Labels returned for a negative/positive margin.
+        base_margin (float): Margin added to the sum of leaf values.
+        used_features (np.ndarray): Indices of the features referenced by any split.
+    """
+
+    def __init__(self, feature, threshold, left, default_right, value, roots, max_depth,
+                 base_margin=0.0, feature_names=None, classes=None, block_rows=2048):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.default_right = default_right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.base_margin = np.float32(base_margin)
+        self.feature_names = feature_names
+        self.classes = np.asarray(classes) if classes is not None else np.array([0, 1])
+        self.block_rows = block_rows
+        # Only the features referenced by a split are gathered from the input
+        is_split = ~np.isnan(self.threshold)
+        self.used_features = np.unique(self.feature[is_split])
+        self.compact_feature = np.searchsorted(self.used_features, self.feature).clip(0, max(self.used_features.size - 1, 0))
+
+    @classmethod
+    def from_model(cls, model):
+        """
+        Compiles an XGBClassifier (or a raw Booster) trained with binary:logistic.
+
+        Parameters:
+            model (xgb.XGBClassifier or xgb.Booster): The trained model.
+
+        Returns:
+            CompiledTreeEnsemble: The compiled ensemble.
+        """
+        booster = model.get_booster() if hasattr(model, 'get_booster') else model
+        feature_names = list(booster.feature_names) if booster.feature_names else None
+        name_to_index = {name: index for index, name in enumerate(feature_names or [])}
+
+        def feature_index(name):
+            if name in name_to_index:
+                return name_to_index[name]
+            return int(name[1:])  # Unnamed features are dumped as 'f<index>'
+
+        feature, threshold, left, default_right, value, roots = [], [], [], [], [], []
+
+        def allocate():
+            for column in (feature, threshold, left, default_right, value):
+                column.append(0)
+            return len(feature) - 1
+
+        max_depth = 0
+        for tree_dump in booster.get_dump(dump_format='json'):
+            root = allocate()
+            roots.append(root)
+            queue = [(json.loads(tree_dump), root, 0)]
+            while queue:
+                node, position, depth = queue.pop()
+                max_depth = max(max_depth, depth)
+                if 'leaf' in node:
+                    threshold[position] = np.nan
+                    left[position] = position
+                    value[position] = node['leaf']
+                    continue
+                children = {child['nodeid']: child for child in node['children']}
+                yes_position = allocate()
+                no_position = allocate()
+                feature[position] = feature_index(node['split'])
+                threshold[position] = node['split_condition']
+                left[position] = yes_position
+                default_right[position] = node['missing'] == node['no']
+                queue.append((children[node['yes']], yes_position, depth + 1))
+                queue.append((children[node['no']], no_position, depth + 1))
+
+        ensemble = cls(
+            feature=np.asarray(feature, dtype=np.intp),
+            threshold=np.asarray(threshold, dtype=np.float32),
+            left=np.asarray(left, dtype=np.intp),
+            default_right=np.asarray(default_right, dtype=bool),
+            value=np.asarray(value, dtype=np.float32),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            feature_names=feature_names,
+            classes=getattr(model, 'classes_', None),
+        )
+        ensemble.base_margin = cls.calibrate_base_margin(booster, ensemble, cls.model_width(booster, ensemble))
+        return ensemble
+
+    @staticmethod
+    def model_width(booster, ensemble):
+        """
+        Returns the number of input features of the booster. Booster.num_features does not
+        exist in older XGBoost releases (e.g. 0.90), where the width is taken from the
+        feature names or, for unnamed features, from the largest split index.
+        """
+        if ensemble.feature_names:
+            return len(ensemble.feature_names)
+        if hasattr(booster, 'num_features'):
+            return booster.num_features()
+        return int(ensemble.used_features.max()) + 1 if ensemble.used_features.size else 1
+
+    @staticmethod
+    def calibrate_base_margin(booster, ensemble, num_features):
+        """
+        Derives the global bias from the booster itself (a single margin prediction on
+        an all-zero row), which avoids depending on how each XGBoost version stores
+        base_score.
+        """
+        import xgboost as xgb
+        zeros = np.zeros((1, num_features), dtype=np.float32)
+        dmatrix = xgb.DMatrix(zeros, feature_names=ensemble.feature_names)
+        margin = booster.predict(dmatrix, output_margin=True)[0]
+        return np.float32(margin - ensemble.leaf_sum(ensemble.to_matrix(zeros))[0])
+
+    def to_matrix(self, X):
+        """
+        Converts the input to a float32 matrix holding only the features used by the
+        trees, in used_features order.
+        """
+        if isinstance(X, pd.DataFrame):
+            if self.feature_names is not None:
+                X = X[[self.feature_names[index] for index in self.used_features]]
+            else:
+                X = X.iloc[:, self.used_features]
+            return np.ascontiguousarray(X.to_numpy(dtype=np.float32))
+        return np.ascontiguousarray(np.asarray(X)[:, self.used_features], dtype=np.float32)
+
+    def leaf_sum(self, X):
+        """
+        Returns the sum of the reached leaf values for every row of a matrix built by
+        to_matrix.
+        """
+        sums = np.empty(X.shape[0], dtype=np.float32)
+        for start in range(0, X.shape[0], self.block_rows):
+            block = X[start:start + self.block_rows]
+            rows = np.arange(block.shape[0])[:, None]
+            node = np.broadcast_to(self.roots, (block.shape[0], self.roots.size))
+            for _ in range(self.max_depth):
+                x = block[rows, self.compact_feature[node]]
+                go_right = x >= self.threshold[node]
+                nan_mask = np.isnan(x)
+                if nan_mask.any():
+                    go_right |= nan_mask & self.default_right[node]
+                node = self.left[node] + go_right
+            sums[start:start + block.shape[0]] = self.value[node].sum(axis=1, dtype=np.float32)
+        return sums
+
+    def predict_margin(self, X):
+        """
+        Returns the raw margin (log-odds) for every row.
+        """
+        return self.leaf_sum(self.to_matrix(X)) + self.base_margin
+
+    def predict_proba(self, X):
+        """
+        Returns class probabilities shaped like XGBClassifier.predict_proba.
+        """
+        positive = 1.0 / (1.0 + np.exp(-self.predict_margin(X).astype(np.float64)))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X):
+        """
+        Returns the predicted class labels, identical to XGBClassifier.predict.
+        """
+        return self.classes[(self.predict_margin(X) > 0).astype(np.intp)]
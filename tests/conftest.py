@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from sensorqualityclassifier.utils.logger import configure_logging
+
+
+@pytest.fixture(autouse=True, scope='session')
+def log_directory(tmp_path_factory):
+    """
+    Sends the application log of the test session to a temporary directory.
+    """
+    configure_logging(str(tmp_path_factory.mktemp('logs')))
+
+
+@pytest.fixture
+def schema_path(tmp_path):
+    """
+    Writes a training schema with a wafer id, three sensors and the label.
+    """
+    path = tmp_path / 'schema_training.json'
+    path.write_text(json.dumps({
+        'SampleFileName': 'wafer_08012020_120000.csv',
+        'LengthOfDateStampInFile': 8,
+        'LengthOfTimeStampInFile': 6,
+        'NumberofColumns': 5,
+        'ColName': {
+            'Wafer': 'varchar',
+            'Sensor - 1': ' float',
+            'Sensor - 2': ' float',
+            'Sensor - 3': ' float',
+            'Output': 'Integer',
+        },
+    }))
+    return str(path)
@@ -0,0 +1,68 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from sensorqualityclassifier.utils.columnar_cache import ColumnarCache
+
+
+def batch(rows=100):
+    df = pd.DataFrame(np.arange(rows * 3, dtype=float).reshape(rows, 3), columns=['Sensor-1', 'Sensor-2', 'Good/Bad'])
+    df.insert(0, 'Wafer', [f'wafer-{i}' for i in range(rows)])
+    return df
+
+
+def age(cache, key, seconds):
+    path = os.path.join(cache.entry_dir(key), 'columns.json')
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def test_round_trip(tmp_path):
+    cache = ColumnarCache(str(tmp_path))
+    cache.put('a', batch())
+    pd.testing.assert_frame_equal(cache.get('a'), batch(), check_dtype=False)
+
+
+def test_load_csv_serves_cached_entry_without_parsing(tmp_path):
+    csv_path = tmp_path / 'wafer.csv'
+    batch().to_csv(csv_path, index=False)
+    cache = ColumnarCache(str(tmp_path / 'cache'))
+    cache.put('known-sha', pd.read_csv(csv_path))
+    df = cache.load_csv(str(csv_path), key='known-sha')
+    assert cache.stats['hits'] == 1 and cache.stats['misses'] == 0
+    assert list(df['Wafer'])[:2] == ['wafer-0', 'wafer-1']
+
+
+def test_least_recently_used_entries_are_evicted_by_size(tmp_path):
+    cache = ColumnarCache(str(tmp_path))
+    cache.put('a', batch())
+    entry_bytes = sum(f.stat().st_size for f in os.scandir(cache.entry_dir('a')))
+    cache.max_bytes = int(entry_bytes * 2.5)
+    cache.put('b', batch())
+    age(cache, 'a', 20)
+    age(cache, 'b', 10)
+    cache.get('a')
+    cache.put('c', batch())
+    assert cache.contains('a') and cache.contains('c')
+    assert not cache.contains('b')
+    assert cache.stats['evicted'] == 1
+
+
+def test_entries_unused_for_too_long_are_evicted(tmp_path):
+    cache = ColumnarCache(str(tmp_path), max_age_days=1)
+    cache.put('old', batch())
+    age(cache, 'old', 2 * 86400)
+    cache.put('new', batch())
+    assert not cache.contains('old')
+    assert cache.contains('new')
+
+
+def test_entry_larger_than_cache_is_still_returned(tmp_path):
+    csv_path = tmp_path / 'wafer.csv'
+    batch().to_csv(csv_path, index=False)
+    cache = ColumnarCache(str(tmp_path / 'cache'), max_bytes=1)
+    df = cache.load_csv(str(csv_path))
+    assert len(df) == 100
+    assert os.listdir(cache.cache_dir) == []
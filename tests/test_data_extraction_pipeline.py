@@ -0,0 +1,145 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import yaml
+
+from sensorqualityclassifier.pipeline import data_extraction_pipeline
+from sensorqualityclassifier.pipeline.data_extraction_pipeline import DataIngestionPipeline
+
+CONTENT = bytes(range(256)) * 4000
+ETAG = '"v2"'
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """
+    Serves CONTENT with an ETag, honouring Range/If-Range like a static file server.
+    The first `truncate` responses stop after half of the announced body.
+    """
+    truncate = 0
+    requests_seen = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        type(self).requests_seen.append(dict(self.headers))
+        start = 0
+        range_header = self.headers.get('Range')
+        if range_header and self.headers.get('If-Range', ETAG) == ETAG:
+            start = int(range_header.split('=')[1].rstrip('-'))
+            if start >= len(CONTENT):
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{len(CONTENT)}')
+                self.end_headers()
+                return
+        body = CONTENT[start:]
+        self.send_response(206 if start else 200)
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Length', str(len(body)))
+        if start:
+            self.send_header('Content-Range', f'bytes {start}-{len(CONTENT) - 1}/{len(CONTENT)}')
+        self.end_headers()
+        if type(self).truncate > 0:
+            type(self).truncate -= 1
+            body = body[:len(body) // 2]
+            self.close_connection = True
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    RangeHandler.truncate = 0
+    RangeHandler.requests_seen = []
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}/data.zip'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def pipeline(tmp_path, server, monkeypatch):
+    monkeypatch.setattr(data_extraction_pipeline.time, 'sleep', lambda seconds: None)
+    config_path = tmp_path / 'config.yml'
+    config_path.write_text(yaml.safe_dump({
+        'root_directory': str(tmp_path / 'ingestion'),
+        'source_url': server,
+        'download_retries': 3,
+        'download_chunk_size': 4096,
+        'metrics_dir': str(tmp_path / 'metrics'),
+    }))
+    return DataIngestionPipeline(config_path=str(config_path))
+
+
+def zip_path(pipeline):
+    return os.path.join(pipeline.config['root_directory'], 'data.zip')
+
+
+def test_truncated_download_is_resumed_with_if_range(pipeline):
+    RangeHandler.truncate = 1
+    assert pipeline.download_data()
+    with open(zip_path(pipeline), 'rb') as file:
+        assert file.read() == CONTENT
+    resumed = RangeHandler.requests_seen[1]
+    assert resumed['Range'] == f'bytes={len(CONTENT) // 2}-'
+    assert resumed['If-Range'] == ETAG
+    assert not os.path.exists(zip_path(pipeline) + '.part.meta')
+
+
+def test_stale_partial_file_from_other_object_is_replaced(pipeline):
+    part_path = zip_path(pipeline) + '.part'
+    with open(part_path, 'wb') as file:
+        file.write(b'x' * 500000)
+    with open(part_path + '.meta', 'w') as file:
+        json.dump({'etag': '"v1"', 'last_modified': None, 'total': len(CONTENT)}, file)
+    assert pipeline.download_data()
+    with open(zip_path(pipeline), 'rb') as file:
+        assert file.read() == CONTENT
+    assert RangeHandler.requests_seen[0]['If-Range'] == '"v1"'
+
+
+def test_partial_file_without_validators_is_restarted(pipeline):
+    part_path = zip_path(pipeline) + '.part'
+    with open(part_path, 'wb') as file:
+        file.write(b'x' * 500000)
+    assert pipeline.download_data()
+    with open(zip_path(pipeline), 'rb') as file:
+        assert file.read() == CONTENT
+    assert 'Range' not in RangeHandler.requests_seen[0]
+
+
+def test_range_not_satisfiable_with_wrong_size_is_discarded(pipeline):
+    part_path = zip_path(pipeline) + '.part'
+    with open(part_path, 'wb') as file:
+        file.write(b'x' * (len(CONTENT) + 10))
+    with open(part_path + '.meta', 'w') as file:
+        json.dump({'etag': ETAG, 'last_modified': None, 'total': len(CONTENT)}, file)
+    assert pipeline.download_data()
+    with open(zip_path(pipeline), 'rb') as file:
+        assert file.read() == CONTENT
+    assert len(RangeHandler.requests_seen) == 2
+
+
+def test_download_fails_when_every_attempt_is_truncated(pipeline):
+    RangeHandler.truncate = 3
+    assert not pipeline.download_data()
+    assert not os.path.exists(zip_path(pipeline))
+
+
+def test_short_read_keeps_partial_file_for_resume(pipeline):
+    RangeHandler.truncate = 1
+    pipeline.max_retries = 1
+    assert not pipeline.download_data()
+    part_path = zip_path(pipeline) + '.part'
+    assert os.path.getsize(part_path) == len(CONTENT) // 2
+    with open(part_path + '.meta') as file:
+        assert json.load(file)['etag'] == ETAG
+
+    assert pipeline.download_data()
+    with open(zip_path(pipeline), 'rb') as file:
+        assert file.read() == CONTENT
+    assert RangeHandler.requests_seen[-1]['Range'] == f'bytes={len(CONTENT) // 2}-'
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from sensorqualityclassifier.pipeline.data_transform_and_loading_pipeline import DataLoadingPipeline
+
+
+@pytest.fixture
+def pipeline(tmp_path, schema_path):
+    config_path = tmp_path / 'config.yml'
+    config_path.write_text(yaml.safe_dump({
+        'artifacts_root': str(tmp_path / 'artifacts'),
+        'good_data_folder': str(tmp_path / 'good'),
+        'columnar_cache_dir': str(tmp_path / 'cache'),
+        'feature_store': 'local',
+        'feature_store_dir': str(tmp_path / 'store'),
+        'metrics_dir': str(tmp_path / 'metrics'),
+    }))
+    return DataLoadingPipeline(config_path=str(config_path), env_path=str(tmp_path / '.env'), schema_path=schema_path)
+
+
+def batch():
+    return pd.DataFrame({
+        'Unnamed: 0': ['w1', 'w2', np.nan, 'w4'],
+        'Sensor-1': [1.0, 2.0, 3.0, 4.0],
+        'Sensor-2': [1.0, np.nan, 3.0, 4.0],
+        'Sensor-3': [1.0, 2.0, 3.0, 4.0],
+        'Good/Bad': [1.0, -1.0, 1.0, np.nan],
+    })
+
+
+def test_convert_batch_types_columns(pipeline):
+    df = pipeline.convert_batch(batch().iloc[:2], file_name='wafer_1.csv')
+    assert list(df.columns) == ['wafer_num', 'sensor_1', 'sensor_2', 'sensor_3', 'good_bad']
+    assert df['good_bad'].tolist() == [1, -1]
+    assert df['sensor_2'].isna().tolist() == [False, True]
+
+
+def test_rows_missing_wafer_or_label_are_dropped(pipeline):
+    df = pipeline.convert_batch(batch(), file_name='wafer_1.csv')
+    assert df['wafer_num'].tolist() == ['w1', 'w2']
+    assert df['good_bad'].tolist() == [1, -1]
+    assert df['good_bad'].min() > np.iinfo(np.int64).min
+
+
+def test_missing_wafer_from_columnar_cache_is_dropped(pipeline):
+    raw = batch()
+    raw['Unnamed: 0'] = raw['Unnamed: 0'].astype(str)
+    df = pipeline.convert_batch(raw, file_name='wafer_1.csv')
+    assert df['wafer_num'].tolist() == ['w1', 'w2']
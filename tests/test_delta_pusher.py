@@ -0,0 +1,115 @@
+import os
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sensorqualityclassifier.feature_store import delta_pusher
+from sensorqualityclassifier.feature_store.delta_pusher import DeltaPusher
+from sensorqualityclassifier.feature_store.hopsworks_store import HopsworksFeatureStore
+
+
+class TransientError(Exception):
+    pass
+
+
+class StubFeatureGroup:
+    """
+    Records inserted frames. The first `failures` inserts raise TransientError, and so
+    does every insert once `fail_after` frames have been inserted.
+    """
+
+    def __init__(self, failures=0, fail_after=None):
+        self.failures = failures
+        self.fail_after = fail_after
+        self.calls = 0
+        self.inserted = []
+
+    def insert(self, df):
+        self.calls += 1
+        if self.fail_after is not None and len(self.inserted) >= self.fail_after:
+            raise TransientError("connection reset")
+        if self.failures:
+            self.failures -= 1
+            raise TransientError("503 Service Unavailable")
+        self.inserted.append(df.copy())
+
+
+@pytest.fixture
+def hopsworks(monkeypatch):
+    """
+    Installs a stand-in for the hopsworks client module, recording its logins and
+    exposing the feature group every project hands out.
+    """
+    feature_group = StubFeatureGroup()
+    feature_store = types.SimpleNamespace(get_or_create_feature_group=lambda **kwargs: feature_group)
+    handle = types.SimpleNamespace(get_feature_store=lambda: feature_store)
+    module = types.ModuleType('hopsworks')
+    module.logins = []
+
+    def login(api_key_value, project=None):
+        module.logins.append((api_key_value, project))
+        return handle
+
+    module.login = login
+    module.feature_group = feature_group
+    monkeypatch.setitem(sys.modules, 'hopsworks', module)
+    monkeypatch.setattr(delta_pusher.time, 'sleep', lambda seconds: None)
+    return module
+
+
+def wafers(count):
+    return pd.DataFrame({
+        'wafer_num': [f'Wafer-{i}' for i in range(count)],
+        'sensor_1': np.arange(count, dtype=float),
+    })
+
+
+def test_hopsworks_login_is_lazy_and_happens_once(hopsworks):
+    store = HopsworksFeatureStore(api_key='key', project_name='wafers')
+    assert hopsworks.logins == []
+    store.upsert(wafers(2))
+    store.upsert(wafers(2))
+    assert hopsworks.logins == [('key', 'wafers')]
+
+
+def test_transient_errors_are_retried(hopsworks, tmp_path):
+    hopsworks.feature_group.failures = 2
+    pusher = DeltaPusher(HopsworksFeatureStore('key', 'wafers'), str(tmp_path / 'state.npz'), max_retries=3)
+    report = pusher.push(wafers(3))
+    assert report['retries'] == 2 and report['rows_sent'] == 3
+    assert hopsworks.feature_group.calls == 3
+    assert len(DeltaPusher(pusher.feature_store, pusher.state_path).pushed_hashes) == 3
+
+
+def test_retries_stop_after_max_attempts_and_state_does_not_advance(hopsworks, tmp_path):
+    state_path = str(tmp_path / 'state.npz')
+    store = HopsworksFeatureStore('key', 'wafers')
+    pusher = DeltaPusher(store, state_path, batch_rows=2, max_retries=3)
+    pusher.push(wafers(2))
+    with open(state_path, 'rb') as file:
+        saved_state = file.read()
+
+    hopsworks.feature_group.failures = 10
+    hopsworks.feature_group.calls = 0
+    with pytest.raises(TransientError):
+        pusher.push(wafers(4))
+    assert hopsworks.feature_group.calls == 3
+    with open(state_path, 'rb') as file:
+        assert file.read() == saved_state
+    assert not os.path.exists(state_path + '.tmp.npz')
+
+    hopsworks.feature_group.failures = 0
+    report = DeltaPusher(store, state_path, batch_rows=2).push(wafers(4))
+    assert report['rows_sent'] == 2 and report['rows_unchanged'] == 2
+
+
+def test_interrupted_push_keeps_state_of_completed_batches(hopsworks, tmp_path):
+    state_path = str(tmp_path / 'state.npz')
+    store = HopsworksFeatureStore('key', 'wafers')
+    hopsworks.feature_group.fail_after = 1
+    with pytest.raises(TransientError):
+        DeltaPusher(store, state_path, batch_rows=2, max_retries=2).push(wafers(4))
+    assert sorted(DeltaPusher(store, state_path).pushed_hashes) == ['Wafer-0', 'Wafer-1']
@@ -0,0 +1,46 @@
+import os
+
+from sensorqualityclassifier.utils import file_manifest
+from sensorqualityclassifier.utils.common import file_sha256
+from sensorqualityclassifier.utils.file_manifest import FileManifest
+
+
+def touch_later(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_validation_does_not_hash_the_file(tmp_path, monkeypatch):
+    path = tmp_path / 'wafer.csv'
+    path.write_text('Wafer,Sensor-1\nw1,1.0\n')
+    def fail_hash(file_path):
+        raise AssertionError(f"{file_path} was hashed")
+
+    monkeypatch.setattr(file_manifest, 'file_sha256', fail_hash)
+    manifest = FileManifest(str(tmp_path / 'manifest.json'))
+    manifest.record_validation('wafer.csv', str(path), True)
+    assert manifest.get_entry('wafer.csv')['sha256'] is None
+    assert manifest.get_unchanged('wafer.csv', str(path)) is not None
+
+
+def test_unhashed_entry_with_new_mtime_is_changed(tmp_path):
+    path = tmp_path / 'wafer.csv'
+    path.write_text('Wafer,Sensor-1\nw1,1.0\n')
+    manifest = FileManifest(str(tmp_path / 'manifest.json'))
+    manifest.record_validation('wafer.csv', str(path), True)
+    touch_later(path)
+    assert manifest.get_unchanged('wafer.csv', str(path)) is None
+
+
+def test_hash_from_loading_resolves_new_mtime(tmp_path):
+    path = tmp_path / 'wafer.csv'
+    path.write_text('Wafer,Sensor-1\nw1,1.0\n')
+    manifest = FileManifest(str(tmp_path / 'manifest.json'))
+    manifest.record_validation('wafer.csv', str(path), True)
+    manifest.mark_loaded('wafer.csv', str(path), sha256=file_sha256(str(path)))
+    touch_later(path)
+    entry = manifest.get_unchanged('wafer.csv', str(path))
+    assert entry is not None and entry['loaded']
+    path.write_text('Wafer,Sensor-1\nw1,2.0\n')
+    touch_later(path)
+    assert manifest.get_unchanged('wafer.csv', str(path)) is None
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from sensorqualityclassifier.feature_store.local_store import LocalFeatureStore
+
+
+def wafers():
+    return pd.DataFrame({
+        'wafer_num': ['Wafer-1', 'Wafer-2', 'Wafer-3'],
+        'sensor_1': np.array([1.0, 2.0, 3.0]),
+        'good_bad': np.array([1, -1, 1]),
+    })
+
+
+def test_read_applies_projection_and_filters(tmp_path):
+    store = LocalFeatureStore(str(tmp_path), num_partitions=2)
+    store.upsert(wafers())
+    df = store.read(columns=['wafer_num', 'sensor_1'], filters=[('sensor_1', '>=', 2.0)])
+    assert sorted(df['wafer_num']) == ['Wafer-2', 'Wafer-3']
+    assert list(df.columns) == ['wafer_num', 'sensor_1']
+
+
+def test_read_without_matches_keeps_schema(tmp_path):
+    store = LocalFeatureStore(str(tmp_path), num_partitions=2)
+    store.upsert(wafers())
+    df = store.read(filters=[('sensor_1', '>', 10.0)])
+    assert df.empty
+    assert list(df.columns) == ['wafer_num', 'sensor_1', 'good_bad']
+    assert df.dtypes.to_dict() == {'wafer_num': object, 'sensor_1': np.float64, 'good_bad': np.int64}
+    projected = store.read(columns=['sensor_1'], filters=[('wafer_num', 'in', ['Wafer-9'])])
+    assert list(projected.columns) == ['sensor_1']
+    assert projected['sensor_1'].dtype == np.float64
+
+
+def test_read_of_empty_store(tmp_path):
+    df = LocalFeatureStore(str(tmp_path)).read()
+    assert df.empty and list(df.columns) == []
@@ -0,0 +1,73 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sensorqualityclassifier.serving.micro_batcher import MicroBatcher
+
+
+def predict_ones(features):
+    return np.ones(len(features), dtype=int) * features['x'].astype(float).to_numpy()
+
+
+def test_concurrent_requests_share_one_batch():
+    batcher = MicroBatcher(predict_ones, max_wait_ms=50)
+    futures = [batcher.submit(pd.DataFrame({'x': [i, i]})) for i in range(3)]
+    results = [future.result(timeout=5) for future in futures]
+    batcher.close()
+    assert [list(result) for result in results] == [[0, 0], [1, 1], [2, 2]]
+    assert batcher.stats['batches'] == 1
+
+
+def test_failed_batch_keeps_error_with_offending_request():
+    batcher = MicroBatcher(predict_ones, max_wait_ms=50)
+    good = batcher.submit(pd.DataFrame({'x': [1.0]}))
+    bad = batcher.submit(pd.DataFrame({'x': ['not a number']}))
+    other = batcher.submit(pd.DataFrame({'x': [2.0]}))
+    assert list(good.result(timeout=5)) == [1]
+    assert list(other.result(timeout=5)) == [2]
+    with pytest.raises(ValueError):
+        bad.result(timeout=5)
+    batcher.close()
+
+
+def test_loop_survives_unexpected_errors(monkeypatch):
+    batcher = MicroBatcher(predict_ones, max_wait_ms=1)
+    calls = []
+
+    def broken_collect(item):
+        calls.append(item)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return [item], False
+
+    monkeypatch.setattr(batcher, '_collect_batch', broken_collect)
+    with pytest.raises(RuntimeError):
+        batcher.predict(pd.DataFrame({'x': [1.0]}), timeout=5)
+    assert list(batcher.predict(pd.DataFrame({'x': [3.0]}), timeout=5)) == [3]
+    batcher.close()
+
+
+def test_submit_after_close_raises():
+    batcher = MicroBatcher(predict_ones)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(pd.DataFrame({'x': [1.0]}))
+
+
+def test_close_serves_already_queued_requests():
+    release = threading.Event()
+
+    def slow_predict(features):
+        release.wait(5)
+        return predict_ones(features)
+
+    batcher = MicroBatcher(slow_predict, max_wait_ms=0)
+    first = batcher.submit(pd.DataFrame({'x': [1.0]}))
+    closer = threading.Thread(target=batcher.close)
+    closer.start()
+    release.set()
+    closer.join(5)
+    assert list(first.result(timeout=5)) == [1]
+    assert not batcher._thread.is_alive()
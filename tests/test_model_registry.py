@@ -0,0 +1,53 @@
+import os
+
+import joblib
+
+from sensorqualityclassifier.utils.model_registry import ModelRegistry
+
+
+def write_model(path, value, mtime_offset_ns=0):
+    joblib.dump({'threshold': value}, path)
+    if mtime_offset_ns:
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + mtime_offset_ns))
+
+
+def test_touched_artifact_keeps_model_version_and_derived(tmp_path):
+    path = str(tmp_path / 'model.pkl')
+    write_model(path, 1)
+    registry = ModelRegistry()
+    model = registry.get_model(path)
+    version = registry.get_version(path)
+    derived = registry.get_derived(path, 'backend', lambda model: object())
+
+    size = os.path.getsize(path)
+    write_model(path, 1, mtime_offset_ns=10 ** 9)
+    assert os.path.getsize(path) == size
+    assert registry.get_model(path) is model
+    assert registry.get_version(path) == version
+    assert registry.get_derived(path, 'backend', lambda model: object()) is derived
+    assert registry.get_stats()[os.path.abspath(path)]['loads'] == 1
+
+
+def test_rewritten_artifact_reloads_and_invalidates_derived(tmp_path):
+    path = str(tmp_path / 'model.pkl')
+    write_model(path, 1)
+    registry = ModelRegistry()
+    registry.get_model(path)
+    version = registry.get_version(path)
+    derived = registry.get_derived(path, 'backend', lambda model: object())
+
+    size = os.path.getsize(path)
+    # Same size, new content and mtime
+    write_model(path, 2, mtime_offset_ns=10 ** 9)
+    assert os.path.getsize(path) == size
+    assert registry.get_model(path) == {'threshold': 2}
+    assert registry.get_version(path) != version
+    rebuilt = registry.get_derived(path, 'backend', lambda model: object())
+    assert rebuilt is not derived
+    assert registry.get_stats()[os.path.abspath(path)]['loads'] == 2
+
+    # New content of a different size
+    joblib.dump({'threshold': 2, 'features': ['sensor_1']}, path)
+    assert registry.get_model(path) == {'threshold': 2, 'features': ['sensor_1']}
+    assert registry.get_derived(path, 'backend', lambda model: object()) is not rebuilt
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+import yaml
+
+from sensorqualityclassifier.pipeline import model_training_pipeline
+from sensorqualityclassifier.pipeline.model_training_pipeline import ModelTrainingPipeline
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    config_path = tmp_path / 'config.yml'
+    config_path.write_text(yaml.safe_dump({
+        'feature_store': 'local',
+        'feature_store_dir': str(tmp_path / 'store'),
+        'metrics_dir': str(tmp_path / 'metrics'),
+    }))
+    return ModelTrainingPipeline(config_path=str(config_path), env_path=str(tmp_path / '.env'))
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(400, 6)), columns=[f'Sensor-{i}' for i in range(1, 7)])
+    X['Sensor-6'] = 0.0
+    y = pd.Series((X['Sensor-1'] > 0).astype(int))
+    clf = xgb.XGBClassifier(n_estimators=5, max_depth=1, eval_metric='logloss')
+    clf.fit(X, y)
+    return clf, X, y
+
+
+def test_refit_is_kept_when_predictions_agree(pipeline, data):
+    clf, X, y = data
+    model, used = pipeline.refit_on_used_features(clf, X, y, X)
+    assert model is not clf
+    assert 'Sensor-6' not in used
+    assert (model.predict(X[used]) == clf.predict(X)).all()
+    assert 'Sensor-6' in pipeline.feature_report['zero_importance']
+
+
+def test_original_is_kept_when_refit_disagrees(pipeline, data, monkeypatch):
+    class DisagreeingClassifier(xgb.XGBClassifier):
+        def predict(self, X, **kwargs):
+            return 1 - super().predict(X, **kwargs)
+
+    monkeypatch.setattr(model_training_pipeline.xgb, 'XGBClassifier', DisagreeingClassifier)
+    clf, X, y = data
+    model, used = pipeline.refit_on_used_features(clf, X, y, X)
+    assert model is clf
+    assert used == list(X.columns)
+    assert pipeline.feature_report.get('zero_importance', []) == []
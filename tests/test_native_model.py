@@ -0,0 +1,84 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+import yaml
+
+from sensorqualityclassifier.pipeline.inference_pipeline import InferencePipeline
+from sensorqualityclassifier.utils.native_model import NativeModel
+
+
+@pytest.fixture
+def model():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(200, 3)), columns=['sensor_1', 'sensor_2', 'sensor_3'])
+    y = (X['sensor_1'] > 0).astype(int)
+    return xgb.XGBClassifier(n_estimators=5, max_depth=2, eval_metric='logloss').fit(X, y), X
+
+
+def set_mtime(path, mtime_ns):
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_save_and_load_round_trip(tmp_path, model):
+    clf, X = model
+    manifest_path = NativeModel.save(clf, str(tmp_path / 'xgboost_model.pkl'), {'accuracy': '99.00'})
+    loaded = NativeModel.load(manifest_path)
+    assert loaded.feature_names == list(X.columns)
+    assert (loaded.predict(X) == clf.predict(X)).all()
+    assert loaded.manifest['metrics'] == {'accuracy': '99.00'}
+
+
+def test_load_refuses_tampered_model_file(tmp_path, model):
+    clf, _ = model
+    manifest_path = NativeModel.save(clf, str(tmp_path / 'xgboost_model.pkl'))
+    native_path = os.path.join(tmp_path, NativeModel.load(manifest_path).manifest['model_file'])
+    with open(native_path, 'ab') as file:
+        file.write(b'\0')
+    with pytest.raises(ValueError, match='does not match the hash'):
+        NativeModel.load(manifest_path)
+
+
+@pytest.fixture
+def artifacts(tmp_path, model, schema_path):
+    clf, _ = model
+    model_path = str(tmp_path / 'xgboost_model.pkl')
+    joblib.dump(clf, model_path)
+    manifest_path = NativeModel.save(clf, model_path)
+
+    def pipeline(**overrides):
+        config = {
+            'prediction_dir': str(tmp_path / 'prediction_dir'),
+            'output_dir': str(tmp_path / 'output'),
+            'load_model': model_path,
+            'prediction_cache': False,
+            **overrides,
+        }
+        config_path = tmp_path / 'config.yml'
+        config_path.write_text(yaml.safe_dump(config))
+        return InferencePipeline(config_path=str(config_path), schema_path=schema_path)
+
+    return pipeline, model_path, manifest_path
+
+
+def test_manifest_preferred_when_as_recent_as_pickle(artifacts):
+    pipeline, model_path, manifest_path = artifacts
+    mtime_ns = os.stat(model_path).st_mtime_ns
+    set_mtime(manifest_path, mtime_ns)
+    assert pipeline().model_path == manifest_path
+    set_mtime(manifest_path, mtime_ns + 10 ** 9)
+    assert pipeline().model_path == manifest_path
+
+
+def test_pickle_preferred_when_newer_than_manifest(artifacts):
+    pipeline, model_path, manifest_path = artifacts
+    set_mtime(manifest_path, os.stat(model_path).st_mtime_ns - 10 ** 9)
+    assert pipeline().model_path == model_path
+
+
+def test_native_model_can_be_disabled(artifacts):
+    pipeline, model_path, _ = artifacts
+    assert pipeline(prefer_native_model=False).model_path == model_path
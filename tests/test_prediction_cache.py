@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from sensorqualityclassifier.utils.prediction_cache import PredictionCache
+
+
+def make_rows(start, count):
+    features = pd.DataFrame({'a': np.arange(start, start + count, dtype=float), 'b': 1.0})
+    return PredictionCache.row_hashes(features)
+
+
+def test_alternating_model_versions_keep_their_labels(tmp_path):
+    cache = PredictionCache(str(tmp_path / 'cache.sqlite'), memory_rows=0)
+    hashes = make_rows(0, 5)
+    cache.store('v1', hashes, np.ones(5))
+    cache.store('v2', hashes, -np.ones(5))
+    labels, hits = cache.lookup('v1', hashes)
+    assert hits.all() and (labels == 1).all()
+    labels, hits = cache.lookup('v2', hashes)
+    assert hits.all() and (labels == -1).all()
+
+
+def test_row_cap_evicts_least_recently_used_rows(tmp_path):
+    cache = PredictionCache(str(tmp_path / 'cache.sqlite'), memory_rows=0, max_disk_rows=10)
+    for start in range(0, 30, 5):
+        cache.store('v1', make_rows(start, 5), np.ones(5))
+    assert cache.disk_rows == 10
+    assert cache.count_disk_rows() == 10
+    _, hits = cache.lookup('v1', make_rows(0, 30))
+    assert hits.tolist() == [False] * 20 + [True] * 10
+
+
+def test_writes_are_committed_in_batches(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = PredictionCache(path, commit_rows=100, commit_seconds=3600)
+    cache.store('v1', make_rows(0, 5), np.ones(5))
+    assert PredictionCache(path).count_disk_rows() == 0
+    cache.flush()
+    reopened = PredictionCache(path)
+    assert reopened.disk_rows == 5
+    _, hits = reopened.lookup('v1', make_rows(0, 5))
+    assert hits.all()
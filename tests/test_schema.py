@@ -0,0 +1,49 @@
+from sensorqualityclassifier.utils.schema import CompiledSchema
+
+HEADER = ['Wafer', 'Sensor-1', 'Sensor-2', 'Sensor-3', 'Good/Bad']
+
+
+def test_normalize_column_name_strips_spaces():
+    assert CompiledSchema.normalize_column_name('Sensor - 1') == 'sensor_1'
+    assert CompiledSchema.normalize_column_name('Sensor-1') == 'sensor_1'
+    assert CompiledSchema.normalize_column_name('Good/Bad') == 'good_bad'
+
+
+def test_first_and_last_columns_are_wafer_and_label(schema_path):
+    plan = CompiledSchema.load(schema_path).header_plan(['Unnamed: 0', 'Sensor - 1', 'Sensor - 2', 'Sensor - 3', 'Output'])
+    assert plan['names'] == ['wafer_num', 'sensor_1', 'sensor_2', 'sensor_3', 'good_bad']
+    assert plan['complete'] and plan['labelled'] and plan['in_schema_order']
+
+
+def test_reordered_header(schema_path):
+    schema = CompiledSchema.load(schema_path)
+    header = ['Wafer', 'Sensor-3', 'Sensor-1', 'Sensor-2', 'Good/Bad']
+    plan = schema.header_plan(header)
+    assert plan['complete'] and not plan['in_schema_order']
+    assert [header[index] for index in plan['schema_order']] == HEADER
+    assert schema.validate_header(header)
+
+
+def test_header_with_byte_order_mark(schema_path):
+    schema = CompiledSchema.load(schema_path)
+    plan = schema.header_plan(['\ufeffWafer'] + HEADER[1:])
+    assert plan['names'][0] == 'wafer_num'
+    assert plan['complete']
+
+
+def test_header_without_label(schema_path):
+    schema = CompiledSchema.load(schema_path)
+    header = HEADER[:-1]
+    plan = schema.header_plan(header)
+    assert not plan['labelled']
+    assert plan['names'] == ['wafer_num', 'sensor_1', 'sensor_2', 'sensor_3']
+    assert plan['complete']
+    assert schema.validate_header(header, labelled=False)
+    assert not schema.validate_header(header)
+
+
+def test_header_with_unknown_or_missing_sensor(schema_path):
+    schema = CompiledSchema.load(schema_path)
+    assert not schema.header_plan(['Wafer', 'Sensor-1', 'Sensor-2', 'Sensor-9', 'Good/Bad'])['complete']
+    assert not schema.header_plan(['Wafer', 'Sensor-1', 'Sensor-1', 'Sensor-2', 'Good/Bad'])['complete']
+    assert not schema.validate_header(['Wafer', 'Sensor-1', 'Sensor-2'], labelled=False)
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+
+from sensorqualityclassifier.utils.tree_ensemble import CompiledTreeEnsemble
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(500, 5)).astype(np.float32), columns=[f'sensor_{i}' for i in range(1, 6)])
+    X = X.mask(rng.random(X.shape) < 0.1)
+    y = ((X['sensor_1'].fillna(0) + X['sensor_2'].fillna(1)) > 0.5).astype(int)
+    return X, y
+
+
+def test_labels_match_booster_predict_with_missing_values(data):
+    X, y = data
+    model = xgb.XGBClassifier(n_estimators=20, max_depth=3, eval_metric='logloss')
+    model.fit(X, y)
+    ensemble = CompiledTreeEnsemble.from_model(model)
+    expected = model.get_booster().predict(xgb.DMatrix(X)) > 0.5
+    assert (ensemble.predict(X) == expected.astype(int)).all()
+    np.testing.assert_allclose(ensemble.predict_proba(X)[:, 1], model.predict_proba(X)[:, 1], rtol=1e-5, atol=1e-6)
+
+
+def test_unnamed_booster_without_num_features(data, monkeypatch):
+    X, y = data
+    booster = xgb.train({'objective': 'binary:logistic', 'max_depth': 3}, xgb.DMatrix(X.to_numpy(), label=y), num_boost_round=10)
+    # Older XGBoost releases (0.90) have no Booster.num_features
+    monkeypatch.delattr(xgb.Booster, 'num_features')
+    ensemble = CompiledTreeEnsemble.from_model(booster)
+    expected = booster.predict(xgb.DMatrix(X.to_numpy())) > 0.5
+    assert (ensemble.predict(X.to_numpy()) == expected.astype(int)).all()
@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sensorqualityclassifier.serving import watch_folder
+from sensorqualityclassifier.utils.logger import AppLogger
+from sensorqualityclassifier.utils.metrics import MetricsRegistry
+
+
+class StubPipeline:
+    """
+    Stands in for InferencePipeline: parses CSV files and predicts with predict_fn.
+    """
+    predict_fn = None
+
+    def __init__(self, config_path, schema_path):
+        root = os.path.dirname(config_path)
+        self.config = {
+            'watch_archive_dir': os.path.join(root, 'archive'),
+            'watch_results_dir': os.path.join(root, 'results'),
+            'watch_debounce_ms': 10,
+            'watch_max_wait_ms': 50,
+            'watch_poll_interval': 0.01,
+            'watch_mode': 'polling',
+            'watch_retry_seconds': 0.01,
+            'watch_max_retries': 2,
+            'metrics_dir': os.path.join(root, 'metrics'),
+        }
+        self.prediction_dir = os.path.join(root, 'incoming')
+        self.output_dir = os.path.join(root, 'output')
+        self.logger = AppLogger()
+        self.metrics = MetricsRegistry()
+
+    def load_model(self):
+        return None
+
+    def read_prediction_file(self, path):
+        return pd.read_csv(path)
+
+    def predict_labels(self, model, features):
+        return type(self).predict_fn(features)
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(watch_folder, 'InferencePipeline', StubPipeline)
+    service = watch_folder.WatchFolderService(config_path=str(tmp_path / 'config.yml'))
+    pd.DataFrame({'a': [1.0, 2.0]}).to_csv(os.path.join(service.watch_dir, 'wafer_1.csv'), index=False)
+    return service
+
+
+def run_until(service, condition, timeout=5):
+    thread = threading.Thread(target=service.run)
+    thread.start()
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    service.stop()
+    thread.join(5)
+    assert condition()
+
+
+def test_failing_batch_is_retried_then_moved_to_failed(service):
+    calls = []
+
+    def broken(features):
+        calls.append(len(features))
+        raise RuntimeError("model unavailable")
+
+    StubPipeline.predict_fn = broken
+    failed_path = os.path.join(service.archive_dir, 'failed', 'wafer_1.csv')
+    run_until(service, lambda: os.path.exists(failed_path))
+    assert len(calls) == service.max_retries + 1
+    assert not os.path.exists(os.path.join(service.watch_dir, 'wafer_1.csv'))
+    assert service.attempts == {}
+
+
+def test_transient_failure_is_scored_on_retry(service):
+    calls = []
+
+    def flaky(features):
+        calls.append(len(features))
+        if len(calls) == 1:
+            raise RuntimeError("model unavailable")
+        return np.ones(len(features), dtype=int)
+
+    StubPipeline.predict_fn = flaky
+    result_path = os.path.join(service.results_dir, 'wafer_1_results.csv')
+    run_until(service, lambda: os.path.exists(os.path.join(service.archive_dir, 'wafer_1.csv')))
+    assert pd.read_csv(result_path)['good_bad'].tolist() == [1, 1]
+    assert len(calls) == 2
+    assert service.attempts == {}